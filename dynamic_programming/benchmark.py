@@ -0,0 +1,317 @@
+"""
+Benchmark harness for the optimization pipeline.
+
+Generates seeded synthetic instances, runs every phase of the engine on
+them (load, feasibility, model build, solve, post-pass, render-data prep)
+and records wall time, CPU time and peak memory per phase. Results are written as
+JSON and can be compared against an earlier run to catch regressions.
+Each entry also keeps the projected model size (engine.estimate_model_size)
+next to the built one, to check the estimate.
+The post-pass is also timed with every placement method, so the report
+shows the peak reduction of the exact placement and what it costs:
+
+    python -m benchmark --sizes 100 1000 --output bench.json
+    python -m benchmark --sizes 100 1000 --baseline bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from gurobipy import GRB, GurobiError, gurobi
+
+import engine
+from generator import generate_instance, write_instance
+from instrumentation import Profiler
+from placement import check_granularity
+
+PHASES = ["load", "feasibility", "build", "solve", "post_process", "render_prep"]
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process, if the platform reports it."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _phase_entries(profiler):
+    """Top-level spans -> {phase: {seconds, cpu_seconds, peak_mb}}, with nested spans as details."""
+    phases = {}
+    for span in profiler.spans:
+        if "wall_s" not in span:
+            continue
+        entry = {"seconds": round(span["wall_s"], 4), "cpu_seconds": round(span["cpu_s"], 4)}
+        if "peak_mb" in span:
+            entry["peak_mb"] = round(span["peak_mb"], 2)
+        if span["depth"] == 0:
+            phases[span["name"]] = entry
+        else:
+            phases.setdefault(span["parent"], {}).setdefault("spans", {})[span["name"]] = entry
+    return phases
+
+
+def run_instance(num_tasks, seed=0, time_limit=None, workdir=None, track_memory=True, aggregate=True,
+                 capacity=engine.DEFAULT_CAPACITY, lazy_rounds=False, placement=engine.DEFAULT_PLACEMENT,
+                 granularity=engine.DEFAULT_GRANULARITY, formulation=engine.DEFAULT_FORMULATION):
+    """Benchmark one generated instance and return its result entry."""
+    tasks_df, shifts_df = generate_instance(num_tasks, seed=seed)
+    db_file = os.path.join(workdir, f"bench_{num_tasks}_{seed}.db")
+    write_instance(db_file, tasks_df, shifts_df)
+
+    entry = {"tasks": num_tasks, "shifts": len(shifts_df), "seed": seed}
+    profiler = Profiler(track_memory=track_memory)
+    try:
+        _run_phases(entry, profiler, db_file, time_limit, aggregate, capacity, lazy_rounds, placement,
+                    granularity, formulation)
+    finally:
+        entry["phases"] = _phase_entries(profiler)
+    return entry
+
+
+def _run_phases(entry, profiler, db_file, time_limit, aggregate, capacity, lazy_rounds, placement,
+                granularity, formulation):
+    with profiler.span("load"):
+        tasks_df, shifts_df = engine.load_tables(db_file)
+        tasks_df, shifts_df = engine.prepare_tables(tasks_df, shifts_df)
+
+    with profiler.span("feasibility"):
+        screening = engine.screen_instance(tasks_df, shifts_df)
+        entry["uncovered_tasks"] = len(screening.uncovered)
+        entry["screening"] = screening.counts()
+    # Baselines must time feasible instances; a task no shift can hold is a generator bug
+    if not (screening.uncovered.empty and screening.break_conflicts.empty):
+        raise ValueError(
+            f"generated instance of {len(tasks_df)} tasks has {len(screening.uncovered)} uncovered tasks "
+            f"and {len(screening.break_conflicts)} break conflicts"
+        )
+
+    try:
+        with profiler.span("build"):
+            with profiler.span("prune"):
+                shifts_df, pruned = engine.prune_shifts(shifts_df)
+            entry["pruned_shifts"] = len(pruned)
+            with profiler.span("estimate"):
+                size = engine.estimate_model_size(
+                    tasks_df, shifts_df, aggregate=aggregate, capacity=capacity,
+                    formulation="buckets" if formulation == "buckets" else "tasks"
+                )
+                if formulation == "auto" and size.num_vars > engine.BUCKET_VAR_THRESHOLD:
+                    size = engine.estimate_model_size(tasks_df, shifts_df, capacity=capacity, formulation="buckets")
+            formulation = size.formulation
+            entry["formulation"] = formulation
+            entry["estimate"] = size.as_dict()
+            if formulation == "buckets":
+                model, shift_worker_vars = engine.build_bucket_model(
+                    tasks_df, shifts_df, env=engine.create_env(output_flag=False), profiler=profiler
+                )
+                task_shift_vars = None
+            else:
+                model, shift_worker_vars, task_shift_vars = engine.build_model(
+                    tasks_df, shifts_df, env=engine.create_env(output_flag=False), profiler=profiler,
+                    aggregate=aggregate, capacity=capacity
+                )
+            if time_limit is not None:
+                model.Params.TimeLimit = time_limit
+        entry["num_vars"] = model.NumVars
+        entry["num_constrs"] = model.NumConstrs
+        entry["num_nonzeros"] = model.NumNZs
+
+        with profiler.span("solve"):
+            engine.solve_model(model, rounds=lazy_rounds)
+        if capacity == "lazy":
+            entry["lazy_rows_added"] = len(model._lazy_added)
+            entry["lazy_rows_pending"] = len(model._lazy_capacity)
+    except GurobiError as e:
+        entry["status"] = "ERROR"
+        entry["error"] = str(e)
+        return
+
+    entry["status"] = engine.STATUS_NAMES.get(model.status, str(model.status))
+    if model.SolCount == 0:
+        return
+    entry["objective"] = model.ObjVal
+    entry["mip_gap"] = model.MIPGap if model.status != GRB.OPTIMAL else 0.0
+    entry["node_count"] = model.NodeCount
+
+    with profiler.span("post_process"):
+        if task_shift_vars is None:
+            assignments, worker_counts = engine.bucket_assignments(model, shift_worker_vars, shifts_df)
+        else:
+            assignments = engine.chosen_assignments(model, task_shift_vars)
+            worker_counts = {key: var.X for key, var in shift_worker_vars.items()}
+        frames = engine.post_process(
+            tasks_df, shifts_df, assignments, worker_counts, profiler=profiler, placement=placement,
+            granularity=granularity
+        )
+
+    with profiler.span("render_prep"):
+        engine.prepare_render_data(*frames)
+
+    entry["total_cost"] = float(frames[2]["Total Cost (€)"].sum())
+    entry["placement"] = compare_placements(tasks_df, shifts_df, assignments, worker_counts, granularity)
+
+
+def compare_placements(tasks_df, shifts_df, assignments, worker_counts, granularity=engine.DEFAULT_GRANULARITY):
+    """Workers, cost and post-pass seconds of one solution under every placement method."""
+    placements = {}
+    for method in engine.PLACEMENT_METHODS:
+        started = time.perf_counter()
+        _, _, day_summary_df = engine.post_process(
+            tasks_df, shifts_df, assignments, worker_counts, placement=method, granularity=granularity
+        )
+        placements[method] = {
+            "seconds": round(time.perf_counter() - started, 4),
+            "workers": int(day_summary_df["Workers Assigned"].sum()),
+            "total_cost": float(day_summary_df["Total Cost (€)"].sum()),
+        }
+    return placements
+
+
+def run_benchmarks(sizes, seed=0, time_limit=None, track_memory=True, aggregate=True,
+                   capacity=engine.DEFAULT_CAPACITY, lazy_rounds=False, placement=engine.DEFAULT_PLACEMENT,
+                   granularity=engine.DEFAULT_GRANULARITY, formulation=engine.DEFAULT_FORMULATION, log=print):
+    """Run every size and return the full report."""
+    report = {
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "gurobi": ".".join(str(v) for v in gurobi.version()),
+        "machine": platform.machine(),
+        "seed": seed,
+        "time_limit": time_limit,
+        "aggregate": aggregate,
+        "capacity": capacity,
+        "lazy_rounds": lazy_rounds,
+        "placement": placement,
+        "granularity": list(granularity),
+        "formulation": formulation,
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for num_tasks in sizes:
+            entry = run_instance(num_tasks, seed=seed, time_limit=time_limit,
+                                 workdir=workdir, track_memory=track_memory, aggregate=aggregate,
+                                 capacity=capacity, lazy_rounds=lazy_rounds, placement=placement,
+                                 granularity=granularity, formulation=formulation)
+            entry["peak_rss_mb"] = _peak_rss_mb()
+            report["results"].append(entry)
+            log(format_entry(entry))
+    return report
+
+
+def format_entry(entry):
+    timings = ", ".join(
+        f"{name} {entry['phases'][name]['seconds']:.3f}s" for name in PHASES if name in entry["phases"]
+    )
+    line = f"{entry['tasks']:>7} tasks / {entry['shifts']:>3} shifts  {entry.get('status', '?'):<10} {timings}"
+    if entry.get("formulation") == "buckets":
+        line += "  (buckets)"
+    if "placement" in entry:
+        line += "  workers " + ", ".join(
+            f"{method} {values['workers']} ({values['seconds']:.3f}s)"
+            for method, values in entry["placement"].items()
+        )
+    if "error" in entry:
+        line += f"  ({entry['error']})"
+    return line
+
+
+def compare_to_baseline(report, baseline, tolerance=0.25, min_seconds=0.05):
+    """
+    Return a list of regressions: phases that got slower than the baseline
+    by more than `tolerance` (relative) and `min_seconds` (absolute).
+    """
+    previous = {entry["tasks"]: entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in report["results"]:
+        old = previous.get(entry["tasks"])
+        if old is None:
+            continue
+        for name in PHASES:
+            if name not in entry["phases"] or name not in old["phases"]:
+                continue
+            new_s = entry["phases"][name]["seconds"]
+            old_s = old["phases"][name]["seconds"]
+            if new_s > old_s * (1 + tolerance) and new_s - old_s > min_seconds:
+                regressions.append({
+                    "tasks": entry["tasks"],
+                    "phase": name,
+                    "baseline_seconds": old_s,
+                    "seconds": new_s,
+                })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmark",
+        description="Time each phase of the optimizer on synthetic instances."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES[:2],
+                        help=f"Task counts to benchmark (default: {DEFAULT_SIZES[:2]}, up to {DEFAULT_SIZES[-1]})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-limit", type=float, help="Gurobi TimeLimit per solve, in seconds")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip tracemalloc (less overhead, no per-phase memory peaks)")
+    parser.add_argument("--no-aggregate", action="store_true",
+                        help="One binary per task instead of grouping interchangeable tasks")
+    parser.add_argument("--capacity", choices=list(engine.CAPACITY_MODES), default=engine.DEFAULT_CAPACITY,
+                        help=f"Worker capacity formulation (default: {engine.DEFAULT_CAPACITY})")
+    parser.add_argument("--lazy-rounds", action="store_true",
+                        help="With --capacity lazy, add violated rows in cutting-plane rounds instead of a callback")
+    parser.add_argument("--placement", choices=list(engine.PLACEMENT_METHODS), default=engine.DEFAULT_PLACEMENT,
+                        help=f"Placement for the timed post_process phase (default: {engine.DEFAULT_PLACEMENT})")
+    parser.add_argument("--granularity", type=int, nargs="+", default=list(engine.DEFAULT_GRANULARITY),
+                        metavar="MINUTES", help="Coarse-to-fine steps between candidate task start times "
+                                                "(default: %(default)s)")
+    parser.add_argument("--formulation", choices=list(engine.FORMULATIONS), default=engine.DEFAULT_FORMULATION,
+                        help="Task model, demand buckets, or buckets past the size threshold "
+                             f"(default: {engine.DEFAULT_FORMULATION})")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    parser.add_argument("--baseline", help="Compare against an earlier JSON report")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown per phase before it counts as a regression")
+    args = parser.parse_args(argv)
+    try:
+        check_granularity(args.granularity)
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        report = run_benchmarks(args.sizes, seed=args.seed, time_limit=args.time_limit,
+                                track_memory=not args.no_memory, aggregate=not args.no_aggregate,
+                                capacity=args.capacity, lazy_rounds=args.lazy_rounds, placement=args.placement,
+                                granularity=args.granularity, formulation=args.formulation)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, tolerance=args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['tasks']} tasks, {r['phase']}: "
+                  f"{r['baseline_seconds']:.3f}s -> {r['seconds']:.3f}s")
+        if regressions:
+            return 1
+        print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
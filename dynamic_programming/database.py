@@ -0,0 +1,899 @@
+"""
+SQLite storage: task and shift tables, stored optimization runs and the
+example data sets.
+"""
+import json
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+DB_FILE = "tasksv2.db"
+
+
+# ------------------------------------------------------------------
+#                           Database
+# ------------------------------------------------------------------
+def init_db():
+    """
+    Initialize the database with necessary tables.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+
+    # Table: Tasks
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS TasksTable3 (
+            id INTEGER PRIMARY KEY,
+            TaskName TEXT NOT NULL,
+            Day TEXT NOT NULL,
+            StartTime TEXT NOT NULL,
+            EndTime TEXT NOT NULL,
+            Duration TEXT NOT NULL,
+            NursesRequired INTEGER NOT NULL
+        )
+    ''')
+
+    # Table: Shifts
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS ShiftsTable6 (
+        id INTEGER PRIMARY KEY,
+        StartTime TEXT NOT NULL,
+        EndTime TEXT NOT NULL,
+        BreakTime TEXT NOT NULL,
+        BreakDuration TEXT NOT NULL,
+        Weight FLOAT NOT NULL,
+
+        Monday INT NOT NULL,
+        Tuesday INT NOT NULL,
+        Wednesday INT NOT NULL,
+        Thursday INT NOT NULL,
+        Friday INT NOT NULL,
+        Saturday INT NOT NULL,
+        Sunday INT NOT NULL,
+
+        -- Add day-specific columns for needed workers
+        MondayNeeded INT DEFAULT 0,
+        TuesdayNeeded INT DEFAULT 0,
+        WednesdayNeeded INT DEFAULT 0,
+        ThursdayNeeded INT DEFAULT 0,
+        FridayNeeded INT DEFAULT 0,
+        SaturdayNeeded INT DEFAULT 0,
+        SundayNeeded INT DEFAULT 0
+    );
+    ''')
+
+    # Table: Nurse registry (who can be rostered onto the planned shifts)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS NursesTable (
+            id INTEGER PRIMARY KEY,
+            Name TEXT NOT NULL,
+            MaxWeeklyHours FLOAT NOT NULL,
+
+            -- Availability per day
+            Monday INT NOT NULL DEFAULT 1,
+            Tuesday INT NOT NULL DEFAULT 1,
+            Wednesday INT NOT NULL DEFAULT 1,
+            Thursday INT NOT NULL DEFAULT 1,
+            Friday INT NOT NULL DEFAULT 1,
+            Saturday INT NOT NULL DEFAULT 1,
+            Sunday INT NOT NULL DEFAULT 1,
+
+            -- JSON object shift id -> cost of this nurse working it; other shifts cost their Weight
+            ShiftCosts TEXT
+        )
+    ''')
+
+    # Table: Optimization runs (one row per solve)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS OptimizationRuns (
+            id INTEGER PRIMARY KEY,
+            CreatedAt TEXT NOT NULL,
+            Status TEXT NOT NULL,
+            ObjectiveValue FLOAT,
+            TotalCost FLOAT NOT NULL,
+            TotalWorkers INTEGER NOT NULL,
+            TotalTasks INTEGER NOT NULL
+        )
+    ''')
+
+    # Table: Task assignments of a run
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS RunAssignments (
+            id INTEGER PRIMARY KEY,
+            RunId INTEGER NOT NULL REFERENCES OptimizationRuns(id) ON DELETE CASCADE,
+            TaskId INTEGER NOT NULL,
+            TaskName TEXT NOT NULL,
+            Day TEXT NOT NULL,
+            TaskStart TEXT NOT NULL,
+            TaskEnd TEXT NOT NULL,
+            BeginTask TEXT NOT NULL,
+            EndTask TEXT NOT NULL,
+            ShiftId INTEGER NOT NULL,
+            ShiftStart TEXT NOT NULL,
+            ShiftEnd TEXT NOT NULL,
+            WorkersAssigned INTEGER NOT NULL,
+            HourlyRate FLOAT NOT NULL,
+            TaskCost FLOAT NOT NULL,
+            NumberOfNurses INTEGER NOT NULL,
+            CostPercent FLOAT NOT NULL
+        )
+    ''')
+
+    # Table: Nurses required per (shift, day) of a run
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS RunShiftRequirements (
+            id INTEGER PRIMARY KEY,
+            RunId INTEGER NOT NULL REFERENCES OptimizationRuns(id) ON DELETE CASCADE,
+            Day TEXT NOT NULL,
+            ShiftId INTEGER NOT NULL,
+            ShiftStart TEXT NOT NULL,
+            ShiftEnd TEXT NOT NULL,
+            NumberOfNurses INTEGER NOT NULL,
+            TaskCost FLOAT NOT NULL,
+            Weight FLOAT
+        )
+    ''')
+
+    # Table: Per-day totals of a run
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS RunDailySummary (
+            id INTEGER PRIMARY KEY,
+            RunId INTEGER NOT NULL REFERENCES OptimizationRuns(id) ON DELETE CASCADE,
+            Day TEXT NOT NULL,
+            TotalCost FLOAT NOT NULL,
+            TasksAssigned INTEGER NOT NULL,
+            WorkersAssigned INTEGER NOT NULL
+        )
+    ''')
+
+    # Results are always read back by run id
+    for table in ("RunAssignments", "RunShiftRequirements", "RunDailySummary"):
+        c.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_RunId ON {table} (RunId)")
+
+    # Table: Solver statistics (one row per solve, including failed ones)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS SolverTelemetry (
+            id INTEGER PRIMARY KEY,
+            SolvedAt TEXT NOT NULL,
+            Source TEXT NOT NULL,
+            RunId INTEGER REFERENCES OptimizationRuns(id) ON DELETE SET NULL,
+            NumTasks INTEGER NOT NULL,
+            NumShifts INTEGER NOT NULL,
+            NumDays INTEGER,
+            NursesRequired INTEGER,
+            NumVars INTEGER NOT NULL,
+            NumBinVars INTEGER,
+            NumConstrs INTEGER NOT NULL,
+            NumNZs INTEGER,
+            Status TEXT NOT NULL,
+            SolCount INTEGER,
+            ObjectiveValue FLOAT,
+            ObjectiveBound FLOAT,
+            MIPGap FLOAT,
+            NodeCount FLOAT,
+            IterCount FLOAT,
+            SolveSeconds FLOAT NOT NULL,
+            BuildSeconds FLOAT,
+            Threads INTEGER,
+            TimeLimit FLOAT,
+            Params TEXT,
+            Backend TEXT,
+            Cores INTEGER
+        )
+    ''')
+
+    # Table: Solver settings picked by the tuning command (latest row wins)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS TunedSolverSettings (
+            id INTEGER PRIMARY KEY,
+            CreatedAt TEXT NOT NULL,
+            Candidate TEXT NOT NULL,
+            Params TEXT NOT NULL,
+            Report TEXT
+        )
+    ''')
+
+    # Table: App reruns (one row per Streamlit script run)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS RerunProfiles (
+            id INTEGER PRIMARY KEY,
+            CreatedAt TEXT NOT NULL,
+            TriggerKey TEXT NOT NULL,
+            TotalMs FLOAT NOT NULL
+        )
+    ''')
+
+    # Table: Section timings of a rerun
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS RerunSections (
+            id INTEGER PRIMARY KEY,
+            RerunId INTEGER NOT NULL REFERENCES RerunProfiles(id) ON DELETE CASCADE,
+            Section TEXT NOT NULL,
+            Depth INTEGER NOT NULL,
+            WallMs FLOAT NOT NULL,
+            CpuMs FLOAT NOT NULL
+        )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_RerunSections_RerunId ON RerunSections (RerunId)")
+
+    conn.commit()
+    conn.close()
+
+# -------------------------- DB Helpers ---------------------------
+def add_task_to_db(TaskName, Day, StartTime, EndTime, Duration, NursesRequired):
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute('''
+        INSERT INTO TasksTable3 (TaskName, Day, StartTime, EndTime, Duration, NursesRequired)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (TaskName, Day, StartTime, EndTime, Duration, NursesRequired))
+    conn.commit()
+    conn.close()
+
+SHIFT_COLUMNS = [
+    "StartTime", "EndTime", "BreakTime", "BreakDuration", "Weight",
+    "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday",
+    "MondayNeeded", "TuesdayNeeded", "WednesdayNeeded", "ThursdayNeeded",
+    "FridayNeeded", "SaturdayNeeded", "SundayNeeded",
+]
+
+def add_shift_to_db(data):
+    """Insert a shift: values for the first 12 SHIFT_COLUMNS, optionally followed by the 7 *Needed minimums."""
+    columns = SHIFT_COLUMNS[:len(data)]
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute(
+        f"INSERT INTO ShiftsTable6 ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        data
+    )
+    conn.commit()
+    conn.close()
+
+NURSE_COLUMNS = [
+    "Name", "MaxWeeklyHours",
+    "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday",
+    "ShiftCosts",
+]
+
+def save_nurses(nurses_df):
+    """Replace the nurse registry with nurses_df (NURSE_COLUMNS, ids are reassigned)."""
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute("DELETE FROM NursesTable")
+    nurses_df[NURSE_COLUMNS].to_sql("NursesTable", conn, if_exists="append", index=False)
+    conn.commit()
+    conn.close()
+
+def get_all(table):
+    conn = sqlite3.connect(DB_FILE)
+    df = pd.read_sql_query(f"SELECT * FROM {table}", conn)
+    conn.close()
+    return df
+
+def clear_all(table):
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute(f"DELETE FROM {table}")
+    conn.commit()
+    conn.close()
+
+# ----------------------- Optimization Runs ------------------------
+# Result frame column -> database column, in display order
+ASSIGNMENT_COLUMNS = {
+    "Task ID": "TaskId",
+    "Task Name": "TaskName",
+    "Day": "Day",
+    "Task Start": "TaskStart",
+    "Task End": "TaskEnd",
+    "Begin Task": "BeginTask",
+    "End Task": "EndTask",
+    "Shift ID": "ShiftId",
+    "Shift Start": "ShiftStart",
+    "Shift End": "ShiftEnd",
+    "Workers Assigned": "WorkersAssigned",
+    "Hourly Rate (€)": "HourlyRate",
+    "Task Cost (€)": "TaskCost",
+    "Number of Nurses": "NumberOfNurses",
+    "Cost %": "CostPercent",
+}
+
+SHIFT_REQUIREMENT_COLUMNS = {
+    "Day": "Day",
+    "Shift ID": "ShiftId",
+    "Shift Start": "ShiftStart",
+    "Shift End": "ShiftEnd",
+    "Number of Nurses": "NumberOfNurses",
+    "Task Cost (€)": "TaskCost",
+    "Weight": "Weight",
+}
+
+DAILY_SUMMARY_COLUMNS = {
+    "Day": "Day",
+    "Total Cost (€)": "TotalCost",
+    "Tasks Assigned": "TasksAssigned",
+    "Workers Assigned": "WorkersAssigned",
+}
+
+def save_optimization_run(results_df, nurse_requirements_df, day_summary_df,
+                          status, objective_value=None):
+    """
+    Store the output of one optimization run and return its run id.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute('''
+        INSERT INTO OptimizationRuns (CreatedAt, Status, ObjectiveValue, TotalCost, TotalWorkers, TotalTasks)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (
+        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        str(status),
+        objective_value,
+        float(day_summary_df["Total Cost (€)"].sum()) if not day_summary_df.empty else 0.0,
+        int(day_summary_df["Workers Assigned"].sum()) if not day_summary_df.empty else 0,
+        len(results_df)
+    ))
+    run_id = c.lastrowid
+
+    for table, columns, df in (
+        ("RunAssignments", ASSIGNMENT_COLUMNS, results_df),
+        ("RunShiftRequirements", SHIFT_REQUIREMENT_COLUMNS, nurse_requirements_df),
+        ("RunDailySummary", DAILY_SUMMARY_COLUMNS, day_summary_df),
+    ):
+        if df.empty:
+            continue
+        frame = df[list(columns)].rename(columns=columns)
+        frame.insert(0, "RunId", run_id)
+        frame.to_sql(table, conn, if_exists="append", index=False)
+
+    conn.commit()
+    conn.close()
+    return run_id
+
+def get_optimization_runs():
+    """Return all stored runs, newest first."""
+    conn = sqlite3.connect(DB_FILE)
+    df = pd.read_sql_query("SELECT * FROM OptimizationRuns ORDER BY id DESC", conn)
+    conn.close()
+    return df
+
+def _read_run_frame(conn, table, columns, run_id):
+    df = pd.read_sql_query(
+        f"SELECT {', '.join(columns.values())} FROM {table} WHERE RunId = ? ORDER BY id",
+        conn,
+        params=(int(run_id),)
+    )
+    return df.rename(columns={db_col: col for col, db_col in columns.items()})
+
+def get_optimization_run(run_id):
+    """Return the OptimizationRuns row of a run, or None if it does not exist."""
+    conn = sqlite3.connect(DB_FILE)
+    run_df = pd.read_sql_query(
+        "SELECT * FROM OptimizationRuns WHERE id = ?", conn, params=(int(run_id),)
+    )
+    conn.close()
+    return None if run_df.empty else run_df.iloc[0]
+
+def load_optimization_run(run_id):
+    """
+    Load a stored run.
+    Returns (run_row, results_df, nurse_requirements_df, day_summary_df),
+    or None if the run does not exist.
+    """
+    run = get_optimization_run(run_id)
+    if run is None:
+        return None
+    conn = sqlite3.connect(DB_FILE)
+    results_df = _read_run_frame(conn, "RunAssignments", ASSIGNMENT_COLUMNS, run_id)
+    nurse_requirements_df = _read_run_frame(conn, "RunShiftRequirements", SHIFT_REQUIREMENT_COLUMNS, run_id)
+    day_summary_df = _read_run_frame(conn, "RunDailySummary", DAILY_SUMMARY_COLUMNS, run_id)
+    conn.close()
+
+    results_df["Shift"] = results_df["Shift Start"] + " - " + results_df["Shift End"]
+    nurse_requirements_df["Shift"] = (
+        nurse_requirements_df["Shift Start"] + " - " + nurse_requirements_df["Shift End"]
+    )
+    return run, results_df, nurse_requirements_df, day_summary_df
+
+def delete_optimization_runs():
+    """Remove every stored run together with its result rows."""
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    for table in ("RunAssignments", "RunShiftRequirements", "RunDailySummary", "OptimizationRuns"):
+        c.execute(f"DELETE FROM {table}")
+    conn.commit()
+    conn.close()
+
+
+# ----------------------- Solver Telemetry ------------------------
+def save_solver_telemetry(telemetry, run_id=None, source="app"):
+    """
+    Store the solver statistics of one solve (engine.collect_telemetry)
+    and return the row id.
+    """
+    row = {
+        "SolvedAt": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "Source": source,
+        "RunId": run_id,
+        **telemetry,
+    }
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute(
+        f"INSERT INTO SolverTelemetry ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+        tuple(row.values())
+    )
+    telemetry_id = c.lastrowid
+    conn.commit()
+    conn.close()
+    return telemetry_id
+
+def get_solver_telemetry():
+    """Return every recorded solve, oldest first."""
+    conn = sqlite3.connect(DB_FILE)
+    df = pd.read_sql_query("SELECT * FROM SolverTelemetry ORDER BY id", conn)
+    conn.close()
+    return df
+
+def delete_solver_telemetry():
+    """Remove every recorded solve."""
+    conn = sqlite3.connect(DB_FILE)
+    conn.execute("DELETE FROM SolverTelemetry")
+    conn.commit()
+    conn.close()
+
+# ---------------------- Tuned Solver Settings --------------------
+def save_tuned_settings(candidate, params, report=None):
+    """Store the settings chosen by a tuning run; they become the 'tuned' preset."""
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute(
+        "INSERT INTO TunedSolverSettings (CreatedAt, Candidate, Params, Report) VALUES (?, ?, ?, ?)",
+        (
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            candidate,
+            json.dumps(params),
+            json.dumps(report) if report is not None else None,
+        )
+    )
+    settings_id = c.lastrowid
+    conn.commit()
+    conn.close()
+    return settings_id
+
+def get_tuned_settings():
+    """
+    Return the most recent tuned settings as a dict with CreatedAt,
+    Candidate and Params (a dict), or None if tuning never ran.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    row = conn.execute(
+        "SELECT CreatedAt, Candidate, Params FROM TunedSolverSettings ORDER BY id DESC LIMIT 1"
+    ).fetchone()
+    conn.close()
+    if row is None:
+        return None
+    return {"CreatedAt": row[0], "Candidate": row[1], "Params": json.loads(row[2])}
+
+# ----------------------- Rerun Profiles --------------------------
+# Only the most recent reruns are kept, so percentiles are rolling
+RERUN_WINDOW = 1000
+
+def save_rerun_profile(trigger, spans, total_ms):
+    """
+    Store the section timings of one app rerun and drop reruns that
+    fell out of the rolling window. `spans` are Profiler spans.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute(
+        "INSERT INTO RerunProfiles (CreatedAt, TriggerKey, TotalMs) VALUES (?, ?, ?)",
+        (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), trigger, total_ms)
+    )
+    rerun_id = c.lastrowid
+    c.executemany(
+        "INSERT INTO RerunSections (RerunId, Section, Depth, WallMs, CpuMs) VALUES (?, ?, ?, ?, ?)",
+        [
+            (rerun_id, s["name"], s["depth"], s["wall_s"] * 1000, s["cpu_s"] * 1000)
+            for s in spans if "wall_s" in s
+        ]
+    )
+    c.execute("DELETE FROM RerunSections WHERE RerunId <= ?", (rerun_id - RERUN_WINDOW,))
+    c.execute("DELETE FROM RerunProfiles WHERE id <= ?", (rerun_id - RERUN_WINDOW,))
+    conn.commit()
+    conn.close()
+    return rerun_id
+
+def get_rerun_profiles():
+    """Return (reruns_df, sections_df) for the reruns in the window, newest first."""
+    conn = sqlite3.connect(DB_FILE)
+    reruns_df = pd.read_sql_query("SELECT * FROM RerunProfiles ORDER BY id DESC", conn)
+    sections_df = pd.read_sql_query('''
+        SELECT s.RerunId, s.Section, s.Depth, s.WallMs, s.CpuMs, r.TriggerKey
+        FROM RerunSections s JOIN RerunProfiles r ON r.id = s.RerunId
+        ORDER BY s.RerunId DESC, s.id
+    ''', conn)
+    conn.close()
+    return reruns_df, sections_df
+
+def delete_rerun_profiles():
+    """Remove every stored rerun profile."""
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    for table in ("RerunSections", "RerunProfiles"):
+        c.execute(f"DELETE FROM {table}")
+    conn.commit()
+    conn.close()
+
+
+# ------------------------------------------------------------------
+#                        Example Data Inserts
+# ------------------------------------------------------------------
+def insert():
+    """
+    Insert a small example data set into Tasks and Shifts.
+    (For demonstration)
+    """
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute('''
+        INSERT INTO TasksTable3 (
+            TaskName,
+            Day,
+            StartTime,
+            EndTime,
+            Duration,
+            NursesRequired
+        )
+        VALUES
+            ('Dressing Change', 'Monday', '07:30:00', '07:45:00', '0:15:00', 1),
+            ('Vital Signs Monitoring', 'Monday', '10:30:00', '11:00:00', '0:30:00', 2),
+            ('Wound Care', 'Monday', '14:30:00', '15:15:00', '0:45:00', 3),
+            ('Medication Administration', 'Monday', '22:00:00', '22:30:00', '0:30:00', 2),
+            ('Physical Therapy', 'Tuesday', '08:00:00', '08:45:00','0:45:00', 2),
+            ('Dressing Change', 'Tuesday', '13:30:00', '13:45:00', '0:15:00', 1),
+            ('Vital Signs Monitoring', 'Tuesday', '16:00:00', '16:30:00', '0:15:00', 2),
+            ('Medication Administration', 'Tuesday', '21:30:00', '22:00:00', '0:30:00', 2),
+            ('Wound Care', 'Wednesday', '07:30:00', '08:15:00', '0:45:00', 3),
+            ('Physical Therapy', 'Wednesday', '12:00:00', '12:45:00', '0:45:00', 2),
+            ('Dressing Change', 'Wednesday', '18:00:00', '18:15:00', '0:15:00', 1),
+            ('Vital Signs Monitoring', 'Thursday', '09:00:00', '09:30:00', '0:30:00', 2),
+            ('Medication Administration', 'Thursday', '13:00:00', '13:30:00', '0:30:00', 2),
+            ('Wound Care', 'Thursday', '17:30:00', '18:15:00', '0:45:00', 3),
+            ('Dressing Change', 'Friday', '07:30:00', '07:45:00', '0:15:00', 1),
+            ('Vital Signs Monitoring', 'Friday', '14:30:00', '15:00:00', '0:30:00', 2),
+            ('Medication Administration', 'Friday', '21:30:00', '22:00:00', '0:30:00', 2),
+            ('Wound Care', 'Saturday', '09:30:00', '10:15:00', '0:45:00', 3),
+            ('Physical Therapy', 'Saturday', '14:00:00', '14:45:00', '0:45:00', 2),
+            ('Vital Signs Monitoring', 'Saturday', '20:00:00', '20:30:00', '0:30:00', 2),
+            ('Dressing Change', 'Sunday', '14:30:00', '14:45:00', '0:15:00', 1),
+            ('Wound Care', 'Sunday', '20:00:00', '20:45:00', '0:15:00', 3);
+    ''')
+    conn.commit()
+    c.execute('''
+        INSERT INTO ShiftsTable6 (
+            StartTime,
+            EndTime,
+            BreakTime,
+            BreakDuration,
+            Weight,
+            Monday,
+            Tuesday,
+            Wednesday,
+            Thursday,
+            Friday,
+            Saturday,
+            Sunday
+        )
+        VALUES
+            ('07:00:00', '15:00:00', '11:00:00', '0:30:00', 1200, 1, 1, 1, 1, 1, 0, 0),
+            ('15:00:00', '23:00:00', '19:00:00', '0:30:00', 1400, 1, 1, 1, 1, 1, 1, 1),
+            ('23:00:00', '07:00:00', '03:00:00', '0:30:00', 1600, 1, 1, 1, 1, 1, 1, 1),
+            ('08:00:00', '14:00:00', '12:00:00', '0:20:00', 1000, 1, 1, 1, 1, 1, 0, 0),
+            ('14:00:00', '20:00:00', '17:00:00', '0:30:00', 1100, 1, 1, 1, 1, 1, 1, 1),
+            ('20:00:00', '02:00:00', '23:00:00', '0:20:00', 1300, 0, 1, 1, 1, 1, 1, 1),
+            ('09:00:00', '17:00:00', '13:00:00', '0:45:00', 1500, 1, 1, 0, 1, 1, 0, 0),
+            ('06:00:00', '14:00:00', '10:00:00', '0:30:00', 1100, 1, 1, 1, 1, 1, 1, 0),
+            ('14:00:00', '22:00:00', '18:00:00', '0:30:00', 1200, 1, 1, 1, 1, 1, 1, 1),
+            ('10:00:00', '18:00:00', '13:30:00', '0:30:00', 1300, 1, 1, 1, 1, 1, 0, 0);
+    ''')
+    conn.commit()
+    conn.close()
+
+def insert2():
+    """
+    Another example data set.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute('''
+        INSERT INTO TasksTable3 (
+            TaskName,
+            Day,
+            StartTime,
+            EndTime,
+            Duration,
+            NursesRequired
+        )
+        VALUES
+        ('Physical Therapy', 'Thursday', '07:00:00', '08:00:00', '0:45:00', 2),
+        ('Vital Signs Monitoring', 'Friday', '06:00:00', '06:30:00', '0:30:00', 5),
+        ('Vital Signs Monitoring', 'Wednesday', '05:30:00', '07:00:00', '1:00:00', 4),
+        ('Medication Administration', 'Monday', '04:00:00', '05:30:00', '0:45:00', 1),
+        ('Dressing Change', 'Saturday', '08:00:00', '10:00:00', '1:00:00', 4),
+        ('Wound Care', 'Sunday', '12:30:00', '13:00:00', '0:15:00', 3),
+        ('Vital Signs Monitoring', 'Thursday', '12:00:00', '13:00:00', '0:30:00', 5),
+        ('Physical Therapy', 'Wednesday', '20:30:00', '23:30:00', '0:45:00', 2),
+        ('Vital Signs Monitoring', 'Sunday', '21:30:00', '23:00:00', '0:30:00', 1),
+        ('Physical Therapy', 'Saturday', '18:00:00', '19:00:00', '0:30:00', 5),
+        ('Wound Care', 'Saturday', '00:00:00', '02:00:00', '1:00:00', 5),
+        ('Vital Signs Monitoring', 'Tuesday', '19:30:00', '22:00:00', '0:30:00', 4),
+        ('Wound Care', 'Monday', '19:00:00', '22:00:00', '0:15:00', 3),
+        ('Medication Administration', 'Sunday', '11:00:00', '13:00:00', '1:00:00', 4),
+        ('Physical Therapy', 'Thursday', '13:30:00', '16:30:00', '0:30:00', 1),
+        ('Wound Care', 'Wednesday', '08:30:00', '10:00:00', '0:15:00', 2),
+        ('Medication Administration', 'Tuesday', '17:00:00', '19:00:00', '1:00:00', 2),
+        ('Medication Administration', 'Saturday', '19:30:00', '22:30:00', '0:30:00', 4),
+        ('Dressing Change', 'Sunday', '15:30:00', '18:30:00', '0:15:00', 4),
+        ('Vital Signs Monitoring', 'Tuesday', '04:30:00', '06:30:00', '1:00:00', 1),
+        ('Wound Care', 'Wednesday', '22:00:00', '01:00:00', '0:30:00', 4),
+        ('Physical Therapy', 'Tuesday', '17:00:00', '18:00:00', '0:45:00', 5),
+        ('Dressing Change', 'Friday', '20:00:00', '21:30:00', '0:45:00', 3),
+        ('Physical Therapy', 'Thursday', '02:00:00', '04:00:00', '1:00:00', 5),
+        ('Dressing Change', 'Saturday', '22:00:00', '22:30:00', '0:30:00', 5),
+        ('Wound Care', 'Friday', '09:30:00', '11:00:00', '0:15:00', 3),
+        ('Vital Signs Monitoring', 'Saturday', '00:00:00', '03:00:00', '0:45:00', 3),
+        ('Medication Administration', 'Monday', '02:30:00', '03:30:00', '0:30:00', 4),
+        ('Vital Signs Monitoring', 'Monday', '12:30:00', '14:00:00', '0:30:00', 3),
+        ('Dressing Change', 'Tuesday', '17:00:00', '19:30:00', '0:30:00', 5),
+        ('Physical Therapy', 'Monday', '07:30:00', '08:00:00', '0:30:00', 4),
+        ('Dressing Change', 'Wednesday', '17:00:00', '18:00:00', '0:15:00', 1),
+        ('Physical Therapy', 'Thursday', '16:30:00', '17:00:00', '0:15:00', 2),
+        ('Wound Care', 'Friday', '00:00:00', '00:30:00', '0:15:00', 5),
+        ('Dressing Change', 'Friday', '18:30:00', '19:30:00', '0:45:00', 4),
+        ('Wound Care', 'Sunday', '20:30:00', '23:00:00', '0:45:00', 2),
+        ('Physical Therapy', 'Saturday', '09:00:00', '11:30:00', '1:00:00', 3),
+        ('Vital Signs Monitoring', 'Thursday', '14:00:00', '15:00:00', '0:30:00', 4),
+        ('Physical Therapy', 'Sunday', '13:00:00', '14:30:00', '0:15:00', 2),
+        ('Dressing Change', 'Monday', '07:00:00', '09:00:00', '0:30:00', 3),
+        ('Dressing Change', 'Sunday', '09:30:00', '10:00:00', '0:15:00', 2),
+        ('Vital Signs Monitoring', 'Monday', '12:30:00', '14:30:00', '0:15:00', 3),
+        ('Wound Care', 'Sunday', '21:00:00', '23:30:00', '0:15:00', 1),
+        ('Physical Therapy', 'Monday', '21:30:00', '22:30:00', '0:15:00', 5),
+        ('Medication Administration', 'Sunday', '15:00:00', '17:00:00', '0:45:00', 5),
+        ('Vital Signs Monitoring', 'Tuesday', '20:00:00', '21:30:00', '0:45:00', 2),
+        ('Wound Care', 'Monday', '06:30:00', '07:30:00', '0:15:00', 5),
+        ('Physical Therapy', 'Wednesday', '21:30:00', '23:00:00', '0:30:00', 1),
+        ('Physical Therapy', 'Friday', '17:30:00', '18:30:00', '1:00:00', 1),
+        ('Physical Therapy', 'Thursday', '16:00:00', '18:00:00', '0:30:00', 5),
+        ('Medication Administration', 'Thursday', '00:30:00', '02:00:00', '0:45:00', 2),
+        ('Vital Signs Monitoring', 'Sunday', '01:00:00', '02:00:00', '1:00:00', 2),
+        ('Medication Administration', 'Saturday', '14:00:00', '17:00:00', '0:45:00', 4),
+        ('Physical Therapy', 'Friday', '17:00:00', '20:00:00', '0:45:00', 4),
+        ('Physical Therapy', 'Sunday', '19:30:00', '20:30:00', '0:30:00', 4),
+        ('Wound Care', 'Thursday', '01:00:00', '04:00:00', '1:00:00', 4),
+        ('Wound Care', 'Saturday', '03:00:00', '05:00:00', '0:30:00', 5),
+        ('Vital Signs Monitoring', 'Tuesday', '08:30:00', '09:30:00', '0:45:00', 3),
+        ('Wound Care', 'Friday', '15:30:00', '16:00:00', '0:30:00', 2),
+        ('Physical Therapy', 'Wednesday', '17:00:00', '19:00:00', '0:30:00', 3),
+        ('Wound Care', 'Thursday', '06:30:00', '09:00:00', '1:00:00', 4),
+        ('Medication Administration', 'Tuesday', '13:00:00', '15:30:00', '1:00:00', 1),
+        ('Physical Therapy', 'Friday', '10:30:00', '13:30:00', '1:00:00', 5),
+        ('Dressing Change', 'Tuesday', '06:00:00', '06:30:00', '0:15:00', 3),
+        ('Physical Therapy', 'Sunday', '11:00:00', '14:00:00', '0:45:00', 2),
+        ('Physical Therapy', 'Friday', '12:00:00', '13:30:00', '0:45:00', 2),
+        ('Vital Signs Monitoring', 'Tuesday', '07:30:00', '10:00:00', '1:00:00', 1),
+        ('Dressing Change', 'Tuesday', '19:30:00', '20:30:00', '0:45:00', 4),
+        ('Wound Care', 'Thursday', '17:00:00', '17:30:00', '0:30:00', 3),
+        ('Dressing Change', 'Sunday', '04:00:00', '06:30:00', '0:45:00', 2),
+        ('Medication Administration', 'Thursday', '21:00:00', '23:00:00', '1:00:00', 3),
+        ('Medication Administration', 'Monday', '04:30:00', '07:30:00', '0:30:00', 4),
+        ('Physical Therapy', 'Friday', '21:00:00', '22:30:00', '0:45:00', 3),
+        ('Vital Signs Monitoring', 'Wednesday', '13:00:00', '15:00:00', '0:30:00', 4),
+        ('Wound Care', 'Saturday', '22:30:00', '01:00:00', '0:45:00', 1),
+        ('Physical Therapy', 'Tuesday', '08:00:00', '09:00:00', '0:45:00', 3),
+        ('Medication Administration', 'Sunday', '21:30:00', '00:30:00', '0:15:00', 3),
+        ('Physical Therapy', 'Sunday', '12:00:00', '14:30:00', '1:00:00', 3),
+        ('Physical Therapy', 'Sunday', '01:00:00', '03:00:00', '1:00:00', 3),
+        ('Medication Administration', 'Saturday', '13:30:00', '14:30:00', '0:15:00', 3),
+        ('Medication Administration', 'Tuesday', '18:00:00', '19:00:00', '0:15:00', 2),
+        ('Physical Therapy', 'Wednesday', '15:00:00', '15:30:00', '0:30:00', 2),
+        ('Wound Care', 'Sunday', '22:30:00', '01:30:00', '0:30:00', 4),
+        ('Physical Therapy', 'Friday', '03:30:00', '04:30:00', '0:15:00', 4),
+        ('Physical Therapy', 'Wednesday', '03:30:00', '04:30:00', '0:30:00', 5),
+        ('Vital Signs Monitoring', 'Friday', '06:30:00', '07:30:00', '0:15:00', 3),
+        ('Wound Care', 'Monday', '09:00:00', '10:00:00', '0:45:00', 2),
+        ('Dressing Change', 'Thursday', '12:30:00', '13:00:00', '0:30:00', 2),
+        ('Dressing Change', 'Friday', '09:30:00', '11:30:00', '0:30:00', 5),
+        ('Wound Care', 'Wednesday', '20:30:00', '22:30:00', '1:00:00', 3),
+        ('Vital Signs Monitoring', 'Saturday', '08:30:00', '09:30:00', '0:15:00', 4),
+        ('Dressing Change', 'Sunday', '20:00:00', '23:00:00', '0:30:00', 1),
+        ('Medication Administration', 'Thursday', '08:30:00', '11:00:00', '1:00:00', 2),
+        ('Vital Signs Monitoring', 'Thursday', '22:30:00', '23:30:00', '0:30:00', 3),
+        ('Physical Therapy', 'Tuesday', '21:30:00', '23:30:00', '1:00:00', 3),
+        ('Dressing Change', 'Wednesday', '04:30:00', '05:00:00', '0:30:00', 5),
+        ('Physical Therapy', 'Thursday', '15:30:00', '17:00:00', '1:00:00', 1),
+        ('Wound Care', 'Saturday', '21:30:00', '22:30:00', '0:45:00', 3),
+        ('Medication Administration', 'Saturday', '07:30:00', '09:30:00', '1:00:00', 3),
+        ('Physical Therapy', 'Friday', '20:30:00', '21:00:00', '0:15:00', 1);
+
+    ''')
+    conn.commit()
+    c.execute('''
+        INSERT INTO ShiftsTable6 (
+            StartTime,
+            EndTime,
+            BreakTime,
+            BreakDuration,
+            Weight,
+            Monday,
+            Tuesday,
+            Wednesday,
+            Thursday,
+            Friday,
+            Saturday,
+            Sunday
+        )
+        VALUES
+('06:15:00', '10:30:00', '08:30:00', '0:30:00', 4.25, 0, 1, 0, 0, 1, 0, 1),
+('14:15:00', '22:30:00', '16:45:00', '1:00:00', 8.25, 1, 1, 1, 0, 0, 1, 0),
+('20:00:00', '07:00:00', '22:00:00', '1:00:00', 11, 0, 1, 0, 1, 1, 0, 0),
+('04:00:00', '12:45:00', '06:00:00', '1:00:00', 8.75, 1, 0, 1, 0, 0, 0, 1),
+('12:30:00', '22:30:00', '14:30:00', '1:00:00', 10, 0, 0, 0, 0, 1, 0, 0),
+('02:00:00', '08:30:00', '04:15:00', '0:30:00', 6.5, 1, 1, 0, 1, 1, 1, 0),
+('20:00:00', '00:45:00', '22:00:00', '0:30:00', 4.75, 1, 0, 0, 1, 0, 1, 1),
+('15:30:00', '23:15:00', '17:00:00', '0:30:00', 7.75, 0, 1, 0, 1, 0, 0, 1),
+('19:15:00', '07:30:00', '21:30:00', '1:00:00', 12.25, 0, 0, 1, 1, 1, 1, 1),
+('18:00:00', '23:30:00', '20:15:00', '0:30:00', 5.5, 0, 0, 0, 1, 0, 0, 1),
+('05:15:00', '17:30:00', '07:30:00', '1:00:00', 12.25, 1, 1, 0, 0, 1, 1, 1),
+('08:30:00', '14:30:00', '10:45:00', '0:30:00', 6, 0, 1, 0, 1, 1, 0, 0),
+('19:30:00', '23:00:00', '21:00:00', '0:30:00', 3.5, 1, 0, 0, 0, 1, 0, 0),
+('15:15:00', '02:00:00', '17:30:00', '1:00:00', 10.75, 0, 1, 0, 1, 1, 1, 1),
+('05:30:00', '17:15:00', '07:30:00', '1:00:00', 11.75, 0, 1, 0, 1, 1, 1, 0),
+('18:00:00', '06:15:00', '20:00:00', '1:00:00', 12.25, 0, 1, 1, 1, 0, 1, 0),
+('04:45:00', '11:30:00', '06:00:00', '0:30:00', 6.75, 1, 0, 0, 1, 0, 1, 1),
+('23:30:00', '11:00:00', '01:45:00', '1:00:00', 11.5, 1, 0, 1, 1, 0, 0, 0),
+('23:45:00', '08:00:00', '01:15:00', '1:00:00', 8.25, 0, 1, 0, 1, 1, 0, 1),
+('03:30:00', '13:30:00', '05:30:00', '1:00:00', 10, 0, 1, 1, 0, 0, 0, 1),
+('14:15:00', '01:30:00', '16:00:00', '1:00:00', 11.25, 1, 1, 1, 0, 1, 1, 0),
+('21:00:00', '01:00:00', '23:15:00', '0:30:00', 4, 0, 1, 1, 0, 0, 1, 0),
+('10:30:00', '16:15:00', '12:15:00', '0:30:00', 5.75, 0, 1, 1, 1, 1, 0, 0),
+('20:45:00', '01:15:00', '22:30:00', '0:30:00', 4.5, 1, 1, 1, 1, 0, 0, 1),
+('02:15:00', '13:30:00', '04:30:00', '1:00:00', 11.25, 1, 0, 0, 1, 0, 0, 1),
+('08:15:00', '16:45:00', '10:45:00', '1:00:00', 8.5, 0, 0, 0, 0, 0, 0, 0),
+('11:15:00', '20:30:00', '13:00:00', '1:00:00', 9.25, 0, 0, 0, 0, 1, 0, 0),
+('22:00:00', '04:00:00', '00:30:00', '0:30:00', 6, 1, 1, 0, 0, 1, 1, 0),
+('22:00:00', '10:00:00', '00:00:00', '1:00:00', 12, 1, 1, 0, 0, 1, 0, 0),
+('09:30:00', '16:45:00', '11:00:00', '0:30:00', 7.25, 0, 0, 0, 0, 1, 1, 1),
+('09:15:00', '20:15:00', '11:30:00', '1:00:00', 11, 1, 1, 1, 1, 0, 0, 1),
+('04:30:00', '12:45:00', '06:30:00', '1:00:00', 8.25, 0, 1, 1, 1, 1, 0, 1),
+('18:30:00', '03:30:00', '20:00:00', '1:00:00', 9, 1, 1, 1, 0, 1, 1, 0),
+('16:30:00', '04:00:00', '18:45:00', '1:00:00', 11.5, 0, 0, 0, 1, 1, 0, 1),
+('17:30:00', '22:00:00', '19:30:00', '0:30:00', 4.5, 0, 1, 0, 1, 0, 0, 1),
+('19:00:00', '05:45:00', '21:00:00', '1:00:00', 10.75, 0, 1, 0, 1, 1, 0, 1),
+('21:00:00', '07:00:00', '23:00:00', '1:00:00', 10, 1, 0, 1, 1, 0, 1, 0),
+('23:45:00', '09:15:00', '01:15:00', '1:00:00', 9.5, 1, 0, 1, 0, 0, 1, 1),
+('21:45:00', '04:45:00', '23:15:00', '0:30:00', 7, 1, 1, 1, 0, 0, 0, 1),
+('00:30:00', '09:45:00', '02:00:00', '1:00:00', 9.25, 0, 1, 0, 1, 0, 0, 0),
+('23:45:00', '09:30:00', '01:45:00', '1:00:00', 9.75, 0, 1, 1, 0, 1, 0, 1),
+('22:15:00', '07:45:00', '00:45:00', '1:00:00', 9.5, 0, 1, 0, 1, 1, 1, 1),
+('01:15:00', '06:00:00', '03:00:00', '0:30:00', 4.75, 1, 0, 0, 1, 0, 0, 0),
+('17:15:00', '01:30:00', '19:15:00', '1:00:00', 8.25, 0, 1, 1, 1, 1, 0, 1),
+('15:00:00', '01:30:00', '17:00:00', '1:00:00', 10.5, 0, 0, 0, 0, 0, 1, 1),
+('23:45:00', '03:00:00', '01:30:00', '0:30:00', 3.25, 0, 1, 1, 0, 0, 1, 1),
+('22:45:00', '05:15:00', '00:00:00', '0:30:00', 6.5, 0, 0, 1, 1, 0, 1, 0),
+('22:15:00', '03:15:00', '00:30:00', '0:30:00', 5, 0, 0, 0, 1, 1, 1, 1),
+('17:45:00', '03:30:00', '19:15:00', '1:00:00', 9.75, 1, 0, 1, 0, 1, 0, 1),
+('04:15:00', '16:45:00', '06:30:00', '1:00:00', 12.5, 1, 0, 0, 1, 1, 0, 0),
+('17:00:00', '03:30:00', '19:00:00', '1:00:00', 10.5, 1, 0, 1, 1, 1, 0, 0),
+('06:45:00', '16:15:00', '08:45:00', '1:00:00', 9.5, 1, 0, 1, 1, 1, 0, 1),
+('21:00:00', '04:15:00', '23:00:00', '0:30:00', 7.25, 0, 1, 0, 1, 0, 1, 0),
+('11:15:00', '20:00:00', '13:15:00', '1:00:00', 8.75, 1, 1, 0, 0, 0, 1, 1),
+('22:00:00', '08:30:00', '00:00:00', '1:00:00', 10.5, 1, 1, 1, 0, 1, 0, 1),
+('21:15:00', '01:15:00', '23:30:00', '0:30:00', 4, 1, 1, 1, 0, 0, 0, 0),
+('02:00:00', '09:45:00', '04:00:00', '0:30:00', 7.75, 0, 1, 1, 1, 1, 0, 0),
+('08:30:00', '18:30:00', '10:45:00', '1:00:00', 10, 0, 0, 1, 1, 1, 1, 1),
+('22:45:00', '05:30:00', '00:15:00', '0:30:00', 6.75, 1, 1, 1, 1, 0, 0, 1),
+('23:30:00', '03:45:00', '01:45:00', '0:30:00', 4.25, 1, 0, 1, 0, 0, 0, 0),
+('15:15:00', '02:30:00', '17:15:00', '1:00:00', 11.25, 0, 0, 0, 0, 1, 0, 0),
+('20:45:00', '05:00:00', '22:00:00', '1:00:00', 8.25, 1, 0, 0, 0, 1, 0, 1),
+('19:00:00', '04:30:00', '21:45:00', '1:00:00', 9.5, 1, 1, 1, 1, 1, 1, 1),
+('10:30:00', '16:45:00', '12:45:00', '0:30:00', 6.25, 1, 1, 1, 1, 1, 0, 0),
+('20:45:00', '03:30:00', '22:00:00', '0:30:00', 6.75, 1, 0, 0, 0, 0, 0, 1),
+('01:45:00', '10:45:00', '03:45:00', '1:00:00', 9, 1, 1, 1, 1, 1, 1, 0),
+('01:30:00', '13:30:00', '03:45:00', '1:00:00', 12, 0, 0, 0, 1, 1, 0, 1),
+('19:45:00', '01:15:00', '21:30:00', '0:30:00', 5.5, 0, 0, 1, 0, 1, 0, 1),
+('13:45:00', '01:15:00', '15:00:00', '1:00:00', 11.5, 0, 0, 1, 0, 1, 1, 1),
+('19:45:00', '06:30:00', '21:00:00', '1:00:00', 10.75, 1, 0, 0, 1, 0, 1, 1),
+('14:15:00', '19:00:00', '16:00:00', '0:30:00', 4.75, 1, 1, 0, 1, 1, 0, 0),
+('10:30:00', '22:15:00', '12:15:00', '1:00:00', 11.75, 1, 0, 1, 0, 1, 1, 0),
+('21:45:00', '05:30:00', '23:00:00', '0:30:00', 7.75, 1, 0, 1, 1, 0, 0, 0),
+('20:45:00', '01:00:00', '22:15:00', '0:30:00', 4.25, 1, 1, 1, 0, 0, 1, 1),
+('14:00:00', '22:00:00', '16:30:00', '0:30:00', 8, 0, 0, 1, 0, 0, 0, 0),
+('17:30:00', '21:45:00', '19:30:00', '0:30:00', 4.25, 0, 1, 0, 1, 0, 0, 0),
+('20:30:00', '08:00:00', '22:45:00', '1:00:00', 11.5, 0, 0, 1, 0, 0, 1, 1),
+('15:00:00', '01:30:00', '17:00:00', '1:00:00', 10.5, 1, 0, 0, 0, 0, 1, 0),
+('19:45:00', '02:15:00', '21:30:00', '0:30:00', 6.5, 0, 0, 0, 1, 1, 0, 1),
+('03:00:00', '13:15:00', '05:30:00', '1:00:00', 10.25, 1, 0, 1, 0, 1, 0, 1),
+('03:15:00', '13:45:00', '05:15:00', '1:00:00', 10.5, 0, 0, 1, 0, 1, 0, 1),
+('03:00:00', '08:45:00', '05:30:00', '0:30:00', 5.75, 0, 0, 1, 0, 0, 1, 0),
+('08:15:00', '16:15:00', '10:45:00', '0:30:00', 8, 0, 0, 1, 0, 0, 0, 1),
+('04:45:00', '13:15:00', '06:00:00', '1:00:00', 8.5, 1, 1, 1, 1, 0, 0, 1),
+('13:15:00', '22:00:00', '15:15:00', '1:00:00', 8.75, 1, 1, 1, 1, 1, 1, 1),
+('11:15:00', '18:30:00', '13:00:00', '0:30:00', 7.25, 0, 1, 1, 0, 1, 0, 0),
+('21:00:00', '04:15:00', '23:00:00', '0:30:00', 7.25, 1, 1, 0, 0, 1, 0, 0),
+('00:00:00', '10:45:00', '02:15:00', '1:00:00', 10.75, 0, 0, 1, 1, 1, 1, 1),
+('09:15:00', '20:00:00', '11:00:00', '1:00:00', 10.75, 1, 0, 1, 1, 0, 0, 1),
+('12:30:00', '17:15:00', '14:30:00', '0:30:00', 4.75, 0, 0, 1, 0, 0, 0, 0),
+('05:15:00', '11:45:00', '07:45:00', '0:30:00', 6.5, 0, 1, 0, 1, 1, 1, 1),
+('10:00:00', '15:45:00', '12:00:00', '0:30:00', 5.75, 1, 1, 0, 1, 1, 1, 1),
+('08:45:00', '20:30:00', '10:45:00', '1:00:00', 11.75, 0, 1, 0, 0, 1, 0, 1),
+('01:45:00', '05:15:00', '03:15:00', '0:30:00', 3.5, 1, 0, 1, 0, 1, 1, 0),
+('10:15:00', '15:00:00', '12:15:00', '0:30:00', 4.75, 0, 1, 0, 1, 1, 1, 0),
+('21:30:00', '09:00:00', '23:45:00', '1:00:00', 11.5, 1, 0, 1, 0, 0, 0, 1),
+('13:45:00', '21:00:00', '15:45:00', '0:30:00', 7.25, 1, 0, 1, 0, 1, 1, 1),
+('18:00:00', '23:30:00', '20:00:00', '0:30:00', 5.5, 1, 1, 0, 0, 1, 0, 1),
+('22:15:00', '03:45:00', '00:15:00', '0:30:00', 5.5, 1, 0, 1, 1, 0, 0, 1),
+('11:30:00', '22:45:00', '13:30:00', '1:00:00', 11.25, 1, 1, 0, 1, 0, 0, 1);
+    ''')
+    conn.commit()
+    conn.close()
+
+def insert3():
+    """
+    Insert a really small example data set into Tasks and Shifts.
+    (For demonstration)
+    """
+    conn = sqlite3.connect(DB_FILE)
+    c = conn.cursor()
+    c.execute('''
+        INSERT INTO TasksTable3 (
+            TaskName,
+            Day,
+            StartTime,
+            EndTime,
+            Duration,
+            NursesRequired
+        )
+        VALUES
+            ('task 1', 'Monday', '09:00:00', '10:00:00', '0:30:00', 4),
+            ('task 2', 'Monday', '09:00:00', '10:00:00', '0:30:00', 20),
+            ('task 3', 'Monday', '09:00:00', '10:00:00', '0:30:00', 5),
+            ('task 4', 'Monday', '09:00:00', '10:00:00', '0:30:00', 11),
+            ('task 5', 'Monday', '09:00:00', '10:00:00', '0:30:00', 1),
+            ('task 6', 'Monday', '08:30:00', '10:00:00', '0:30:00', 1),
+            ('task 7', 'Tuesday', '09:00:00', '10:00:00', '0:30:00', 1),
+            ('task 8', 'Tuesday', '09:00:00', '10:00:00', '0:30:00', 20),
+            ('task 9', 'Tuesday', '09:00:00', '10:00:00', '0:30:00', 9),
+            ('task 10', 'Monday', '12:00:00', '12:30:00', '0:15:00', 5),
+            ('task 11', 'Tuesday', '12:00:00', '12:30:00', '0:15:00', 10),
+            ('task 12', 'Tuesday', '02:00:00', '04:30:00', '01:00:00', 10),
+            ('task 13', 'Monday', '15:00:00', '19:30:00', '01:00:00', 10);
+
+              
+    ''')
+    conn.commit()
+    c.execute('''
+        INSERT INTO ShiftsTable6 (
+            StartTime,
+            EndTime,
+            BreakTime,
+            BreakDuration,
+            Weight,
+            Monday,
+            Tuesday,
+            Wednesday,
+            Thursday,
+            Friday,
+            Saturday,
+            Sunday
+        )
+        VALUES
+            ('07:00:00', '12:00:00', '08:30:00', '0:30:00', 10, 1, 1, 1, 1, 1, 1, 1),
+            ('07:30:00', '12:30:00', '08:30:00', '0:30:00', 20, 1, 1, 1, 1, 1, 1, 1),
+            ('00:30:00', '04:30:00', '01:30:00', '0:30:00', 5, 1, 1, 1, 1, 1, 1, 1),
+            ('14:30:00', '19:30:00', '17:30:00', '0:30:00', 5, 1, 1, 1, 1, 1, 1, 1);
+           
+    ''')
+    conn.commit()
+    conn.close()
@@ -0,0 +1,2137 @@
+"""
+Headless optimization engine.
+
+Loads tasks and shifts, builds and solves the task-shift assignment
+model with Gurobi, and turns the solution into result frames. Nothing in
+here depends on Streamlit, so it can be used from the app, a notebook, a
+benchmark or the command line:
+
+    python -m engine --db tasksv2.db --output results/
+"""
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, date
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from gurobipy import Env, Model, GRB, GurobiError, gurobi, quicksum
+
+from instrumentation import Profiler, span
+from local_search import LocalSearchWorker
+from placement import (
+    DEFAULT_GRANULARITY, INTERVAL_MINUTES, MAX_EXACT_TASKS, ShiftPlacement, assign_lanes, check_granularity,
+    place_tasks, shift_periods, start_slots,
+)
+
+logger = logging.getLogger(__name__)
+
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+TASKS_TABLE = "TasksTable3"
+SHIFTS_TABLE = "ShiftsTable6"
+
+RESULT_COLUMNS = [
+    "Task ID", "Task Name", "Day", "Task Start", "Task End", "Begin Task", "End Task",
+    "Shift ID", "Shift Start", "Shift End", "Workers Assigned", "Hourly Rate (€)",
+    "Task Cost (€)", "Number of Nurses", "Cost %",
+]
+
+ROSTER_COLUMNS = ["Day", "Shift ID", "Shift", "Nurse", "Begin Task", "End Task", "Task ID", "Task Name"]
+
+# Gurobi status code -> name, e.g. 2 -> "OPTIMAL"
+STATUS_NAMES = {
+    getattr(GRB.Status, name): name
+    for name in dir(GRB.Status)
+    if name.isupper()
+}
+
+# Named Gurobi parameter sets. Threads 0 lets Gurobi use every core.
+SOLVER_PRESETS = {
+    # A good plan quickly: heuristics first, stop at 2% or after 10 s
+    "fast-preview": {
+        "Threads": 0, "MIPFocus": 1, "Presolve": 1, "Heuristics": 0.2,
+        "TimeLimit": 10, "MIPGap": 0.02,
+    },
+    # Gurobi's defaults with a one-minute cap
+    "balanced": {
+        "Threads": 0, "MIPFocus": 0, "Presolve": -1, "Heuristics": 0.05,
+        "TimeLimit": 60,
+    },
+    # Spend the effort on the bound until optimality is proven
+    "prove-optimal": {
+        "Threads": 0, "MIPFocus": 2, "Presolve": 2, "Heuristics": 0.05,
+        "TimeLimit": 3600, "MIPGap": 0.0,
+    },
+}
+DEFAULT_PRESET = "balanced"
+TUNED_PRESET = "tuned"
+
+
+def solver_presets(tuned_settings=None):
+    """
+    The named presets, plus a 'tuned' preset when tuned_settings (as
+    returned by database.get_tuned_settings) are given.
+    """
+    presets = dict(SOLVER_PRESETS)
+    if tuned_settings is not None:
+        presets[TUNED_PRESET] = tuned_settings["Params"]
+    return presets
+
+
+def default_preset(presets):
+    """The tuned preset when there is one, otherwise DEFAULT_PRESET."""
+    return TUNED_PRESET if TUNED_PRESET in presets else DEFAULT_PRESET
+
+# Statuses without a usable plan, even if the solver reports a solution count
+NO_PLAN_STATUSES = {GRB.INFEASIBLE, GRB.INF_OR_UNBD, GRB.UNBOUNDED, GRB.LOADED}
+
+
+class OptimizationInputError(ValueError):
+    """Raised when the tasks or shifts needed for a run are missing."""
+
+
+@dataclass
+class OptimizationResult:
+    """Outcome of one optimization run."""
+    status: str
+    objective_value: Optional[float] = None
+    mip_gap: Optional[float] = None
+    objective_bound: Optional[float] = None
+    results_df: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=RESULT_COLUMNS))
+    nurse_requirements_df: pd.DataFrame = field(default_factory=pd.DataFrame)
+    day_summary_df: pd.DataFrame = field(default_factory=pd.DataFrame)
+    timings: Dict[str, float] = field(default_factory=dict)  # phase -> seconds
+    num_vars: int = 0
+    num_constrs: int = 0
+    infeasible_constraints: List[str] = field(default_factory=list)
+    screening: Optional["ScreeningReport"] = None
+    pruned_shifts: pd.DataFrame = field(default_factory=pd.DataFrame)
+    telemetry: Dict[str, object] = field(default_factory=dict)  # see collect_telemetry
+    formulation: str = "tasks"  # the FORMULATIONS entry that was solved
+    model_size: Optional["ModelSize"] = None  # projected before the build
+    size_notes: List[str] = field(default_factory=list)  # see check_model_size
+
+    @property
+    def is_optimal(self):
+        return self.status == "OPTIMAL"
+
+    @property
+    def has_solution(self):
+        """True when there is a plan, proven optimal or the best found before a stop."""
+        return self.objective_value is not None
+
+    @property
+    def total_cost(self):
+        if self.day_summary_df.empty:
+            return 0.0
+        return float(self.day_summary_df["Total Cost (€)"].sum())
+
+    @property
+    def total_workers(self):
+        if self.day_summary_df.empty:
+            return 0
+        return int(self.day_summary_df["Workers Assigned"].sum())
+
+    @property
+    def total_tasks(self):
+        return len(self.results_df)
+
+    def frames(self):
+        """The result frames keyed the way the export module expects them."""
+        return {
+            "results_df": self.results_df,
+            "nurse_requirements_df": self.nurse_requirements_df,
+            "day_summary_df": self.day_summary_df,
+            "roster_df": nurse_roster(self.results_df),
+        }
+
+    def summary(self):
+        return {
+            "status": self.status,
+            "objective_value": self.objective_value,
+            "mip_gap": self.mip_gap,
+            "objective_bound": self.objective_bound,
+            "total_cost": self.total_cost,
+            "total_workers": self.total_workers,
+            "total_tasks": self.total_tasks,
+            "num_vars": self.num_vars,
+            "num_constrs": self.num_constrs,
+            "screening": self.screening.counts() if self.screening is not None else None,
+            "pruned_shifts": len(self.pruned_shifts),
+            "formulation": self.formulation,
+            "model_size": self.model_size.as_dict() if self.model_size is not None else None,
+            "size_notes": self.size_notes,
+            "timings": self.timings,
+            "telemetry": self.telemetry,
+        }
+
+
+# ------------------------------------------------------------------
+#                           Data Loading
+# ------------------------------------------------------------------
+def load_tables(db_file):
+    """Read the task and shift tables from a database file."""
+    conn = sqlite3.connect(db_file)
+    tasks_df = pd.read_sql_query(f"SELECT * FROM {TASKS_TABLE}", conn)
+    shifts_df = pd.read_sql_query(f"SELECT * FROM {SHIFTS_TABLE}", conn)
+    conn.close()
+    return tasks_df, shifts_df
+
+
+def prepare_tables(tasks_df, shifts_df):
+    """
+    Return copies of the tables with StartTime/EndTime parsed to time objects.
+    """
+    tasks_df = tasks_df.copy()
+    shifts_df = shifts_df.copy()
+
+    # Adjust your time format if it's not "%H:%M:%S"
+    tasks_df["StartTime"] = pd.to_datetime(tasks_df["StartTime"], format="%H:%M:%S").dt.time
+    tasks_df["EndTime"]   = pd.to_datetime(tasks_df["EndTime"],   format="%H:%M:%S").dt.time
+
+    shifts_df["StartTime"] = pd.to_datetime(shifts_df["StartTime"], format="%H:%M:%S").dt.time
+    shifts_df["EndTime"]   = pd.to_datetime(shifts_df["EndTime"],   format="%H:%M:%S").dt.time
+    return tasks_df, shifts_df
+
+
+def _minutes(times):
+    """Series of time objects -> numpy array of minutes since midnight."""
+    return np.array([t.hour * 60 + t.minute for t in times], dtype=np.int64)
+
+
+def _clock_minutes(values):
+    """Series of "HH:MM:SS" strings -> numpy array of minutes."""
+    return pd.to_timedelta(values.astype(str)).dt.total_seconds().to_numpy() / 60
+
+
+def _duration_minutes(values):
+    """Duration column -> minutes; plain numbers are minutes, strings are "H:MM:SS"."""
+    numeric = pd.to_numeric(values, errors="coerce")
+    if numeric.notna().all():
+        return numeric.to_numpy(dtype=float)
+    return _clock_minutes(values)
+
+
+def format_clock(minutes):
+    """Minutes since midnight -> "HH:MM:SS" (wrapping past midnight)."""
+    minutes = int(minutes) % (24 * 60)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}:00"
+
+
+def format_duration(minutes):
+    """Minutes -> "H:MM:SS", the format used by the Duration columns."""
+    minutes = int(minutes)
+    return f"{minutes // 60}:{minutes % 60:02d}:00"
+
+
+def fits_outside_break(task_start, task_end, duration, shift_start, shift_end, break_start, break_end):
+    """
+    Whether a task's duration fits in its window before or after a
+    shift's break, in the shift's break-free periods as placed by the
+    post-pass (minute arrays, broadcast against each other).
+    """
+    before = (shift_start < break_start) & (
+        np.minimum(task_end, break_start) - np.maximum(task_start, shift_start) >= duration
+    )
+    after = (break_end < shift_end) & (
+        np.minimum(task_end, shift_end) - np.maximum(task_start, break_end) >= duration
+    )
+    return before | after
+
+
+@dataclass
+class ScreeningReport:
+    """
+    Problems found before the model is built. Each frame holds the
+    offending (prepared) task rows plus a Reason column.
+    """
+    uncovered: pd.DataFrame
+    break_conflicts: pd.DataFrame
+    capacity_conflicts: pd.DataFrame
+
+    @property
+    def ok(self):
+        return self.uncovered.empty and self.break_conflicts.empty and self.capacity_conflicts.empty
+
+    def counts(self):
+        return {
+            "uncovered": len(self.uncovered),
+            "break_conflicts": len(self.break_conflicts),
+            "capacity_conflicts": len(self.capacity_conflicts),
+        }
+
+    def frame(self):
+        """All problems in one frame, one row per (task, problem)."""
+        return pd.concat(
+            [self.capacity_conflicts, self.uncovered, self.break_conflicts], ignore_index=True
+        )
+
+
+def screen_instance(tasks_df, shifts_df):
+    """
+    Vectorized pre-solve check of prepared tables. Reports
+      - capacity conflicts: tasks whose duration does not fit their own
+        time window (or whose window ends before it starts, e.g. across
+        midnight), so no shift can ever hold them;
+      - uncovered tasks: no shift active on the task's day contains its
+        window (these get no variables and drop out of the plan);
+      - break conflicts: covering shifts exist, but in none of them does
+        the task fit before or after the break (post-processing would
+        have nowhere to place it, so these get no variables either).
+    """
+    task_start = _minutes(tasks_df["StartTime"]).astype(float)
+    task_end = _minutes(tasks_df["EndTime"]).astype(float)
+    duration = _duration_minutes(tasks_df["Duration"])
+    task_days = tasks_df["Day"].to_numpy()
+
+    shift_start = _minutes(shifts_df["StartTime"]).astype(float)
+    shift_end = _minutes(shifts_df["EndTime"]).astype(float)
+    break_start = _clock_minutes(shifts_df["BreakTime"])
+    break_end = break_start + _clock_minutes(shifts_df["BreakDuration"])
+
+    n_covering = np.zeros(len(tasks_df), dtype=int)
+    n_fitting = np.zeros(len(tasks_df), dtype=int)
+    for day in DAY_NAMES:
+        on_day = task_days == day
+        active = shifts_df[day].to_numpy() == 1
+        if not on_day.any() or not active.any():
+            continue
+        ts, te, dur = task_start[on_day][:, None], task_end[on_day][:, None], duration[on_day][:, None]
+        ss, se = shift_start[active][None, :], shift_end[active][None, :]
+        bs, be = break_start[active][None, :], break_end[active][None, :]
+
+        covers = (ss <= ts) & (se >= te)
+        n_covering[on_day] = covers.sum(axis=1)
+        n_fitting[on_day] = (covers & fits_outside_break(ts, te, dur, ss, se, bs, be)).sum(axis=1)
+
+    window = task_end - task_start
+    too_long = duration > window
+    uncovered = (n_covering == 0) & ~too_long
+    break_conflict = (n_covering > 0) & (n_fitting == 0) & ~too_long
+
+    def rows(mask, reason):
+        df = tasks_df[mask].copy()
+        df["Reason"] = reason[mask] if isinstance(reason, np.ndarray) else reason
+        df["Covering Shifts"] = n_covering[mask]
+        return df
+
+    return ScreeningReport(
+        uncovered=rows(uncovered, "No shift active on this day covers the task window"),
+        break_conflicts=rows(break_conflict, "Does not fit before or after the break of any covering shift"),
+        capacity_conflicts=rows(too_long, np.where(
+            window <= 0,
+            "Task window ends before it starts (crosses midnight?)",
+            "Duration is longer than the task window",
+        )),
+    )
+
+
+# Minimum workers of a shift per day (see minimum_staffing)
+NEEDED_COLUMNS = [f"{day}Needed" for day in DAY_NAMES]
+
+
+def minimum_staffing(shifts_df):
+    """
+    {(shift_id, day): workers} from the *Needed columns: the fewest
+    workers a shift has on a day it is active, whatever its tasks need.
+    Minimums on days a shift is not active, and missing columns, count
+    as none.
+    """
+    minimum = {}
+    for day, column in zip(DAY_NAMES, NEEDED_COLUMNS):
+        if column not in shifts_df:
+            continue
+        needed = pd.to_numeric(shifts_df[column], errors="coerce").fillna(0).astype(int)
+        needed = needed[(needed > 0) & (shifts_df[day] == 1)]
+        minimum.update({(shift_id, day): int(workers) for shift_id, workers in needed.items()})
+    return minimum
+
+
+def prune_shifts(shifts_df):
+    """
+    Drop shifts that can never lower the cost of a plan (prepared table):
+      - inactive: not active on any day;
+      - duplicates: same times, break and days as a cheaper (or equally
+        priced, lower id) shift;
+      - dominated: another shift spans the whole shift on every one of
+        its days, at a lower or equal weight, and its break does not
+        fall in the shift's working time.
+    Shifts with a minimum staffing (minimum_staffing) are kept.
+    Returns (kept_df, removed_df); removed_df has Reason and KeptShift
+    (the index of the shift that replaces it) columns.
+    """
+    n = len(shifts_df)
+    days = shifts_df[DAY_NAMES].to_numpy() == 1
+    start = _minutes(shifts_df["StartTime"])
+    end = _minutes(shifts_df["EndTime"])
+    break_start = _clock_minutes(shifts_df["BreakTime"])
+    break_end = break_start + _clock_minutes(shifts_df["BreakDuration"])
+    weight = shifts_df["Weight"].to_numpy(dtype=float)
+    required = shifts_df.index.isin({shift_id for shift_id, _ in minimum_staffing(shifts_df)})
+
+    # [a, b]: shift a can replace shift b
+    same_or_more_days = (days[:, None, :] | ~days[None, :, :]).all(axis=2)
+    cheaper = weight[:, None] <= weight[None, :]
+    identical = (
+        (start[:, None] == start[None, :]) & (end[:, None] == end[None, :])
+        & (break_start[:, None] == break_start[None, :]) & (break_end[:, None] == break_end[None, :])
+        & (days[:, None, :] == days[None, :, :]).all(axis=2)
+    )
+    same_day = start < end  # overnight shifts only match as duplicates
+    covers = (
+        same_day[:, None] & same_day[None, :]
+        & (start[:, None] <= start[None, :]) & (end[:, None] >= end[None, :])
+    )
+    break_outside = (
+        (break_end[:, None] <= start[None, :]) | (break_start[:, None] >= end[None, :])
+        | ((break_start[:, None] >= break_start[None, :]) & (break_end[:, None] <= break_end[None, :]))
+    )
+    replaces = (identical | (covers & break_outside & same_or_more_days)) & cheaper
+    np.fill_diagonal(replaces, False)
+    inactive = ~days.any(axis=1) & ~required
+
+    # Cheapest, longest, most active shifts first; a shift is removed only
+    # if a shift that is kept can replace it
+    order = np.lexsort((np.arange(n), -days.sum(axis=1), -(end - start), weight))
+    kept = np.zeros(n, dtype=bool)
+    replaced_by = np.full(n, -1)
+    for b in order:
+        if inactive[b]:
+            continue
+        replacers = np.flatnonzero(replaces[:, b] & kept)
+        if len(replacers) and not required[b]:
+            replaced_by[b] = replacers[0]
+        else:
+            kept[b] = True
+
+    removed = shifts_df[~kept].copy()
+    positions = np.flatnonzero(~kept)
+    removed["Reason"] = [
+        "Not active on any day" if replaced_by[b] < 0
+        else "Duplicate of a cheaper or equal shift" if identical[replaced_by[b], b]
+        else "Dominated by a cheaper shift covering its times and days"
+        for b in positions
+    ]
+    removed["KeptShift"] = pd.Series(
+        [shifts_df.index[replaced_by[b]] if replaced_by[b] >= 0 else None for b in positions],
+        index=removed.index, dtype=object
+    )
+    for shift_id, row in removed.iterrows():
+        logger.info("Pruned shift %s (%s-%s): %s%s", shift_id, row["StartTime"], row["EndTime"],
+                    row["Reason"], f", kept shift {row['KeptShift']}" if row["KeptShift"] is not None else "")
+    return shifts_df[kept], removed
+
+
+# ------------------------------------------------------------------
+#                           Model Building
+# ------------------------------------------------------------------
+def aggregate_tasks(tasks_df):
+    """
+    Group tasks that are interchangeable in the model: same day, time
+    window, duration and nurses required. Returns one row per group with
+    those columns, Count and TaskIds (the tasks' index labels, in order).
+    """
+    keys = ["Day", "StartTime", "EndTime", "Duration", "NursesRequired"]
+    return (
+        tasks_df.assign(_task=tasks_df.index)
+        .groupby(keys, sort=False)
+        .agg(Count=("_task", "size"), TaskIds=("_task", list))
+        .reset_index()
+    )
+
+
+# Capacity formulations for build_model
+CAPACITY_MODES = {
+    "sum": "All tasks of a (shift, day) at once",
+    "peak": "Overlapping task windows only",
+    "lazy": "Overlapping task windows, added when violated",
+}
+DEFAULT_CAPACITY = "sum"
+
+
+def peak_load_points(starts, ends, break_start, break_end):
+    """
+    Event points at which the load of task windows [starts, ends) (minute
+    arrays) has to be capped inside a shift: the window starts and the end
+    of the break, leaving out points inside the break. The open windows
+    are largest at one of these, so capping them caps every minute.
+    Points whose open windows are all still open at the next point are
+    dropped. Returns [(minute, positions of the open windows)].
+    """
+    points = np.unique(np.append(starts, break_end))
+    points = points[(points < break_start) | (points >= break_end)]
+    is_open = (starts[None, :] <= points[:, None]) & (ends[None, :] > points[:, None])
+    keep = is_open.any(axis=1)
+    keep[:-1] &= (is_open[:-1] & ~is_open[1:]).any(axis=1)
+    return [(points[i], np.flatnonzero(is_open[i])) for i in np.flatnonzero(keep)]
+
+
+def compatibility(units, shifts_df):
+    """
+    (tasks x shifts) mask of the shifts that can hold each task (or
+    task group): active on the task's day, covering its time window, with
+    room for it before or after the break (see screen_instance).
+    """
+    day_index = units["Day"].map({day: i for i, day in enumerate(DAY_NAMES)}).to_numpy()
+    active = shifts_df[DAY_NAMES].to_numpy() == 1
+    ss, se = _minutes(shifts_df["StartTime"])[None, :], _minutes(shifts_df["EndTime"])[None, :]
+    ts, te = _minutes(units["StartTime"])[:, None], _minutes(units["EndTime"])[:, None]
+    dur = _duration_minutes(units["Duration"])[:, None]
+    bs = _clock_minutes(shifts_df["BreakTime"])[None, :]
+    be = bs + _clock_minutes(shifts_df["BreakDuration"])[None, :]
+    return active[:, day_index].T & (ss <= ts) & (se >= te) & fits_outside_break(ts, te, dur, ss, se, bs, be)
+
+
+def build_model(tasks_df, shifts_df, env=None, profiler=None, aggregate=False,
+                capacity=DEFAULT_CAPACITY):
+    """
+    Assign tasks to (shift, day) pairs so that a single shift can have
+    different worker counts on different days.
+
+    A Monday task won't force workers on Tuesday/Wednesday if the shift
+    is active multiple days.
+
+    With aggregate=True, interchangeable tasks (aggregate_tasks) share one
+    integer variable per (shift, day) counting how many of them go there,
+    instead of one binary per task. This removes their symmetric copies;
+    use chosen_assignments() to expand the solution back to tasks.
+
+    capacity picks the worker capacity constraint (CAPACITY_MODES):
+    "sum" needs workers for the nurses of all tasks of a (shift, day)
+    together; "peak" only for the tasks whose windows overlap, one row
+    per peak_load_points event point, outside the break. As a task never
+    runs outside its window, the peak workers cover any placement.
+    "lazy" starts from the heaviest "peak" row of each (shift, day) only
+    and keeps the others in model._lazy_capacity, to be added when a
+    solution violates them (see solve_model).
+
+    The minimum staffing of a (shift, day) (minimum_staffing) is the
+    lower bound of its worker count.
+    Returns (model, shift_worker_vars, task_shift_vars).
+    """
+    if capacity not in CAPACITY_MODES:
+        raise ValueError(f"Unknown capacity formulation {capacity!r}")
+    model = Model("Task_Assignment", env=env)
+    if aggregate:
+        units = aggregate_tasks(tasks_df)
+        model._task_groups = units
+    else:
+        units = tasks_df
+
+    with span(profiler, "variables"):
+        # --- Decision Variables ---
+        # 1. Worker variables: (shift, day) -> integer # of workers,
+        #    at least the shift's minimum staffing that day
+        minimum = minimum_staffing(shifts_df)
+        shift_worker_vars = {}
+        for shift_id, shift_row in shifts_df.iterrows():
+            for day_str in DAY_NAMES:
+                if shift_row[day_str] == 1:  # shift is active on this day
+                    var_name = f"Workers_Shift_{shift_id}_{day_str}"
+                    shift_worker_vars[(shift_id, day_str)] = model.addVar(
+                        vtype=GRB.CONTINUOUS, lb=minimum.get((shift_id, day_str), 0), name=var_name
+                    )
+
+        # 2. Task assignment variables: (task, shift, day) -> binary
+        #    (or (group, shift, day) -> number of the group's tasks)
+        #    Only if the task's day == shift's active day AND times align
+        task_shift_vars = {}
+        vars_by_task = defaultdict(list)
+        load_by_shift = defaultdict(list)  # (shift, day) -> [(nurses, var, task)]
+        compatible = compatibility(units, shifts_df)
+        task_ids, shift_ids = units.index, shifts_df.index
+        days, nurses = units["Day"].to_numpy(), units["NursesRequired"].to_numpy()
+        counts = units["Count"].to_numpy() if aggregate else None
+        for u, s in zip(*np.nonzero(compatible)):
+            task_id, shift_id, t_day = task_ids[u], shift_ids[s], days[u]
+            if aggregate:
+                var = model.addVar(
+                    vtype=GRB.INTEGER, lb=0, ub=counts[u],
+                    name=f"Group_{task_id}_Shift_{shift_id}_{t_day}"
+                )
+            else:
+                var = model.addVar(
+                    vtype=GRB.BINARY, name=f"Task_{task_id}_Shift_{shift_id}_{t_day}"
+                )
+            task_shift_vars[(task_id, shift_id, t_day)] = var
+            vars_by_task[task_id].append(var)
+            load_by_shift[(shift_id, t_day)].append((nurses[u], var, task_id))
+
+    with span(profiler, "objective"):
+        # --- Objective: Minimize total cost = sum(workers * weight) across (shift, day) ---
+        model.setObjective(
+            quicksum(
+                shift_worker_vars[(s_id, d)] * shifts_df.loc[s_id, "Weight"]
+                for (s_id, d) in shift_worker_vars
+            ),
+            GRB.MINIMIZE
+        )
+
+    with span(profiler, "constraints"):
+        # --- Constraints ---
+
+        # 1. Coverage: each task is assigned to at least one feasible (shift, day)
+        #    (every task of a group, when aggregated)
+        for task_id, task_row in units.iterrows():
+            feasible_assignments = vars_by_task.get(task_id)
+            # If there's at least one feasible shift-day, require that sum >= 1
+            if feasible_assignments:
+                model.addConstr(
+                    quicksum(feasible_assignments) >= (task_row["Count"] if aggregate else 1),
+                    name=f"{'Group' if aggregate else 'Task'}_{task_id}_Coverage"
+                )
+            else:
+                # No feasible shift-day found: reported by screen_instance as uncovered
+                pass
+
+        # 2. Worker capacity: for each (shift, day), total nurses required
+        #    by tasks assigned cannot exceed the # of workers assigned
+        if capacity == "sum":
+            for (shift_id, day_str) in shift_worker_vars:
+                model.addConstr(
+                    quicksum(
+                        nurses * var for nurses, var, _ in load_by_shift.get((shift_id, day_str), [])
+                    ) <= shift_worker_vars[(shift_id, day_str)],
+                    name=f"Shift_{shift_id}_{day_str}_WorkerCap"
+                )
+        else:
+            # ... counting only tasks whose windows are open at the same time
+            windows = dict(zip(units.index, zip(_minutes(units["StartTime"]), _minutes(units["EndTime"]))))
+            break_start = _clock_minutes(shifts_df["BreakTime"])
+            breaks = dict(zip(shifts_df.index, zip(
+                break_start, break_start + _clock_minutes(shifts_df["BreakDuration"])
+            )))
+            counts = units["Count"] if aggregate else pd.Series(1, index=units.index)
+            lazy_rows = []
+            for (shift_id, day_str), workers in shift_worker_vars.items():
+                load = load_by_shift.get((shift_id, day_str))
+                if not load:
+                    continue
+                starts, ends = np.array([windows[task_id] for _, _, task_id in load]).T
+                rows, most_nurses = [], []
+                for point, members in peak_load_points(starts, ends, *breaks[shift_id]):
+                    rows.append((
+                        f"Shift_{shift_id}_{day_str}_Peak_{int(point) // 60:02d}{int(point) % 60:02d}",
+                        [load[i][:2] for i in members], workers
+                    ))
+                    most_nurses.append(sum(load[i][0] * counts[load[i][2]] for i in members))
+                if not rows:
+                    continue
+                if capacity == "lazy":
+                    # Seed with the row that can carry the most nurses
+                    heaviest = int(np.argmax(most_nurses))
+                    lazy_rows.extend(rows[:heaviest] + rows[heaviest + 1:])
+                    rows = [rows[heaviest]]
+                for name, terms, limit in rows:
+                    model.addConstr(quicksum(nurses * var for nurses, var in terms) <= limit, name=name)
+            if capacity == "lazy":
+                model._lazy_capacity = lazy_rows
+                model._lazy_added = []
+                model.Params.LazyConstraints = 1
+
+    model.update()
+    return model, shift_worker_vars, task_shift_vars
+
+
+def chosen_assignments(model, task_shift_vars):
+    """
+    (task, shift, day) keys selected by the solution. For aggregated
+    models each group's count on a (shift, day) is handed out to the
+    group's tasks in order.
+    """
+    keys = list(task_shift_vars)
+    values = model.getAttr("X", list(task_shift_vars.values()))
+    groups = getattr(model, "_task_groups", None)
+    if groups is None:
+        return [key for key, value in zip(keys, values) if value > 0.5]
+
+    remaining = dict(zip(groups.index, groups["TaskIds"]))
+    chosen = []
+    for (group_id, shift_id, day), value in zip(keys, values):
+        count = int(round(value))
+        if count <= 0:
+            continue
+        tasks, remaining[group_id] = remaining[group_id][:count], remaining[group_id][count:]
+        chosen.extend((task_id, shift_id, day) for task_id in tasks)
+    return chosen
+
+
+# ------------------------------------------------------------------
+#                       Demand-bucket model
+# ------------------------------------------------------------------
+# Model formulations for optimize(); "auto" picks "buckets" once the
+# task model would need more than BUCKET_VAR_THRESHOLD variables
+FORMULATIONS = {
+    "auto": "Task assignment, demand buckets for very large instances",
+    "tasks": "Task assignment (a variable per task and shift)",
+    "buckets": "Demand buckets (worker counts only)",
+}
+DEFAULT_FORMULATION = "auto"
+BUCKET_VAR_THRESHOLD = 100_000
+
+
+def level_demand(units, shifts_df, compatible, day, interval_minutes=INTERVAL_MINUTES):
+    """
+    Required nurses per time bucket of one day. Every task of the day's
+    groups (units, with the compatibility mask of build_model) is placed
+    in turn on the start slot, inside the break-free periods of a shift
+    that can hold it, with the lowest load so far. Buckets are the
+    segments between the resulting start and end minutes.
+
+    Returns (placement, profile, placed): the ShiftPlacement over the
+    day's groups, the nurses per segment, and [(task_id, group position,
+    placement position, slot)] in placement order. None if no task of
+    the day can be held.
+    """
+    on_day = np.flatnonzero((units["Day"].to_numpy() == day) & compatible.any(axis=1))
+    if not len(on_day):
+        return None
+    periods = {s: shift_periods(shifts_df.iloc[s]) for s in np.flatnonzero(compatible[on_day].any(axis=0))}
+    windows = list(zip(_minutes(units["StartTime"])[on_day], _minutes(units["EndTime"])[on_day]))
+    durations = [int(d) for d in _duration_minutes(units["Duration"])[on_day]]
+    starts = [
+        sorted({
+            start for s in np.flatnonzero(compatible[u])
+            for start in start_slots(int(begin), int(end), duration, periods[s], interval_minutes)
+        })
+        for u, (begin, end), duration in zip(on_day, windows, durations)
+    ]
+    nurses = units["NursesRequired"].to_numpy()[on_day]
+    placement = ShiftPlacement(starts, durations, nurses)
+
+    # Least flexible groups first, the larger tasks of equal flexibility first
+    order = sorted(placement.placeable, key=lambda i: (len(starts[i]), -durations[i] * nurses[i]))
+    profile = np.zeros(placement.num_segments, dtype=np.int64)
+    placed = []
+    for i in order:
+        for task_id in units["TaskIds"].iloc[on_day[i]]:
+            slot = int(np.argmin(placement.slot_loads(i, profile)))
+            lo, hi = placement.ranges[i][slot]
+            profile[lo:hi] += nurses[i]
+            placed.append((task_id, on_day[i], i, slot))
+    return placement, profile, placed
+
+
+def build_bucket_model(tasks_df, shifts_df, env=None, profiler=None, interval_minutes=INTERVAL_MINUTES):
+    """
+    Compact model for instances too large for a variable per task: the
+    tasks become required nurses per time bucket per day (level_demand),
+    and an integer worker count per active (shift, day) has to cover
+    every bucket with the shifts working in it (outside their break), at
+    the lowest total weight. Buckets covered by the same shifts share one
+    row, with the highest demand among them. Minimum staffing
+    (minimum_staffing) bounds the worker counts from below, also of
+    shifts that get no tasks that day.
+
+    Only the worker counts are variables; bucket_assignments() hands the
+    individual tasks out afterwards. Returns (model, shift_worker_vars).
+    """
+    model = Model("Demand_Buckets", env=env)
+    units = aggregate_tasks(tasks_df)
+    compatible = compatibility(units, shifts_df)
+    shift_ids = shifts_df.index
+    weights = shifts_df["Weight"].to_numpy(dtype=float)
+    minimum = minimum_staffing(shifts_df)
+    shift_worker_vars = {}
+    levels = {}
+
+    with span(profiler, "buckets"):
+        for day in DAY_NAMES:
+            level = level_demand(units, shifts_df, compatible, day, interval_minutes)
+            if level is None:
+                continue
+            placement, profile, placed = level
+            candidates = np.flatnonzero(compatible[[u for _, u, _, _ in placed]].any(axis=0))
+            # Segment x candidate shift: the shift works the whole segment
+            lows, highs = placement.bounds[:-1, None], placement.bounds[1:, None]
+            works = np.zeros((placement.num_segments, len(candidates)), dtype=bool)
+            for c, s in enumerate(candidates):
+                for start, end in shift_periods(shifts_df.iloc[s]):
+                    works[:, c] |= (start <= lows[:, 0]) & (highs[:, 0] <= end)
+            rows = {}
+            for k in np.flatnonzero(profile > 0):
+                key = tuple(np.flatnonzero(works[k]))
+                first, demand = rows.get(key, (k, 0))
+                rows[key] = (first, max(demand, int(profile[k])))
+            levels[day] = (placement, placed, candidates, works)
+
+            for s in candidates:
+                shift_worker_vars[(shift_ids[s], day)] = model.addVar(
+                    vtype=GRB.INTEGER, lb=minimum.get((shift_ids[s], day), 0), obj=weights[s],
+                    name=f"Workers_Shift_{shift_ids[s]}_{day}"
+                )
+            for key, (first, demand) in rows.items():
+                minute = int(placement.bounds[first])
+                model.addConstr(
+                    quicksum(shift_worker_vars[(shift_ids[candidates[c]], day)] for c in key) >= demand,
+                    name=f"Bucket_{day}_{minute // 60:02d}{minute % 60:02d}"
+                )
+
+        for (shift_id, day), workers in minimum.items():
+            if (shift_id, day) not in shift_worker_vars:
+                shift_worker_vars[(shift_id, day)] = model.addVar(
+                    vtype=GRB.INTEGER, lb=workers, obj=shifts_df.at[shift_id, "Weight"],
+                    name=f"Workers_Shift_{shift_id}_{day}"
+                )
+
+    model.ModelSense = GRB.MINIMIZE
+    model._buckets = levels
+    model._bucket_compatible = compatible
+    model.update()
+    return model, shift_worker_vars
+
+
+def bucket_assignments(model, shift_worker_vars, shifts_df):
+    """
+    Hand the tasks of a solved bucket model to its (shift, day) worker
+    counts. Each task keeps its bucket placement and goes to the shift
+    that can hold it with the least spare workers left over the task's
+    minutes; a task no shift has room for goes to the shift where the
+    missing workers cost least, which then gets them. Returns
+    (assignments, worker_counts) like chosen_assignments and the task
+    model's counts, the counts lowered to the workers actually used or
+    the minimum staffing.
+    """
+    counts = dict(zip(shift_worker_vars, model.getAttr("X", list(shift_worker_vars.values()))))
+    shift_ids = shifts_df.index
+    weights = shifts_df["Weight"].to_numpy(dtype=float)
+    compatible = model._bucket_compatible
+    assignments = []
+    worker_counts = {}
+    repaired = 0
+    for day, (placement, placed, candidates, works) in model._buckets.items():
+        workers = np.array([round(counts[(shift_ids[s], day)]) for s in candidates], dtype=np.int64)
+        load = np.zeros((len(candidates), placement.num_segments), dtype=np.int64)
+        # Most nurse-minutes first, so the large tasks find room
+        for task_id, u, i, slot in sorted(
+            placed, key=lambda p: -placement.nurses[p[2]] * placement.durations[p[2]]
+        ):
+            lo, hi = placement.ranges[i][slot]
+            nurses = placement.nurses[i]
+            holds = compatible[u, candidates] & works[lo:hi].all(axis=0)
+            spare = workers - load[:, lo:hi].max(axis=1)
+            fits = holds & (spare >= nurses)
+            if fits.any():
+                c = int(np.argmin(np.where(fits, spare, np.iinfo(np.int64).max)))
+            else:
+                extra = np.where(holds, weights[candidates] * (nurses - spare), np.inf)
+                c = int(np.argmin(extra))
+                workers[c] += nurses - spare[c]
+                repaired += 1
+            load[c, lo:hi] += nurses
+            assignments.append((task_id, shift_ids[candidates[c]], day))
+        for c, s in enumerate(candidates):
+            used = int(load[c].max(initial=0))
+            if used:
+                worker_counts[(shift_ids[s], day)] = used
+    for key, workers in zip(shift_worker_vars, model.getAttr("LB", list(shift_worker_vars.values()))):
+        if workers > worker_counts.get(key, 0):
+            worker_counts[key] = int(workers)
+    if repaired:
+        logger.info("Added workers for %d tasks the bucket counts had no room for", repaired)
+    return assignments, worker_counts
+
+
+# ------------------------------------------------------------------
+#                            Model size
+# ------------------------------------------------------------------
+# Memory of a built model per variable, row and nonzero (the gurobipy
+# objects and their dicts plus Gurobi's copy), fitted on generated weeks
+BYTES_PER_VAR = 620
+BYTES_PER_CONSTR = 500
+BYTES_PER_NONZERO = 30
+
+# What optimize() does with a model over its SizeLimits
+SIZE_ACTIONS = {
+    "route": "Switch to a cheaper model",
+    "refuse": "Refuse to solve",
+    "warn": "Solve anyway",
+}
+DEFAULT_SIZE_ACTION = "route"
+
+
+@dataclass
+class ModelSize:
+    """Projected size of a model, counted before it is built (see estimate_model_size)."""
+    formulation: str
+    aggregate: bool
+    capacity: str
+    num_vars: int
+    num_int_vars: int
+    num_constrs: int
+    num_nonzeros: int
+
+    @property
+    def memory_mb(self):
+        """Memory the built model takes; the solve needs more on top."""
+        return (
+            self.num_vars * BYTES_PER_VAR + self.num_constrs * BYTES_PER_CONSTR
+            + self.num_nonzeros * BYTES_PER_NONZERO
+        ) / 2 ** 20
+
+    def describe(self):
+        return (f"{self.num_vars:,} variables, {self.num_constrs:,} constraints and "
+                f"{self.num_nonzeros:,} nonzeros (about {self.memory_mb:,.0f} MB)")
+
+    def as_dict(self):
+        return {**asdict(self), "memory_mb": round(self.memory_mb, 1)}
+
+
+@dataclass
+class SizeLimits:
+    """
+    Largest model optimize() builds as it is. A larger one is switched
+    to a cheaper model, refused or built anyway, depending on action
+    (SIZE_ACTIONS); one over warn_fraction of a limit gets a note. None
+    disables a limit.
+    """
+    max_vars: Optional[int] = 2_000_000
+    max_nonzeros: Optional[int] = 10_000_000
+    max_memory_mb: Optional[float] = 1024
+    action: str = DEFAULT_SIZE_ACTION
+    warn_fraction: float = 0.5
+
+    def exceeded(self, size, fraction=1.0):
+        """Names of the limits size is over (scaled by fraction)."""
+        checks = (
+            ("variables", size.num_vars, self.max_vars),
+            ("nonzeros", size.num_nonzeros, self.max_nonzeros),
+            ("memory", size.memory_mb, self.max_memory_mb),
+        )
+        return [name for name, value, limit in checks if limit is not None and value > limit * fraction]
+
+
+class ModelTooLargeError(OptimizationInputError):
+    """The model would be over the size limits, and no cheaper model is allowed or small enough."""
+
+    def __init__(self, size, exceeded):
+        self.size = size
+        self.exceeded = exceeded
+        super().__init__(
+            f"The model would need {size.describe()}, over the limit for {', '.join(exceeded)}. "
+            "Split the instance, remove shifts that cannot be needed, or raise the limits."
+        )
+
+
+def _peak_row_counts(units, shifts_df, compatible, lazy=False):
+    """
+    (rows, nonzeros) of the "peak" capacity rows of build_model: one per
+    distinct window start (or break end) outside the break with windows
+    open there, each holding those windows and the worker count. An upper
+    bound, as peak_load_points also drops points dominated by the next.
+    With lazy=True only the fullest row per (shift, day) is counted.
+    """
+    starts, ends = _minutes(units["StartTime"]), _minutes(units["EndTime"])
+    days = units["Day"].to_numpy()
+    break_start = _clock_minutes(shifts_df["BreakTime"])
+    break_end = break_start + _clock_minutes(shifts_df["BreakDuration"])
+    rows = nonzeros = 0
+    for s in range(len(shifts_df)):
+        members = np.flatnonzero(compatible[:, s])
+        for day in np.unique(days[members]):
+            on_day = members[days[members] == day]
+            day_starts, day_ends = np.sort(starts[on_day]), np.sort(ends[on_day])
+            points = np.unique(np.append(day_starts, break_end[s]))
+            points = points[(points < break_start[s]) | (points >= break_end[s])]
+            open_windows = (
+                np.searchsorted(day_starts, points, side="right") - np.searchsorted(day_ends, points, side="right")
+            )
+            open_windows = open_windows[open_windows > 0]
+            if lazy and len(open_windows):
+                open_windows = open_windows[[np.argmax(open_windows)]]
+            rows += len(open_windows)
+            nonzeros += int(open_windows.sum()) + len(open_windows)
+    return rows, nonzeros
+
+
+def _slot_bounds(starts, ends, durations):
+    """Distinct start and end minutes of tasks started every INTERVAL_MINUTES inside their windows."""
+    slots = np.maximum((ends - durations - starts) // INTERVAL_MINUTES + 1, 0)
+    offsets = np.arange(slots.sum()) - np.repeat(np.cumsum(slots) - slots, slots)
+    first = np.repeat(starts, slots) + INTERVAL_MINUTES * offsets
+    return np.unique(np.concatenate([first, first + np.repeat(durations, slots)]))
+
+
+def estimate_model_size(tasks_df, shifts_df, aggregate=True, capacity=DEFAULT_CAPACITY, formulation="tasks"):
+    """
+    Size of the model build_model (formulation "tasks") or
+    build_bucket_model ("buckets") would create for prepared tables,
+    counted on the compatibility mask without building anything:
+
+    - tasks: a worker count per active (shift, day) and an assignment
+      variable per compatible (task or group, shift) pair; a coverage row
+      per task that has one, and the capacity rows of the chosen
+      formulation;
+    - buckets: a worker count per (shift, day) that can hold a task, and
+      at most a row per bucket between the start and end minutes the
+      tasks can take on their INTERVAL_MINUTES start grid, over the
+      shifts of the day.
+    """
+    units = aggregate_tasks(tasks_df) if aggregate or formulation == "buckets" else tasks_df
+    compatible = compatibility(units, shifts_df)
+    if formulation == "buckets":
+        num_vars = num_constrs = num_nonzeros = 0
+        held = compatible.any(axis=1)
+        days = units["Day"].to_numpy()
+        starts, ends = _minutes(units["StartTime"]), _minutes(units["EndTime"])
+        durations = _duration_minutes(units["Duration"]).astype(np.int64)
+        for day in DAY_NAMES:
+            on_day = held & (days == day)
+            shifts_on_day = int(compatible[on_day].any(axis=0).sum())
+            bounds = _slot_bounds(starts[on_day], ends[on_day], durations[on_day])
+            rows = max(len(bounds) - 1, 0)
+            num_vars += shifts_on_day
+            num_constrs += rows
+            num_nonzeros += rows * shifts_on_day
+        return ModelSize("buckets", True, capacity, num_vars, num_vars, num_constrs, num_nonzeros)
+
+    shift_days = int((shifts_df[DAY_NAMES].to_numpy() == 1).sum())
+    pairs = int(compatible.sum())
+    num_constrs = int(compatible.any(axis=1).sum())
+    num_nonzeros = pairs
+    if capacity == "sum":
+        num_constrs += shift_days
+        num_nonzeros += pairs + shift_days
+    else:
+        rows, nonzeros = _peak_row_counts(units, shifts_df, compatible, lazy=capacity == "lazy")
+        num_constrs += rows
+        num_nonzeros += nonzeros
+    return ModelSize("tasks", aggregate, capacity, shift_days + pairs, pairs, num_constrs, num_nonzeros)
+
+
+# How check_model_size describes the cheaper models it switches to
+_ROUTES = {
+    "aggregate": "with interchangeable tasks grouped",
+    "lazy": "with capacity rows added only when violated",
+    "buckets": "as demand buckets",
+}
+
+
+def check_model_size(tasks_df, shifts_df, size, limits=None):
+    """
+    Hold the projected size of a model (estimate_model_size) against
+    limits (a SizeLimits). Returns (size, notes): the size of the model
+    to build and what to tell the planner about it.
+
+    Over a limit, action "warn" keeps the model with a note and "refuse"
+    raises ModelTooLargeError. "route" takes the first cheaper model
+    within the limits: the task model with grouped tasks, then with lazy
+    instead of peak capacity rows, then the bucket model; if none is,
+    it raises ModelTooLargeError for the last of them.
+    """
+    limits = limits if limits is not None else SizeLimits()
+    exceeded = limits.exceeded(size)
+    if not exceeded:
+        near = limits.exceeded(size, limits.warn_fraction)
+        notes = [f"The model needs {size.describe()}, over {limits.warn_fraction:.0%} of the limit "
+                 f"for {', '.join(near)}."] if near else []
+        return size, notes
+    if limits.action == "refuse":
+        raise ModelTooLargeError(size, exceeded)
+    if limits.action == "warn":
+        return size, [f"The model needs {size.describe()}, over the limit for {', '.join(exceeded)}; "
+                      "building it anyway."]
+
+    routes = []
+    if size.formulation == "tasks":
+        if not size.aggregate:
+            routes.append(("aggregate", {"aggregate": True, "capacity": size.capacity}))
+        if size.capacity == "peak":
+            routes.append(("lazy", {"aggregate": True, "capacity": "lazy"}))
+        routes.append(("buckets", {"formulation": "buckets", "capacity": size.capacity}))
+    routed, routed_exceeded = size, exceeded
+    for route, options in routes:
+        routed = estimate_model_size(tasks_df, shifts_df, **options)
+        routed_exceeded = limits.exceeded(routed)
+        if not routed_exceeded:
+            return routed, [f"The model would need {size.describe()}, over the limit for "
+                            f"{', '.join(exceeded)}; solving it {_ROUTES[route]} instead "
+                            f"({routed.describe()})."]
+    raise ModelTooLargeError(routed, routed_exceeded)
+
+
+# ------------------------------------------------------------------
+#                     Post-processing (placement)
+# ------------------------------------------------------------------
+PLACEMENT_METHODS = {
+    "exact": "Lowest peak (branch and bound)",
+    "greedy": "Task by task",
+}
+DEFAULT_PLACEMENT = "exact"
+
+# Start-time steps offered by the app, coarse to fine (see placement.place_tasks)
+GRANULARITIES = {
+    (15,): "15 min",
+    (15, 5): "15 → 5 min",
+    (60, 15): "60 → 15 min",
+    (60, 15, 5): "60 → 15 → 5 min",
+}
+
+
+def calculate_cost_for_intervals(task_rows, shift_row, weight, granularity=DEFAULT_GRANULARITY, method="greedy"):
+    """
+    Calculate the cost considering shift breaks, preventing task assignments during break times.
+    Returns assignments, total cost, and max nurses required.
+
+    method "greedy" puts each task, in order, on its first start with the
+    lowest peak so far; "exact" searches the placement with the lowest
+    peak (see placement.place_tasks). granularity is the step between
+    candidate start times in minutes, or coarse-to-fine steps such as
+    (60, 15, 5) that refine only around the coarser placement.
+    """
+    if method not in PLACEMENT_METHODS:
+        raise ValueError(f"Unknown placement method {method!r}")
+    return place_tasks(
+        task_rows, shift_row, weight, granularity=granularity,
+        max_tasks=MAX_EXACT_TASKS if method == "exact" else 0,
+    )
+
+
+def post_process(tasks_df, shifts_df, chosen_assignments, worker_counts, profiler=None,
+                 placement=DEFAULT_PLACEMENT, granularity=DEFAULT_GRANULARITY):
+    """
+    Place the tasks of every chosen (shift, day) inside the shift and
+    compute the actual nurse peak and cost. placement selects how the
+    tasks are placed (PLACEMENT_METHODS) and granularity their start
+    steps (see calculate_cost_for_intervals). A (shift, day) is staffed
+    with at least its minimum staffing (minimum_staffing), also when it
+    has no tasks.
+
+    chosen_assignments: list of (task_id, shift_id, day) picked by a solver.
+    worker_counts: {(shift_id, day): workers} from the same solver.
+    Returns (results_df, nurse_requirements_df, day_summary_df).
+    """
+    with span(profiler, "collect"):
+        # Phase 1: Collect raw assignment data and calculate contributions
+        temp_results = []
+        shift_day_cost = defaultdict(float)        # Total cost per (shift, day)
+        shift_day_contributions = defaultdict(float)  # Sum of contributions
+
+        for (task_id, shift_id, d) in chosen_assignments:
+            # Get basic assignment info
+            workers = worker_counts[(shift_id, d)]
+            shift_weight = shifts_df.loc[shift_id, "Weight"]
+            task_row = tasks_df.loc[task_id]
+
+            # Calculate task duration in hours
+            t_start = task_row["StartTime"]
+            t_end = task_row["EndTime"]
+            start_dt = datetime.combine(date.min, t_start)
+            end_dt = datetime.combine(date.min, t_end)
+            duration = (end_dt - start_dt).total_seconds() / 3600
+
+            # Calculate contribution metric (nurses × hours)
+            contribution = task_row["NursesRequired"] * duration
+
+            # Store temporary data
+            temp_results.append({
+                "task_id": task_id,
+                "shift_id": shift_id,
+                "day": d,
+                "workers": workers,
+                "shift_weight": shift_weight,
+                "contribution": contribution
+            })
+
+            # Update aggregates
+            shift_day_cost[(shift_id, d)] = workers * shift_weight
+            shift_day_contributions[(shift_id, d)] += contribution
+
+    with span(profiler, "placement"):
+        # Phase 2: Place tasks within each (shift, day) and compute results
+        tasks_by_shift = defaultdict(list)  # (shift, day) -> task ids
+        for entry in temp_results:
+            tasks_by_shift[(entry["shift_id"], entry["day"])].append(entry["task_id"])
+        processed_shifts = set()
+        minimum = minimum_staffing(shifts_df)
+        results = []
+        daily_costs = {day: 0.0 for day in DAY_NAMES}
+        daily_workers = {day: 0 for day in DAY_NAMES}
+        daily_tasks = {day: 0 for day in DAY_NAMES}
+        for entry in temp_results:
+            shift_id = entry["shift_id"]
+            day = entry["day"]
+            key = (shift_id, day)
+
+            if key in processed_shifts:
+                continue
+            processed_shifts.add(key)
+
+            shift_row = shifts_df.loc[shift_id]
+            weight = shift_row["Weight"]
+
+            # Filter tasks for the current shift
+            relevant_tasks = [tasks_df.loc[task_id] for task_id in tasks_by_shift[key]]
+
+            # Compute optimal intervals and costs
+            assignments, total_cost, max_nurses = calculate_cost_for_intervals(
+                relevant_tasks, shift_row, weight, granularity=granularity, method=placement
+            )
+            if max_nurses < minimum.get(key, 0):
+                max_nurses = minimum[key]
+                total_cost = max_nurses * weight
+            daily_costs[day] += total_cost
+            daily_workers[day] += max_nurses
+            daily_tasks[day] += len(assignments)  # Count assigned tasks
+
+            # Collect results for each task
+            for assignment in assignments:
+                results.append({
+                    "Task ID": assignment["Task ID"],
+                    "Task Name": assignment["Task Name"],
+                    "Day": assignment["Day"],
+                    "Task Start": assignment["Task Start"].strftime("%H:%M"),
+                    "Task End": assignment["Task End"].strftime("%H:%M"),
+                    "Begin Task": assignment["Begin Task"].strftime("%H:%M"),
+                    "End Task": assignment["End Task"].strftime("%H:%M"),
+                    "Shift ID": shift_row["id"],
+                    "Shift Start": shift_row["StartTime"].strftime("%H:%M"),
+                    "Shift End": shift_row["EndTime"].strftime("%H:%M"),
+                    "Workers Assigned": assignment["Workers Assigned"],
+                    "Hourly Rate (€)": weight,
+                    "Task Cost (€)":  round(assignment["Workers Assigned"] * weight, 2) ,
+                    "Number of Nurses": max_nurses,
+                    "Cost %": round((total_cost / shift_day_cost[key]) * 100, 1) if shift_day_cost[key] > 0 else 0
+                })
+
+        # Shifts staffed for their minimum only
+        staffed_only = []
+        for (shift_id, day), workers in minimum.items():
+            if (shift_id, day) in processed_shifts:
+                continue
+            shift_row = shifts_df.loc[shift_id]
+            daily_costs[day] += workers * shift_row["Weight"]
+            daily_workers[day] += workers
+            staffed_only.append({
+                "Day": day,
+                "Shift ID": shift_row["id"],
+                "Shift Start": shift_row["StartTime"].strftime("%H:%M"),
+                "Shift End": shift_row["EndTime"].strftime("%H:%M"),
+                "Number of Nurses": workers,
+                "Task Cost (€)": round(workers * shift_row["Weight"], 2),
+            })
+
+    with span(profiler, "frames"):
+        results_df = pd.DataFrame(results, columns=RESULT_COLUMNS)
+        results_df["Shift"] = results_df["Shift Start"] + " - " + results_df["Shift End"]
+
+        day_summary_df = pd.DataFrame([
+            {
+                "Day": day,
+                "Total Cost (€)": round(daily_costs[day], 2),
+                "Tasks Assigned": daily_tasks[day],
+                "Workers Assigned": daily_workers[day]
+            }
+            for day in DAY_NAMES
+        ])
+
+        # Group results_df to get nurse requirements
+        nurse_requirements_df = (
+            results_df
+            .groupby(["Day", "Shift ID", "Shift Start", "Shift End"], as_index=False)
+            .agg({
+                "Number of Nurses": "max",  # Peak nurses from shift optimization
+                "Task Cost (€)": "sum"      # Total shift cost
+            })
+        )
+        if staffed_only:
+            nurse_requirements_df = (
+                pd.concat([nurse_requirements_df, pd.DataFrame(staffed_only)], ignore_index=True)
+                .sort_values(["Day", "Shift ID", "Shift Start", "Shift End"], ignore_index=True)
+            )
+
+        # Merge with shifts_df to pull in the 'Weight' column
+        shifts_weight_df = shifts_df[['id', 'Weight']].rename(columns={'id': 'Shift ID'})
+        nurse_requirements_df = nurse_requirements_df.merge(shifts_weight_df, on="Shift ID", how="left")
+        nurse_requirements_df["Shift"] = (
+            nurse_requirements_df["Shift Start"] + " - " + nurse_requirements_df["Shift End"]
+        )
+
+    return results_df, nurse_requirements_df, day_summary_df
+
+
+def _hhmm_minutes(values):
+    """Series of "HH:MM" strings -> numpy array of minutes."""
+    return (values.str[:2].astype(int) * 60 + values.str[3:5].astype(int)).to_numpy()
+
+
+def nurse_roster(results_df):
+    """
+    Per-nurse timelines of a run: the placed tasks of every (day, shift)
+    split over nurses numbered from 1 (assign_lanes), one row per nurse
+    and task, so a task needing k nurses appears on k of them. Only needs
+    the results frame, so stored runs get a roster as well.
+    """
+    if results_df.empty:
+        return pd.DataFrame(columns=ROSTER_COLUMNS)
+
+    begin = _hhmm_minutes(results_df["Begin Task"])
+    end = _hhmm_minutes(results_df["End Task"])
+    nurses = results_df["Workers Assigned"].to_numpy()
+    shift_rows = defaultdict(list)  # (day, shift) -> row positions
+    for row, key in enumerate(zip(results_df["Day"], results_df["Shift ID"])):
+        shift_rows[key].append(row)
+
+    positions, numbers = [], []
+    for rows in shift_rows.values():
+        for row, lanes in zip(rows, assign_lanes([(begin[r], end[r], nurses[r]) for r in rows])):
+            positions.extend([row] * len(lanes))
+            numbers.extend(lanes)
+
+    tasks = results_df.iloc[positions]
+    roster_df = pd.DataFrame({
+        "Day": tasks["Day"].to_numpy(),
+        "Shift ID": tasks["Shift ID"].to_numpy(),
+        "Shift": (tasks["Shift Start"] + " - " + tasks["Shift End"]).to_numpy(),
+        "Nurse": numbers,
+        "Begin Task": tasks["Begin Task"].to_numpy(),
+        "End Task": tasks["End Task"].to_numpy(),
+        "Task ID": tasks["Task ID"].to_numpy(),
+        "Task Name": tasks["Task Name"].to_numpy(),
+    }, columns=ROSTER_COLUMNS)
+    roster_df["Day"] = pd.Categorical(roster_df["Day"], categories=DAY_NAMES, ordered=True)
+    roster_df = roster_df.sort_values(["Day", "Shift ID", "Nurse", "Begin Task"], ignore_index=True)
+    roster_df["Day"] = roster_df["Day"].astype(str)
+    return roster_df
+
+
+def prepare_render_data(results_df, nurse_requirements_df, day_summary_df):
+    """
+    Derive everything the results page draws from the result frames:
+    CSV downloads, the per-shift cost table, the per-day Gantt frames and
+    the nurse roster.
+    """
+    nurse_requirements_display_df = nurse_requirements_df[
+        ["Day", "Shift", "Shift ID", "Number of Nurses", "Weight"]
+    ]
+
+    # Group by Shift ID to sum the total number of nurses across all days
+    # and grab the first (or any consistent) shift Weight for that ID
+    shift_costs_df = nurse_requirements_df.groupby("Shift ID", as_index=False).agg({
+        "Number of Nurses": "sum",    # sum across all days
+        "Weight": "first"            # or "max"/"min" if you expect it to be consistent
+    })
+    shift_costs_df["TotalShiftCost"] = shift_costs_df["Number of Nurses"] * shift_costs_df["Weight"]
+
+    gantt_frames = {}
+    for day in DAY_NAMES:
+        day_data = results_df[results_df["Day"] == day].copy()
+        if day_data.empty:
+            continue  # Skip if no tasks on that day
+        day_data["Begin"] = pd.to_datetime("2000-01-01 " + day_data["Begin Task"], format="%Y-%m-%d %H:%M")
+        day_data["End"] = pd.to_datetime("2000-01-01 " + day_data["End Task"], format="%Y-%m-%d %H:%M")
+        gantt_frames[day] = day_data
+
+    roster_df = nurse_roster(results_df)
+
+    return {
+        "assignments_csv": results_df.to_csv(index=False).encode("utf-8"),
+        "nurse_requirements_csv": nurse_requirements_display_df.to_csv(index=False).encode("utf-8"),
+        "daily_summary_csv": day_summary_df.to_csv(index=False).encode("utf-8"),
+        "shift_costs_df": shift_costs_df,
+        "gantt_frames": gantt_frames,
+        "roster_df": roster_df,
+        "roster_csv": roster_df.to_csv(index=False).encode("utf-8"),
+    }
+
+
+# ------------------------------------------------------------------
+#                              Solve
+# ------------------------------------------------------------------
+def create_env(output_flag=True):
+    """
+    Return a Gurobi environment for new models: None (the default
+    environment) when logging, or a silent one that also hides the
+    license banner.
+    """
+    if output_flag:
+        return None
+    env = Env(empty=True)
+    env.setParam("OutputFlag", 0)
+    env.start()
+    return env
+
+
+def _model_attr(model, name):
+    """A model attribute, or None where Gurobi has no value for it (e.g. no incumbent)."""
+    try:
+        return getattr(model, name)
+    except (AttributeError, GurobiError):
+        return None
+
+
+def changed_params(model):
+    """Parameters of model that differ from their default, as {name: value}."""
+    changed = {}
+    for name in dir(GRB.Param):
+        if name.startswith("_"):
+            continue
+        try:
+            _, _, current, _, _, default = model.getParamInfo(name)
+        except GurobiError:
+            continue
+        if current != default:
+            changed[name] = current
+    return changed
+
+
+def collect_telemetry(model, tasks_df, shifts_df, build_seconds=None):
+    """
+    Solver statistics of a solved model together with the instance size
+    and the parameters it ran with. Keys match the SolverTelemetry table.
+    """
+    return {
+        "NumTasks": len(tasks_df),
+        "NumShifts": len(shifts_df),
+        "NumDays": int(tasks_df["Day"].nunique()),
+        "NursesRequired": int(tasks_df["NursesRequired"].sum()),
+        "NumVars": model.NumVars,
+        "NumBinVars": model.NumBinVars,
+        "NumConstrs": model.NumConstrs,
+        "NumNZs": model.NumNZs,
+        "Status": STATUS_NAMES.get(model.status, str(model.status)),
+        "SolCount": model.SolCount,
+        "ObjectiveValue": _model_attr(model, "ObjVal"),
+        "ObjectiveBound": _model_attr(model, "ObjBound"),
+        "MIPGap": _model_attr(model, "MIPGap"),
+        "NodeCount": _model_attr(model, "NodeCount"),
+        "IterCount": _model_attr(model, "IterCount"),
+        "SolveSeconds": model.Runtime,
+        "BuildSeconds": build_seconds,
+        "Threads": model.Params.Threads,
+        "TimeLimit": model.Params.TimeLimit if model.Params.TimeLimit < GRB.INFINITY else None,
+        "Params": json.dumps(changed_params(model)),
+        "Backend": "gurobi " + ".".join(str(v) for v in gurobi.version()),
+        "Cores": os.cpu_count(),
+    }
+
+
+def _gap(incumbent, bound):
+    if incumbent is None or bound is None:
+        return None
+    if incumbent == 0:
+        return 0.0 if bound == 0 else None
+    return abs(incumbent - bound) / abs(incumbent)
+
+
+def progress_callback(on_progress=None, stop_event=None, interval=0.5):
+    """
+    Gurobi callback that reports the incumbent objective, the best bound
+    and the gap to on_progress(dict), on every new incumbent and at most
+    every `interval` seconds otherwise, and terminates the solve once
+    stop_event is set.
+    """
+    last_report = [-interval]
+
+    def report(model, runtime, incumbent, bound, nodes):
+        incumbent = incumbent if abs(incumbent) < GRB.INFINITY else None
+        bound = bound if abs(bound) < GRB.INFINITY else None
+        last_report[0] = runtime
+        on_progress({
+            "time": runtime,
+            "incumbent": incumbent,
+            "bound": bound,
+            "gap": _gap(incumbent, bound),
+            "nodes": nodes,
+        })
+
+    def callback(model, where):
+        if stop_event is not None and stop_event.is_set():
+            model.terminate()
+        if on_progress is None:
+            return
+        if where == GRB.Callback.MIPSOL:
+            report(model, model.cbGet(GRB.Callback.RUNTIME),
+                   model.cbGet(GRB.Callback.MIPSOL_OBJBST), model.cbGet(GRB.Callback.MIPSOL_OBJBND),
+                   model.cbGet(GRB.Callback.MIPSOL_NODCNT))
+        elif where == GRB.Callback.MIP:
+            runtime = model.cbGet(GRB.Callback.RUNTIME)
+            if runtime - last_report[0] >= interval:
+                report(model, runtime,
+                       model.cbGet(GRB.Callback.MIP_OBJBST), model.cbGet(GRB.Callback.MIP_OBJBND),
+                       model.cbGet(GRB.Callback.MIP_NODCNT))
+
+    return callback
+
+
+def violated_capacity_rows(rows, values, tolerance=1e-6):
+    """The (name, terms, workers) capacity rows broken by values ({var: value})."""
+    return [
+        row for row in rows
+        if sum(nurses * values[var] for nurses, var in row[1]) > values[row[2]] + tolerance
+    ]
+
+
+def _row_variables(rows):
+    return list({var for _, terms, _ in rows for _, var in terms} | {workers for _, _, workers in rows})
+
+
+def lazy_capacity_callback(model, callback=None):
+    """
+    Gurobi callback that adds the pending capacity rows of a
+    capacity="lazy" model through cbLazy as soon as a new incumbent
+    violates them, then hands over to callback (e.g. progress_callback).
+    """
+    variables = _row_variables(model._lazy_capacity)
+
+    rows = model._lazy_capacity
+    added = set()
+
+    def lazy_callback(model, where):
+        if where == GRB.Callback.MIPSOL and rows:
+            # Gurobi may drop lazy rows again, so every row is checked each time
+            values = dict(zip(variables, model.cbGetSolution(variables)))
+            violated = violated_capacity_rows(rows, values)
+            for name, terms, workers in violated:
+                model.cbLazy(quicksum(nurses * var for nurses, var in terms) <= workers)
+                if name not in added:
+                    added.add(name)
+                    model._lazy_added.append(name)
+            if violated:
+                return  # the incumbent is rejected, so it is not progress
+        if callback is not None:
+            callback(model, where)
+
+    def finish():
+        model._lazy_capacity = [row for row in rows if row[0] not in added]
+
+    lazy_callback.finish = finish
+    return lazy_callback
+
+
+def solve_in_rounds(model, callback=None, max_rounds=100):
+    """
+    Cutting-plane loop for the pending capacity rows of a capacity="lazy"
+    model, for backends without lazy-constraint callbacks: solve, add the
+    rows the solution violates as ordinary constraints and solve again,
+    until none is violated. Solver limits such as TimeLimit apply to each
+    round; an interrupted round ends the loop.
+    """
+    model.Params.LazyConstraints = 0
+    variables = _row_variables(model._lazy_capacity)
+    for _ in range(max_rounds):
+        model.optimize(callback)
+        if model.SolCount == 0 or model.status != GRB.OPTIMAL:
+            break
+        values = dict(zip(variables, model.getAttr("X", variables)))
+        violated = violated_capacity_rows(model._lazy_capacity, values)
+        if not violated:
+            break
+        for name, terms, workers in violated:
+            model.addConstr(quicksum(nurses * var for nurses, var in terms) <= workers, name=name)
+            model._lazy_added.append(name)
+        added = {name for name, _, _ in violated}
+        model._lazy_capacity = [row for row in model._lazy_capacity if row[0] not in added]
+
+
+def solve_model(model, callback=None, rounds=False):
+    """
+    model.optimize(callback), generating the capacity rows of a
+    capacity="lazy" model on demand: through lazy_capacity_callback, or
+    with solve_in_rounds if rounds is set.
+    """
+    if getattr(model, "_lazy_capacity", None) is None:
+        model.optimize(callback)
+    elif rounds:
+        solve_in_rounds(model, callback)
+    else:
+        lazy_callback = lazy_capacity_callback(model, callback)
+        model.optimize(lazy_callback)
+        lazy_callback.finish()
+    added = getattr(model, "_lazy_added", None)
+    if added is not None:
+        logger.info("Added %d of %d lazy capacity rows", len(added), len(added) + len(model._lazy_capacity))
+
+
+def _iis_constraints(model, time_limit):
+    """Run computeIIS (capped at time_limit seconds) and return the IIS constraint names."""
+    model.Params.TimeLimit = time_limit
+    model.computeIIS()
+    constrs = model.getConstrs()
+    in_iis = model.getAttr("IISConstr", constrs)
+    return [constr.ConstrName for constr, flag in zip(constrs, in_iis) if flag]
+
+
+def compute_iis(tasks_df, shifts_df, time_limit=30, env=None):
+    """
+    On-demand infeasibility diagnosis: rebuild the model of raw task and
+    shift tables and return the names of the constraints in an
+    irreducible infeasible subsystem. The search stops after time_limit
+    seconds, in which case the set may not be minimal.
+    """
+    tasks_df, shifts_df = prepare_tables(tasks_df, shifts_df)
+    model, _, _ = build_model(tasks_df, shifts_df, env=env if env is not None else create_env(False))
+    return _iis_constraints(model, time_limit)
+
+
+def optimize(tasks_df, shifts_df, output_flag=True, profiler=None, params=None,
+             on_progress=None, stop_event=None, iis_time_limit=None, aggregate=True, prune=True,
+             capacity=DEFAULT_CAPACITY, lazy_rounds=False, local_search=False,
+             placement=DEFAULT_PLACEMENT, granularity=DEFAULT_GRANULARITY, formulation=DEFAULT_FORMULATION,
+             bucket_threshold=BUCKET_VAR_THRESHOLD, limits=None):
+    """
+    Run the full pipeline on raw task and shift tables (as stored in the
+    database) and return an OptimizationResult with per-phase timings.
+    Pass a Profiler to also collect nested spans (with CPU time and
+    memory peaks if it tracks memory).
+
+    params are Gurobi parameters for the solve, e.g. {"TimeLimit": 60,
+    "MIPGap": 0.01}. on_progress receives incumbent/bound/gap updates
+    while solving, and setting stop_event (a threading.Event) ends the
+    solve early. A solve stopped by either with an incumbent still
+    yields results, post-processed from that incumbent.
+
+    Interchangeable tasks are modelled as one integer count unless
+    aggregate=False (see build_model), and shifts that can never lower
+    the cost are dropped first unless prune=False (see prune_shifts).
+    capacity selects the worker capacity formulation (CAPACITY_MODES);
+    with "lazy", lazy_rounds=True adds the missing rows in cutting-plane
+    rounds instead of from a callback (see solve_model). local_search=True
+    runs a LocalSearchWorker process next to the solver that feeds it
+    better plans while it closes the gap. placement selects how the
+    post-pass places tasks inside their shifts (PLACEMENT_METHODS) and
+    granularity the step(s) between their candidate start times.
+
+    formulation selects the model (FORMULATIONS): "tasks" assigns every
+    task (or group) in the model, "buckets" only solves worker counts
+    against the nurses required per time bucket and hands the tasks out
+    afterwards (see build_bucket_model), and "auto" uses "buckets" when
+    the task model would have more than bucket_threshold variables.
+    Capacity, lazy rows and local search only apply to "tasks".
+
+    The size of the model is estimated before it is built
+    (result.model_size) and held against limits (a SizeLimits, the
+    defaults if None), which may switch to a cheaper model or refuse it
+    (see check_model_size); result.size_notes says which.
+
+    The tables are screened before the model is built (result.screening).
+    An IIS is only computed for infeasible models when iis_time_limit is
+    given; otherwise use compute_iis() on demand.
+
+    Raises OptimizationInputError if either table is empty,
+    ModelTooLargeError if the model is over the limits, ValueError for a
+    granularity check_granularity rejects, and lets GurobiError propagate.
+    """
+    granularity = check_granularity(granularity)
+    if formulation not in FORMULATIONS:
+        raise ValueError(f"Unknown formulation {formulation!r}")
+    if tasks_df.empty or shifts_df.empty:
+        raise OptimizationInputError("Tasks or shifts data is missing. Add data and try again.")
+
+    if profiler is None:
+        profiler = Profiler()
+
+    with profiler.span("prepare"):
+        tasks_df, shifts_df = prepare_tables(tasks_df, shifts_df)
+
+    with profiler.span("screen"):
+        screening = screen_instance(tasks_df, shifts_df)
+
+    pruned_shifts = pd.DataFrame()
+    if prune:
+        with profiler.span("prune"):
+            shifts_df, pruned_shifts = prune_shifts(shifts_df)
+
+    with profiler.span("estimate"):
+        size = estimate_model_size(tasks_df, shifts_df, aggregate=aggregate, capacity=capacity,
+                                   formulation="buckets" if formulation == "buckets" else "tasks")
+        if formulation == "auto" and size.num_vars > bucket_threshold:
+            logger.info("Estimated %d task model variables, solving the bucket model", size.num_vars)
+            size = estimate_model_size(tasks_df, shifts_df, capacity=capacity, formulation="buckets")
+        size, size_notes = check_model_size(tasks_df, shifts_df, size, limits)
+    for note in size_notes:
+        logger.warning(note)
+    formulation, aggregate, capacity = size.formulation, size.aggregate, size.capacity
+
+    env = create_env(output_flag)
+
+    with profiler.span("build"):
+        if formulation == "buckets":
+            model, shift_worker_vars = build_bucket_model(tasks_df, shifts_df, env=env, profiler=profiler)
+            task_shift_vars = None
+        else:
+            model, shift_worker_vars, task_shift_vars = build_model(
+                tasks_df, shifts_df, env=env, profiler=profiler, aggregate=aggregate, capacity=capacity
+            )
+
+    for name, value in (params or {}).items():
+        model.setParam(name, value)
+
+    callback = None
+    if on_progress is not None or stop_event is not None:
+        callback = progress_callback(on_progress, stop_event)
+    worker = None
+    if local_search and task_shift_vars is not None:
+        worker = LocalSearchWorker(model, shift_worker_vars, task_shift_vars).start()
+        callback = worker.callback(callback)
+
+    with profiler.span("solve"):
+        try:
+            solve_model(model, callback, rounds=lazy_rounds)
+        finally:
+            if worker is not None:
+                worker.stop()
+                logger.info("Local search injected %d plans", worker.injected)
+
+    result = OptimizationResult(
+        status=STATUS_NAMES.get(model.status, str(model.status)),
+        timings=profiler.timings(),
+        num_vars=model.NumVars,
+        num_constrs=model.NumConstrs,
+        screening=screening,
+        pruned_shifts=pruned_shifts,
+        formulation=formulation,
+        model_size=size,
+        size_notes=size_notes,
+    )
+    result.telemetry = collect_telemetry(
+        model, tasks_df, shifts_df, build_seconds=result.timings.get("build")
+    )
+
+    if model.SolCount == 0 or model.status in NO_PLAN_STATUSES:
+        if model.status in (GRB.INFEASIBLE, GRB.INF_OR_UNBD) and iis_time_limit is not None:
+            # Infeasibility diagnostics
+            with profiler.span("iis"):
+                result.infeasible_constraints = _iis_constraints(model, iis_time_limit)
+            result.timings = profiler.timings()
+        return result
+
+    with profiler.span("post_process"):
+        result.objective_value = model.ObjVal
+        result.mip_gap = _model_attr(model, "MIPGap")
+        result.objective_bound = _model_attr(model, "ObjBound")
+        if task_shift_vars is None:
+            assignments, worker_counts = bucket_assignments(model, shift_worker_vars, shifts_df)
+        else:
+            assignments = chosen_assignments(model, task_shift_vars)
+            worker_counts = dict(zip(shift_worker_vars, model.getAttr("X", list(shift_worker_vars.values()))))
+        result.results_df, result.nurse_requirements_df, result.day_summary_df = post_process(
+            tasks_df, shifts_df, assignments, worker_counts, profiler=profiler, placement=placement,
+            granularity=granularity
+        )
+    result.timings = profiler.timings()
+    if on_progress is not None:
+        # Final point, so the progress trace ends at the reported result
+        on_progress({
+            "time": model.Runtime,
+            "incumbent": model.ObjVal,
+            "bound": _model_attr(model, "ObjBound"),
+            "gap": result.mip_gap,
+            "nodes": _model_attr(model, "NodeCount"),
+        })
+    return result
+
+
+PREVIEW_METHODS = {
+    "lp": "Rounded LP relaxation",
+    "greedy": "Cheapest covering shift",
+}
+PREVIEW_STATUS = "APPROXIMATE"
+
+
+def round_assignment(units, task_shift_vars, shifts_df, values=None, aggregate=True):
+    """
+    Integer values for task_shift_vars that cover every task: the whole
+    part of each LP value in values ({var: value}) is kept, and the tasks
+    still missing go to the largest fractional parts, cheaper shifts
+    first. Without values every task goes to its cheapest shift.
+    Returns {var: value}.
+    """
+    values = values or {}
+    weights = shifts_df["Weight"]
+    by_unit = defaultdict(list)
+    for (unit_id, shift_id, day), var in task_shift_vars.items():
+        by_unit[unit_id].append((values.get(var, 0.0), weights[shift_id], var))
+
+    rounded = {}
+    for unit_id, options in by_unit.items():
+        remaining = int(units.at[unit_id, "Count"]) if aggregate else 1
+        for x, _, var in sorted(options, key=lambda o: (-np.floor(o[0] + 1e-6), o[1])):
+            take = min(int(np.floor(x + 1e-6)), remaining)
+            rounded[var] = take
+            remaining -= take
+        for x, _, var in sorted(options, key=lambda o: (-(o[0] - np.floor(o[0] + 1e-6)), o[1])):
+            if remaining == 0:
+                break
+            rounded[var] += 1
+            remaining -= 1
+    return rounded
+
+
+def preview(tasks_df, shifts_df, method="lp", profiler=None, aggregate=True, prune=True,
+            capacity=DEFAULT_CAPACITY, placement=DEFAULT_PLACEMENT, granularity=DEFAULT_GRANULARITY,
+            limits=None):
+    """
+    Approximate plan in milliseconds instead of a MIP solve, for quick
+    cost estimates while editing data. method "lp" solves the LP
+    relaxation and rounds it (round_assignment); "greedy" puts every task
+    on its cheapest covering shift. With the assignment fixed, the worker
+    counts follow from one more trivial solve, so the plan is feasible.
+
+    The result has status PREVIEW_STATUS; for "lp" the LP optimum is the
+    objective_bound and mip_gap the distance to it. A "lazy" capacity is
+    previewed with the full "peak" rows. Raises OptimizationInputError
+    like optimize(), and ModelTooLargeError for a model over limits (a
+    SizeLimits) unless their action is "warn", as a preview has no
+    cheaper model to switch to.
+    """
+    if method not in PREVIEW_METHODS:
+        raise ValueError(f"Unknown preview method {method!r}")
+    granularity = check_granularity(granularity)
+    if tasks_df.empty or shifts_df.empty:
+        raise OptimizationInputError("Tasks or shifts data is missing. Add data and try again.")
+
+    if profiler is None:
+        profiler = Profiler()
+
+    with profiler.span("prepare"):
+        tasks_df, shifts_df = prepare_tables(tasks_df, shifts_df)
+
+    pruned_shifts = pd.DataFrame()
+    if prune:
+        with profiler.span("prune"):
+            shifts_df, pruned_shifts = prune_shifts(shifts_df)
+
+    capacity = "peak" if capacity == "lazy" else capacity
+    with profiler.span("estimate"):
+        size = estimate_model_size(tasks_df, shifts_df, aggregate=aggregate, capacity=capacity)
+    limits = limits if limits is not None else SizeLimits()
+    exceeded = limits.exceeded(size)
+    if exceeded and limits.action != "warn":
+        raise ModelTooLargeError(size, exceeded)
+
+    with profiler.span("build"):
+        model, shift_worker_vars, task_shift_vars = build_model(
+            tasks_df, shifts_df, env=create_env(False), profiler=profiler, aggregate=aggregate,
+            capacity=capacity
+        )
+
+    bound = None
+    values = None
+    if method == "lp":
+        with profiler.span("relax"):
+            relaxed = model.relax()
+            relaxed.optimize()
+            if relaxed.status == GRB.OPTIMAL:
+                bound = relaxed.ObjVal
+                values = dict(zip(model.getVars(), relaxed.getAttr("X", relaxed.getVars())))
+            relaxed.dispose()
+
+    with profiler.span("round"):
+        units = getattr(model, "_task_groups", tasks_df)
+        for var, value in round_assignment(units, task_shift_vars, shifts_df, values, aggregate).items():
+            var.LB = var.UB = value
+        model.optimize()
+
+    result = OptimizationResult(
+        status=PREVIEW_STATUS,
+        timings=profiler.timings(),
+        num_vars=model.NumVars,
+        num_constrs=model.NumConstrs,
+        pruned_shifts=pruned_shifts,
+        model_size=size,
+    )
+    if model.SolCount == 0:
+        result.status = STATUS_NAMES.get(model.status, str(model.status))
+        return result
+
+    with profiler.span("post_process"):
+        assignments = chosen_assignments(model, task_shift_vars)
+        worker_counts = dict(zip(shift_worker_vars, model.getAttr("X", list(shift_worker_vars.values()))))
+        result.objective_value = model.ObjVal
+        result.objective_bound = bound
+        result.mip_gap = _gap(model.ObjVal, bound)
+        result.results_df, result.nurse_requirements_df, result.day_summary_df = post_process(
+            tasks_df, shifts_df, assignments, worker_counts, profiler=profiler, placement=placement,
+            granularity=granularity
+        )
+    result.timings = profiler.timings()
+    model.dispose()
+    return result
+
+
+def optimize_db(db_file, output_flag=True, profiler=None, **options):
+    """Load the task and shift tables from db_file and optimize them (options as for optimize)."""
+    if profiler is None:
+        profiler = Profiler()
+    with profiler.span("load"):
+        tasks_df, shifts_df = load_tables(db_file)
+    return optimize(tasks_df, shifts_df, output_flag=output_flag, profiler=profiler, **options)
+
+
+class SolveJob:
+    """
+    Run optimize() in a background thread, so a UI can poll its progress
+    and stop it. Progress updates are appended to `progress` (newest
+    last); after stop() the solve ends with its best incumbent, which is
+    post-processed as usual.
+
+        job = SolveJob(tasks_df, shifts_df, params={"TimeLimit": 60}).start()
+        ...
+        if job.done:
+            result = job.result  # or job.error
+
+    Further keyword options (aggregate, capacity, ...) go to optimize().
+    """
+
+    def __init__(self, tasks_df, shifts_df, params=None, profiler=None, **options):
+        self.tasks_df = tasks_df
+        self.shifts_df = shifts_df
+        self.params = params or {}
+        self.options = options
+        self.profiler = profiler if profiler is not None else Profiler()
+        self.progress = []
+        self.result = None
+        self.error = None
+        self.started_at = None
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="SolveJob", daemon=True)
+
+    def _run(self):
+        try:
+            self.result = optimize(
+                self.tasks_df, self.shifts_df, output_flag=False, profiler=self.profiler,
+                params=self.params, on_progress=self.progress.append, stop_event=self._stop_event,
+                **self.options
+            )
+        except Exception as e:  # reported to the caller through job.error
+            self.error = e
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Ask the solver to stop and keep the best incumbent found so far."""
+        self._stop_event.set()
+
+    @property
+    def stopping(self):
+        return self._stop_event.is_set()
+
+    @property
+    def done(self):
+        return self.started_at is not None and not self._thread.is_alive()
+
+    @property
+    def elapsed(self):
+        return 0.0 if self.started_at is None else time.time() - self.started_at
+
+    def latest(self):
+        """The most recent progress update, or None before the first one."""
+        return self.progress[-1] if self.progress else None
+
+
+# ------------------------------------------------------------------
+#                               CLI
+# ------------------------------------------------------------------
+def write_outputs(result, output_dir, fmt):
+    """Write the result frames of a run to output_dir and return the paths."""
+    os.makedirs(output_dir, exist_ok=True)
+    if fmt == "csv":
+        paths = []
+        for name, df in (
+            ("task_assignments", result.results_df),
+            ("nurse_requirements", result.nurse_requirements_df),
+            ("daily_summary", result.day_summary_df),
+            ("nurse_roster", nurse_roster(result.results_df)),
+        ):
+            path = os.path.join(output_dir, f"{name}.csv")
+            df.to_csv(path, index=False)
+            paths.append(path)
+        return paths
+
+    from export import EXPORT_FORMATS, export_results
+    path = os.path.join(output_dir, f"optimization_results.{EXPORT_FORMATS[fmt]['extension']}")
+    with open(path, "wb") as f:
+        f.write(export_results(result.frames(), fmt))
+    return [path]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m engine",
+        description="Run the task-shift optimization without the Streamlit app."
+    )
+    parser.add_argument("--db", default="tasksv2.db", help="SQLite database with the task and shift tables")
+    parser.add_argument("--output", help="Directory to write the result tables to")
+    parser.add_argument("--format", choices=["csv", "parquet", "xlsx"], default="csv",
+                        help="File format for --output (default: csv)")
+    parser.add_argument("--save", action="store_true",
+                        help="Store the run and its solver telemetry in the database so the app can display them")
+    parser.add_argument("--preset", choices=list(SOLVER_PRESETS) + [TUNED_PRESET],
+                        help="Solver parameter preset (default: the tuned settings stored in --db, "
+                             f"otherwise {DEFAULT_PRESET})")
+    parser.add_argument("--time-limit", type=float,
+                        help="Stop after this many seconds and keep the best plan found")
+    parser.add_argument("--mip-gap", type=float,
+                        help="Stop once the relative gap to the bound is below this value (e.g. 0.01)")
+    parser.add_argument("--iis-time-limit", type=float,
+                        help="If the model is infeasible, search an IIS for at most this many seconds")
+    parser.add_argument("--no-aggregate", action="store_true",
+                        help="One binary per task instead of grouping interchangeable tasks")
+    parser.add_argument("--no-prune", action="store_true",
+                        help="Keep inactive, duplicate and dominated shifts in the model")
+    parser.add_argument("--capacity", choices=list(CAPACITY_MODES), default=DEFAULT_CAPACITY,
+                        help="Worker capacity formulation: all tasks of a shift at once (sum), "
+                             "only overlapping task windows (peak), or those rows added when violated "
+                             f"(lazy) (default: {DEFAULT_CAPACITY})")
+    parser.add_argument("--lazy-rounds", action="store_true",
+                        help="With --capacity lazy, add violated rows in cutting-plane rounds instead of a callback")
+    parser.add_argument("--local-search", action="store_true",
+                        help="Run a local-search process next to the solver that injects better plans")
+    parser.add_argument("--placement", choices=list(PLACEMENT_METHODS), default=DEFAULT_PLACEMENT,
+                        help="How tasks are placed inside their shifts: lowest peak by branch and bound "
+                             f"(exact) or task by task (greedy) (default: {DEFAULT_PLACEMENT})")
+    parser.add_argument("--granularity", type=int, nargs="+", default=list(DEFAULT_GRANULARITY),
+                        metavar="MINUTES",
+                        help="Step between candidate task start times; several steps such as 60 15 5 "
+                             "place tasks hourly first and refine around that placement "
+                             f"(default: {' '.join(map(str, DEFAULT_GRANULARITY))})")
+    parser.add_argument("--formulation", choices=list(FORMULATIONS), default=DEFAULT_FORMULATION,
+                        help="Assign every task in the model (tasks), only solve worker counts against the "
+                             "nurses required per time bucket (buckets), or buckets once the task model "
+                             f"would exceed --bucket-threshold variables (auto) (default: {DEFAULT_FORMULATION})")
+    parser.add_argument("--bucket-threshold", type=int, default=BUCKET_VAR_THRESHOLD,
+                        help="Estimated task model variables above which auto uses buckets "
+                             "(default: %(default)s)")
+    defaults = SizeLimits()
+    parser.add_argument("--max-vars", type=int, default=defaults.max_vars,
+                        help="Largest model to build, in variables (default: %(default)s)")
+    parser.add_argument("--max-nonzeros", type=int, default=defaults.max_nonzeros,
+                        help="Largest model to build, in constraint nonzeros (default: %(default)s)")
+    parser.add_argument("--max-memory-mb", type=float, default=defaults.max_memory_mb,
+                        help="Largest model to build, in projected MB (default: %(default)s)")
+    parser.add_argument("--on-too-large", choices=list(SIZE_ACTIONS), default=defaults.action,
+                        help="For a larger model: switch to grouped tasks, lazy rows or buckets (route), "
+                             "stop with an error (refuse) or build it anyway (warn) (default: %(default)s)")
+    parser.add_argument("--estimate", action="store_true",
+                        help="Only print the projected size of the task and bucket models, without building them")
+    parser.add_argument("--preview", nargs="?", const="lp", choices=list(PREVIEW_METHODS),
+                        help="Instant approximate plan instead of the MIP solve: rounded LP relaxation "
+                             "(lp, the default) or cheapest covering shifts (greedy)")
+    parser.add_argument("--quiet", action="store_true", help="Hide the Gurobi log")
+    parser.add_argument("--json", action="store_true", help="Print the run summary as JSON")
+    args = parser.parse_args(argv)
+    try:
+        check_granularity(args.granularity)
+    except ValueError as e:
+        parser.error(str(e))
+    limits = SizeLimits(max_vars=args.max_vars, max_nonzeros=args.max_nonzeros,
+                        max_memory_mb=args.max_memory_mb, action=args.on_too_large)
+
+    if args.estimate:
+        tasks_df, shifts_df = prepare_tables(*load_tables(args.db))
+        if not args.no_prune:
+            shifts_df, _ = prune_shifts(shifts_df)
+        sizes = {
+            "tasks": estimate_model_size(tasks_df, shifts_df, aggregate=not args.no_aggregate,
+                                         capacity=args.capacity),
+            "buckets": estimate_model_size(tasks_df, shifts_df, formulation="buckets"),
+        }
+        if args.json:
+            print(json.dumps({name: size.as_dict() for name, size in sizes.items()}, indent=2))
+        else:
+            for name, size in sizes.items():
+                over = limits.exceeded(size)
+                print(f"{name.capitalize() + ':':<15}{size.describe()}"
+                      + (f", over the limit for {', '.join(over)}" if over else ""))
+        return 0
+
+    import database
+    database.DB_FILE = args.db
+    database.init_db()
+    presets = solver_presets(database.get_tuned_settings())
+    preset = args.preset or default_preset(presets)
+    if preset not in presets:
+        print(f"error: no tuned settings in {args.db}; run python -m tuning first", file=sys.stderr)
+        return 2
+    params = dict(presets[preset])
+    if args.time_limit is not None:
+        params["TimeLimit"] = args.time_limit
+    if args.mip_gap is not None:
+        params["MIPGap"] = args.mip_gap
+
+    try:
+        if args.preview:
+            result = preview(*load_tables(args.db), method=args.preview, aggregate=not args.no_aggregate,
+                             prune=not args.no_prune, capacity=args.capacity, placement=args.placement,
+                             granularity=args.granularity, limits=limits)
+        else:
+            # Ctrl+C interrupts the solve; the best plan found so far is kept
+            result = optimize_db(args.db, output_flag=not args.quiet, params=params,
+                                 iis_time_limit=args.iis_time_limit, aggregate=not args.no_aggregate,
+                                 prune=not args.no_prune, capacity=args.capacity, lazy_rounds=args.lazy_rounds,
+                                 local_search=args.local_search, placement=args.placement,
+                                 granularity=args.granularity, formulation=args.formulation,
+                                 bucket_threshold=args.bucket_threshold, limits=limits)
+    except OptimizationInputError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    summary = result.summary()
+    if args.preview:
+        summary["preview"] = args.preview
+    else:
+        summary["preset"] = preset
+    if args.save:
+        if result.has_solution:
+            summary["run_id"] = database.save_optimization_run(
+                result.results_df, result.nurse_requirements_df, result.day_summary_df,
+                status=result.status, objective_value=result.objective_value
+            )
+        if result.telemetry:
+            database.save_solver_telemetry(result.telemetry, run_id=summary.get("run_id"), source="cli")
+    if result.has_solution:
+        if args.output:
+            summary["outputs"] = write_outputs(result, args.output, args.format)
+    else:
+        summary["infeasible_constraints"] = result.infeasible_constraints
+
+    if args.json:
+        print(json.dumps(summary, indent=2, default=str))
+    else:
+        if args.preview:
+            print(f"Preview:       {PREVIEW_METHODS[args.preview]}")
+        else:
+            print(f"Preset:        {preset}")
+            print(f"Formulation:   {FORMULATIONS[result.formulation]}")
+        for note in result.size_notes:
+            print(f"Model size:    {note}")
+        if result.screening is not None and not result.screening.ok:
+            counts = result.screening.counts()
+            print(f"Screening:     {counts['uncovered']} uncovered, {counts['break_conflicts']} break "
+                  f"conflicts, {counts['capacity_conflicts']} capacity conflicts")
+        for shift_id, row in result.pruned_shifts.iterrows():
+            print(f"Pruned shift:  {shift_id} ({row['StartTime']}-{row['EndTime']}): {row['Reason']}")
+        print(f"Status:        {result.status}")
+        if result.has_solution:
+            if not result.is_optimal and result.objective_bound is not None:
+                print(f"Bound:         €{result.objective_bound:,.2f}")
+            if not result.is_optimal and result.mip_gap is not None:
+                print(f"Gap:           {result.mip_gap:.2%}")
+            print(f"Total cost:    €{result.total_cost:,.2f}")
+            print(f"Total workers: {result.total_workers}")
+            print(f"Tasks:         {result.total_tasks}")
+        for name in result.infeasible_constraints:
+            print(f"Infeasible constraint: {name}")
+        print("Timings:       " + ", ".join(f"{k} {v:.3f}s" for k, v in result.timings.items()))
+        for path in summary.get("outputs", []):
+            print(f"Wrote {path}")
+        if "run_id" in summary:
+            print(f"Saved as run #{summary['run_id']}")
+    return 0 if result.has_solution else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Export of optimization results to columnar (Parquet) and Excel files.
+
+The payloads are only built when a download is requested; callers pass
+the frames of a run and get the file bytes back.
+"""
+import io
+import math
+import tempfile
+import zipfile
+
+import xlsxwriter
+
+# Frame key -> sheet / file name, in the order they appear in an export
+EXPORT_TABLES = {
+    "results_df": "assignments",
+    "nurse_requirements_df": "nurse_requirements",
+    "day_summary_df": "daily_summary",
+    "roster_df": "nurse_roster",
+}
+
+EXPORT_FORMATS = {
+    "parquet": {
+        "label": "Parquet (zip of Arrow tables)",
+        "extension": "zip",
+        "mime": "application/zip",
+    },
+    "xlsx": {
+        "label": "Excel workbook (one sheet per table)",
+        "extension": "xlsx",
+        "mime": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    },
+}
+
+
+def export_parquet(frames):
+    """
+    Write each result table as a Parquet file and bundle them in a zip.
+    Requires pyarrow.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+        for key, name in EXPORT_TABLES.items():
+            table = pa.Table.from_pandas(frames[key], preserve_index=False)
+            table_buffer = pa.BufferOutputStream()
+            pq.write_table(table, table_buffer, compression="zstd")
+            archive.writestr(f"{name}.parquet", table_buffer.getvalue().to_pybytes())
+    return buffer.getvalue()
+
+
+def _clean_cell(value):
+    # xlsxwriter cannot write NaN; leave those cells blank
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def export_excel(frames):
+    """
+    Write the result tables to a multi-sheet workbook.
+    The workbook runs in constant_memory mode, so rows are streamed to
+    disk one at a time instead of being held as cell objects.
+    """
+    with tempfile.TemporaryFile() as output:
+        workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+        header_format = workbook.add_format({"bold": True})
+        for key, name in EXPORT_TABLES.items():
+            df = frames[key]
+            worksheet = workbook.add_worksheet(name)
+            worksheet.write_row(0, 0, list(df.columns), header_format)
+            for row_idx, row in enumerate(df.itertuples(index=False, name=None), start=1):
+                worksheet.write_row(row_idx, 0, [_clean_cell(v) for v in row])
+        workbook.close()
+        output.seek(0)
+        return output.read()
+
+
+def export_results(frames, fmt):
+    """Build the download payload of a run in the requested format."""
+    if fmt == "parquet":
+        return export_parquet(frames)
+    if fmt == "xlsx":
+        return export_excel(frames)
+    raise ValueError(f"Unknown export format: {fmt}")
@@ -0,0 +1,247 @@
+"""
+Seeded generator of synthetic task and shift instances.
+
+The generated tables use the same columns and string formats as
+TasksTable3 and ShiftsTable6, so they can be fed straight to the engine
+or written to a database:
+
+    python -m generator --tasks 1000 --seed 7 --db synthetic.db
+
+--nurses adds a nurse registry (NursesTable) for rostering the plan.
+"""
+import argparse
+import json
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from engine import DAY_NAMES, _minutes, compatibility, format_clock, format_duration, prepare_tables
+
+TASK_NAMES = [
+    "Dressing Change", "Vital Signs Monitoring", "Wound Care",
+    "Medication Administration", "Physical Therapy",
+]
+
+# Typical shift patterns: (start hour, length in hours, relative weight per hour).
+# The engine matches tasks and shifts on same-day clock times, so every
+# pattern stays within the day; night demand is covered from midnight.
+SHIFT_PATTERNS = [
+    (7, 8, 1.0),     # day
+    (15, 8, 1.15),   # evening
+    (0, 8, 1.35),    # night
+    (6, 8, 1.0),     # early
+    (8, 6, 1.0),     # short day
+    (14, 6, 1.1),    # short evening
+    (18, 6, 1.25),   # late
+    (9, 8, 1.05),    # office hours
+    (12, 12, 1.3),   # long evening
+    (7, 12, 1.1),    # long day
+]
+
+# Latest end of a generated shift; generated task windows end by then too
+DAY_END_MINUTES = 24 * 60 - 15
+
+# Shift added for a task the generated catalog cannot hold: (length in hours, weight per hour)
+COVER_SHIFT = (8, 1.2)
+
+# Hour-of-day demand profile for task start times (morning and evening rounds)
+_HOURLY_DEMAND = np.array([
+    1, 1, 1, 1, 1, 2, 4, 6, 8, 8, 6, 5,
+    5, 5, 6, 6, 5, 5, 6, 6, 4, 3, 2, 1,
+], dtype=float)
+
+
+def generate_tasks(num_tasks, seed=0):
+    """
+    Generate num_tasks tasks. Start times follow a morning/evening demand
+    profile on a 15-minute grid; each task's window is at least as long
+    as its duration and stays within the day.
+    """
+    rng = np.random.default_rng(seed)
+
+    probs = _HOURLY_DEMAND / _HOURLY_DEMAND.sum()
+    start_hour = rng.choice(24, size=num_tasks, p=probs)
+    start = start_hour * 60 + rng.integers(0, 4, size=num_tasks) * 15
+
+    duration = rng.choice([15, 30, 45, 60, 90, 120], size=num_tasks,
+                          p=[0.25, 0.3, 0.15, 0.15, 0.1, 0.05])
+    slack = rng.choice([0, 15, 30, 60, 90, 120], size=num_tasks,
+                       p=[0.2, 0.2, 0.2, 0.2, 0.1, 0.1])
+    # Keep the whole window before midnight
+    start = np.minimum(start, DAY_END_MINUTES - duration - slack)
+    end = start + duration + slack
+
+    return pd.DataFrame({
+        "id": np.arange(1, num_tasks + 1),
+        "TaskName": rng.choice(TASK_NAMES, size=num_tasks),
+        "Day": rng.choice(DAY_NAMES, size=num_tasks),
+        "StartTime": [format_clock(m) for m in start],
+        "EndTime": [format_clock(m) for m in end],
+        "Duration": [format_duration(m) for m in duration],
+        "NursesRequired": rng.choice([1, 2, 3, 4, 5], size=num_tasks,
+                                     p=[0.35, 0.3, 0.15, 0.12, 0.08]),
+    })
+
+
+def generate_shifts(num_shifts, seed=0):
+    """
+    Generate num_shifts shifts from the typical patterns, jittered by up
+    to an hour but kept within the day, each with a break near the middle
+    and a random set of active days.
+    """
+    rng = np.random.default_rng(seed + 1)
+
+    rows = []
+    for shift_id in range(1, num_shifts + 1):
+        start_hour, length, rate = SHIFT_PATTERNS[(shift_id - 1) % len(SHIFT_PATTERNS)]
+        length_minutes = length * 60
+        start = start_hour * 60 + int(rng.integers(-4, 5)) * 15
+        start = min(max(start, 0), DAY_END_MINUTES - length_minutes)
+        break_minutes = 30 if length <= 6 else int(rng.choice([30, 45, 60]))
+        break_start = start + (length_minutes // 2) - int(rng.integers(0, 3)) * 15
+
+        active = rng.random(7) < 0.7
+        if not active.any():
+            active[rng.integers(0, 7)] = True
+
+        rows.append({
+            "id": shift_id,
+            "StartTime": format_clock(start),
+            "EndTime": format_clock(start + length_minutes),
+            "BreakTime": format_clock(break_start),
+            "BreakDuration": format_duration(break_minutes),
+            "Weight": round(length * rate * float(rng.uniform(0.9, 1.1)), 2),
+            **{day: int(flag) for day, flag in zip(DAY_NAMES, active)},
+        })
+    return pd.DataFrame(rows)
+
+
+# Pay grades of generated nurses: (share, cost factor on the shift Weight)
+NURSE_GRADES = [(0.5, 1.0), (0.3, 1.15), (0.2, 0.9)]
+NURSE_CONTRACT_HOURS = [24, 32, 36, 40]
+
+
+def generate_nurses(num_nurses, shifts_df, seed=0):
+    """
+    Generate a nurse registry: contract hours, five to seven available
+    days and shift costs from a pay grade (the shift Weight times the
+    grade factor), keyed by the ids in shifts_df.
+    """
+    rng = np.random.default_rng(seed + 2)
+    shares = np.array([share for share, _ in NURSE_GRADES])
+    rows = []
+    for nurse_id in range(1, num_nurses + 1):
+        _, factor = NURSE_GRADES[rng.choice(len(NURSE_GRADES), p=shares / shares.sum())]
+        available = np.ones(7, dtype=bool)
+        available[rng.choice(7, size=int(rng.integers(0, 3)), replace=False)] = False
+        rows.append({
+            "id": nurse_id,
+            "Name": f"Nurse {nurse_id:04d}",
+            "MaxWeeklyHours": float(rng.choice(NURSE_CONTRACT_HOURS)),
+            **{day: int(flag) for day, flag in zip(DAY_NAMES, available)},
+            "ShiftCosts": json.dumps({
+                str(shift_id): round(weight * factor, 2)
+                for shift_id, weight in zip(shifts_df["id"], shifts_df["Weight"])
+            }) if factor != 1.0 else None,
+        })
+    return pd.DataFrame(rows)
+
+
+def _cover_tasks(tasks_df, shifts_df):
+    """
+    Return shifts_df completed so that every task fits some shift: a task
+    no shift holds on its day gets the first shift that could hold it
+    activated on that day, or else a new COVER_SHIFT around its window.
+    """
+    shifts_df = shifts_df.copy()
+    prepared_tasks, prepared_shifts = prepare_tables(tasks_df, shifts_df)
+    missing = np.flatnonzero(~compatibility(prepared_tasks, prepared_shifts).any(axis=1))
+    length, rate = COVER_SHIFT
+    for i in missing:
+        task = prepared_tasks.iloc[[i]]
+        day = task["Day"].iloc[0]
+        _, prepared_shifts = prepare_tables(tasks_df.iloc[[i]], shifts_df)
+        if compatibility(task, prepared_shifts).any():
+            continue
+        holds = compatibility(task, prepared_shifts.assign(**{d: 1 for d in DAY_NAMES}))[0]
+        if holds.any():
+            shifts_df.loc[shifts_df.index[np.argmax(holds)], day] = 1
+            continue
+
+        task_start, task_end = _minutes(task["StartTime"])[0], _minutes(task["EndTime"])[0]
+        start = min(max(task_start - 60, 0), DAY_END_MINUTES - length * 60)
+        break_start = task_start - 30 if task_start - start >= 30 else task_end
+        shifts_df = pd.concat([shifts_df, pd.DataFrame([{
+            "id": int(shifts_df["id"].max()) + 1,
+            "StartTime": format_clock(start),
+            "EndTime": format_clock(start + length * 60),
+            "BreakTime": format_clock(break_start),
+            "BreakDuration": format_duration(30),
+            "Weight": round(length * rate, 2),
+            **{d: int(d == day) for d in DAY_NAMES},
+        }])], ignore_index=True)
+    return shifts_df
+
+
+def default_num_shifts(num_tasks):
+    """Catalog size that grows slowly with the number of tasks."""
+    return int(min(200, max(10, num_tasks // 50)))
+
+
+def generate_instance(num_tasks, seed=0, num_shifts=None):
+    """
+    Return (tasks_df, shifts_df) for a synthetic instance in which every
+    task fits at least one shift (see _cover_tasks).
+    """
+    if num_shifts is None:
+        num_shifts = default_num_shifts(num_tasks)
+    tasks_df = generate_tasks(num_tasks, seed)
+    return tasks_df, _cover_tasks(tasks_df, generate_shifts(num_shifts, seed))
+
+
+def write_instance(db_file, tasks_df, shifts_df):
+    """Append a generated instance to the task and shift tables of db_file."""
+    import database
+
+    previous_db = database.DB_FILE
+    database.DB_FILE = db_file
+    try:
+        database.init_db()
+    finally:
+        database.DB_FILE = previous_db
+
+    conn = sqlite3.connect(db_file)
+    tasks_df.drop(columns="id").to_sql("TasksTable3", conn, if_exists="append", index=False)
+    shifts_df.drop(columns="id").to_sql("ShiftsTable6", conn, if_exists="append", index=False)
+    conn.commit()
+    conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m generator",
+        description="Generate a synthetic task/shift instance."
+    )
+    parser.add_argument("--tasks", type=int, default=1000, help="Number of tasks")
+    parser.add_argument("--shifts", type=int, help="Number of shifts (default: scales with --tasks)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--nurses", type=int, default=0,
+                        help="Also replace the nurse registry with this many generated nurses")
+    parser.add_argument("--db", required=True, help="SQLite database to append the instance to")
+    args = parser.parse_args(argv)
+
+    tasks_df, shifts_df = generate_instance(args.tasks, seed=args.seed, num_shifts=args.shifts)
+    write_instance(args.db, tasks_df, shifts_df)
+    print(f"Wrote {len(tasks_df)} tasks and {len(shifts_df)} shifts to {args.db}")
+    if args.nurses:
+        import database
+        database.DB_FILE = args.db
+        # Shift costs refer to the ids the shifts got in the database
+        shifts_df = database.get_all("ShiftsTable6")
+        database.save_nurses(generate_nurses(args.nurses, shifts_df, seed=args.seed))
+        print(f"Wrote {args.nurses} nurses to {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Lightweight profiling spans.
+
+    profiler = Profiler()
+    with profiler.span("build"):
+        with profiler.span("variables"):
+            ...
+    profiler.to_frame()
+
+Each span records wall time, CPU time and (optionally) the tracemalloc
+peak reached while it was open. Spans nest; the profile of a run can be
+appended to a JSON-lines log file.
+"""
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import pandas as pd
+
+PROFILE_LOG_FILE = "optimization_profile.jsonl"
+
+_MB = 1024 * 1024
+
+
+class Profiler:
+    """Collects nested timing spans."""
+
+    def __init__(self, track_memory=False):
+        self.track_memory = track_memory
+        self.spans = []       # finished spans, in start order
+        self._stack = []      # open spans
+        self._started_tracing = False
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Time the body of a with block as one span."""
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+        record = {
+            "name": name,
+            "depth": len(self._stack),
+            "parent": self._stack[-1]["name"] if self._stack else None,
+            **attrs,
+        }
+        self.spans.append(record)
+
+        if self.track_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # Keep the parent's peak before resetting for this span
+                parent = self._stack[-1]
+                parent["_peak"] = max(parent["_peak"], peak)
+            tracemalloc.reset_peak()
+            record["_start_mem"] = current
+            record["_peak"] = current
+        self._stack.append(record)
+
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_s"] = time.perf_counter() - wall_started
+            record["cpu_s"] = time.process_time() - cpu_started
+            self._stack.pop()
+            if self.track_memory:
+                peak = max(record.pop("_peak"), tracemalloc.get_traced_memory()[1])
+                record["peak_mb"] = (peak - record.pop("_start_mem")) / _MB
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent["_peak"] = max(parent["_peak"], peak)
+            if not self._stack and self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def timings(self):
+        """Wall seconds of the top-level spans, by name."""
+        return {s["name"]: s["wall_s"] for s in self.spans if s["depth"] == 0 and "wall_s" in s}
+
+    def to_frame(self):
+        """The finished spans as a DataFrame, names indented by depth."""
+        rows = [
+            {
+                "Span": "    " * s["depth"] + s["name"],
+                "Wall (ms)": round(s["wall_s"] * 1000, 1),
+                "CPU (ms)": round(s["cpu_s"] * 1000, 1),
+                "Peak Memory (MB)": round(s["peak_mb"], 2) if "peak_mb" in s else None,
+            }
+            for s in self.spans if "wall_s" in s
+        ]
+        return pd.DataFrame(rows, columns=["Span", "Wall (ms)", "CPU (ms)", "Peak Memory (MB)"])
+
+    def write_log(self, path=PROFILE_LOG_FILE, **context):
+        """Append the profile as one JSON line, with extra context fields."""
+        entry = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            **context,
+            "spans": [
+                {k: v for k, v in s.items() if not k.startswith("_")}
+                for s in self.spans if "wall_s" in s
+            ],
+        }
+        with open(path, "a") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+
+
+def span(profiler, name, **attrs):
+    """profiler.span(...) that is a no-op when profiler is None."""
+    if profiler is None:
+        return nullcontext()
+    return profiler.span(name, **attrs)
@@ -0,0 +1,311 @@
+"""
+Anytime local search next to the MIP solve.
+
+A worker process improves plans with task moves between compatible
+(shift, day) pairs and swaps of tasks between two of them, scored on the
+occupancy timeline of the model's capacity rows. Better plans are handed
+to Gurobi through cbSetSolution from the solve's callback, and Gurobi's
+own incumbents are sent back to the worker as new starting points:
+
+    worker = LocalSearchWorker(model, shift_worker_vars, task_shift_vars).start()
+    try:
+        model.optimize(worker.callback())
+    finally:
+        worker.stop()
+"""
+import multiprocessing
+import queue
+import time
+from collections import defaultdict
+
+import numpy as np
+from gurobipy import GRB
+
+# Objective improvements smaller than this are not worth injecting
+MIN_IMPROVEMENT = 1e-6
+
+
+def model_problem(model, shift_worker_vars, task_shift_vars):
+    """
+    Plain (picklable) description of a built model for the worker:
+    the units to cover, their options (one per task-shift variable) and
+    the capacity rows "sum of nurses * option <= workers" of every
+    (shift, day), including rows a capacity="lazy" model has not added yet,
+    and the minimum workers of every (shift, day) (their lower bounds).
+    """
+    option_vars = list(task_shift_vars.values())
+    worker_vars = list(shift_worker_vars.values())
+    option_index = {var: j for j, var in enumerate(option_vars)}
+    worker_index = {var: w for w, var in enumerate(worker_vars)}
+
+    groups = getattr(model, "_task_groups", None)
+    unit_ids = sorted({unit_id for unit_id, _, _ in task_shift_vars}, key=str)
+    unit_pos = {unit_id: u for u, unit_id in enumerate(unit_ids)}
+    option_unit = np.array([unit_pos[unit_id] for unit_id, _, _ in task_shift_vars], dtype=np.int64)
+    option_worker = np.array(
+        [worker_index[shift_worker_vars[(shift_id, day)]] for _, shift_id, day in task_shift_vars],
+        dtype=np.int64,
+    )
+    unit_count = np.array(
+        [int(groups.at[unit_id, "Count"]) if groups is not None else 1 for unit_id in unit_ids],
+        dtype=np.int64,
+    )
+
+    rows = []  # (worker, options, nurses)
+    for constr in model.getConstrs():
+        name = constr.ConstrName
+        if not (name.endswith("_WorkerCap") or "_Peak_" in name):
+            continue
+        expr = model.getRow(constr)
+        options, nurses, worker = [], [], None
+        for k in range(expr.size()):
+            var, coef = expr.getVar(k), expr.getCoeff(k)
+            if var in worker_index:
+                worker = worker_index[var]
+            else:
+                options.append(option_index[var])
+                nurses.append(coef)
+        if worker is not None and options:
+            rows.append((worker, options, nurses))
+    for _, terms, workers in getattr(model, "_lazy_capacity", None) or []:
+        rows.append((worker_index[workers], [option_index[var] for _, var in terms],
+                     [float(nurses) for nurses, _ in terms]))
+
+    return {
+        "option_unit": option_unit,
+        "option_worker": option_worker,
+        "unit_count": unit_count,
+        "worker_cost": np.array(model.getAttr("Obj", worker_vars), dtype=float),
+        "worker_min": np.array(model.getAttr("LB", worker_vars), dtype=float),
+        "rows": rows,
+    }
+
+
+class Neighbourhood:
+    """Lookups over a model_problem shared by all plans of one search."""
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.option_unit = problem["option_unit"]
+        self.option_worker = problem["option_worker"]
+        self.worker_cost = problem["worker_cost"]
+        self.worker_min = problem["worker_min"]
+        self.row_worker = np.array([w for w, _, _ in problem["rows"]], dtype=np.int64)
+        self.rows_of_option = defaultdict(list)  # option -> [(row, nurses)]
+        self.rows_of_worker = defaultdict(list)
+        for r, (w, options, nurses) in enumerate(problem["rows"]):
+            self.rows_of_worker[w].append(r)
+            for j, n in zip(options, nurses):
+                self.rows_of_option[j].append((r, n))
+        self.options_of_unit = defaultdict(list)
+        self.options_of_worker = defaultdict(list)
+        self.option_at = {}  # (unit, worker) -> option
+        for j, (u, w) in enumerate(zip(self.option_unit, self.option_worker)):
+            self.options_of_unit[u].append(j)
+            self.options_of_worker[w].append(j)
+            self.option_at[(u, w)] = j
+
+    def greedy_start(self):
+        """Every unit on its cheapest option."""
+        x = np.zeros(len(self.option_unit), dtype=np.int64)
+        for u, options in self.options_of_unit.items():
+            cheapest = min(options, key=lambda j: self.worker_cost[self.option_worker[j]])
+            x[cheapest] = self.problem["unit_count"][u]
+        return x
+
+
+class Timeline:
+    """
+    A plan (option counts x) with the load of every capacity row, the
+    workers each (shift, day) then needs (its highest row, and at least
+    its minimum) and the cost.
+    """
+
+    def __init__(self, space, x):
+        self.space = space
+        self.x = np.asarray(x, dtype=np.int64).copy()
+        problem = space.problem
+        self.rows_of_option = space.rows_of_option
+        self.rows_of_worker = space.rows_of_worker
+        self.row_worker = space.row_worker
+
+        self.row_load = np.zeros(len(problem["rows"]))
+        for j in np.flatnonzero(self.x):
+            for r, n in self.rows_of_option[j]:
+                self.row_load[r] += n * self.x[j]
+        self.required = space.worker_min.copy()
+        for w, rows in self.rows_of_worker.items():
+            self.required[w] = max(self.row_load[rows].max(), self.required[w])
+        self.cost = float(problem["worker_cost"] @ self.required)
+
+    def evaluate(self, changes):
+        """Cost change of applying [(option, count change)], and the new loads/requirements."""
+        loads = {}
+        for j, dk in changes:
+            for r, n in self.rows_of_option[j]:
+                loads[r] = loads.get(r, self.row_load[r]) + n * dk
+        required = {}
+        for w in {self.row_worker[r] for r in loads}:
+            required[w] = max(
+                self.space.worker_min[w], max(loads.get(r, self.row_load[r]) for r in self.rows_of_worker[w])
+            )
+        cost = self.space.worker_cost
+        delta = sum(cost[w] * (value - self.required[w]) for w, value in required.items())
+        return delta, loads, required
+
+    def apply(self, changes, delta, loads, required):
+        for j, dk in changes:
+            self.x[j] += dk
+        for r, load in loads.items():
+            self.row_load[r] = load
+        for w, value in required.items():
+            self.required[w] = value
+        self.cost += delta
+
+
+def improve(timeline, rng, steps=2000, plateau=0.1):
+    """
+    Random first-improvement search: move one task of a unit to another of
+    its options, or swap tasks of two units between their (shift, day)
+    pairs. Moves that keep the cost are taken with probability plateau.
+    Returns the number of accepted moves.
+    """
+    space = timeline.space
+    option_unit, option_worker = space.option_unit, space.option_worker
+    options_of_unit, options_of_worker, option_at = space.options_of_unit, space.options_of_worker, space.option_at
+
+    accepted = 0
+    for _ in range(steps):
+        used = np.flatnonzero(timeline.x)
+        if len(used) == 0:
+            break
+        a = used[rng.integers(len(used))]
+        alternatives = options_of_unit[option_unit[a]]
+        if len(alternatives) < 2:
+            continue
+        b = alternatives[rng.integers(len(alternatives))]
+        if b == a:
+            continue
+        changes = [(a, -1), (b, 1)]
+        if rng.random() < 0.5:
+            # Swap: a task at b's (shift, day) that can take a's place goes the other way
+            there = [c for c in options_of_worker[option_worker[b]]
+                     if timeline.x[c] > 0 and option_unit[c] != option_unit[a]
+                     and (option_unit[c], option_worker[a]) in option_at]
+            if there:
+                c = there[rng.integers(len(there))]
+                changes += [(c, -1), (option_at[(option_unit[c], option_worker[a])], 1)]
+        delta, loads, required = timeline.evaluate(changes)
+        if delta < -MIN_IMPROVEMENT or (delta <= MIN_IMPROVEMENT and rng.random() < plateau):
+            timeline.apply(changes, delta, loads, required)
+            accepted += 1
+    return accepted
+
+
+def _search(problem, inbox, outbox, seed, report_interval):
+    """Worker process: improve the best known plan until told to stop (None)."""
+    try:
+        _search_loop(problem, inbox, outbox, seed, report_interval)
+    except KeyboardInterrupt:  # Ctrl+C reaches the whole process group; the solver keeps its plan
+        pass
+
+
+def _search_loop(problem, inbox, outbox, seed, report_interval):
+    rng = np.random.default_rng(seed)
+    space = Neighbourhood(problem)
+    timeline = Timeline(space, space.greedy_start())
+    best_cost, best_x = timeline.cost, timeline.x.copy()
+    outbox.put((best_cost, best_x, timeline.required.copy()))
+    last_report = time.monotonic()
+    reported = best_cost
+    while True:
+        try:
+            while True:
+                message = inbox.get_nowait()
+                if message is None:
+                    return
+                candidate = Timeline(space, message)
+                if candidate.cost < best_cost - MIN_IMPROVEMENT:
+                    timeline, best_cost, best_x = candidate, candidate.cost, candidate.x.copy()
+                    reported = best_cost  # the solver already has it
+        except queue.Empty:
+            pass
+
+        improve(timeline, rng)
+        if timeline.cost < best_cost - MIN_IMPROVEMENT:
+            best_cost, best_x = timeline.cost, timeline.x.copy()
+        now = time.monotonic()
+        if best_cost < reported - MIN_IMPROVEMENT and now - last_report >= report_interval:
+            outbox.put((best_cost, best_x, Timeline(space, best_x).required))
+            reported, last_report = best_cost, now
+
+
+class LocalSearchWorker:
+    """
+    Runs the local search in a separate process. callback() returns a
+    Gurobi callback that injects the worker's plans when they beat the
+    incumbent and feeds new incumbents back to it.
+    """
+
+    def __init__(self, model, shift_worker_vars, task_shift_vars, seed=0, report_interval=0.2):
+        problem = model_problem(model, shift_worker_vars, task_shift_vars)
+        self.variables = list(task_shift_vars.values()) + list(shift_worker_vars.values())
+        self.num_options = len(task_shift_vars)
+        self.injected = 0
+        context = multiprocessing.get_context("spawn")
+        self._inbox = context.Queue()
+        self._outbox = context.Queue()
+        self._process = context.Process(
+            target=_search, args=(problem, self._inbox, self._outbox, seed, report_interval),
+            name="LocalSearch", daemon=True,
+        )
+
+    def start(self):
+        self._process.start()
+        return self
+
+    def stop(self):
+        self._inbox.put(None)
+        deadline = time.monotonic() + 2
+        while self._process.is_alive() and time.monotonic() < deadline:
+            self._newest_plan()  # a full pipe would keep the worker from exiting
+            self._process.join(timeout=0.05)
+        if self._process.is_alive():
+            self._process.terminate()
+        # Unsent incumbents are of no use any more; don't wait on them at exit
+        self._inbox.cancel_join_thread()
+        self._inbox.close()
+        self._outbox.close()
+
+    def _newest_plan(self):
+        plan = None
+        try:
+            while True:
+                plan = self._outbox.get_nowait()
+        except queue.Empty:
+            return plan
+
+    def callback(self, callback=None):
+        """Gurobi callback doing the exchange with the worker, then calling callback."""
+        variables = self.variables
+        option_vars = variables[:self.num_options]
+
+        def local_search_callback(model, where):
+            if where == GRB.Callback.MIPSOL:
+                x = np.rint(model.cbGetSolution(option_vars)).astype(np.int64)
+                self._inbox.put(x)
+            elif where in (GRB.Callback.MIP, GRB.Callback.MIPNODE):
+                plan = self._newest_plan()
+                if plan is not None:
+                    cost, x, required = plan
+                    incumbent = model.cbGet(
+                        GRB.Callback.MIP_OBJBST if where == GRB.Callback.MIP else GRB.Callback.MIPNODE_OBJBST
+                    )
+                    if cost < incumbent - MIN_IMPROVEMENT:
+                        model.cbSetSolution(variables, list(x.astype(float)) + list(required))
+                        model.cbUseSolution()
+                        self.injected += 1
+            if callback is not None:
+                callback(model, where)
+
+        return local_search_callback
@@ -1,109 +1,32 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
 from datetime import datetime, timedelta
 import plotly.express as px
-from gurobipy import Model, GRB, quicksum
+import numpy as np
 from datetime import time
 import io  
 import base64
 import os
+import time as _time
 import datetime as dt
-from gurobipy import GurobiError
-
-DB_FILE = "tasksv2.db"
-
-
-# ------------------------------------------------------------------
-#                           Database
-# ------------------------------------------------------------------
-def init_db():
-    """
-    Initialize the database with necessary tables.
-    """
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-
-    # Table: Tasks
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS TasksTable3 (
-            id INTEGER PRIMARY KEY,
-            TaskName TEXT NOT NULL,
-            Day TEXT NOT NULL,
-            StartTime TEXT NOT NULL,
-            EndTime TEXT NOT NULL,
-            Duration TEXT NOT NULL,
-            NursesRequired INTEGER NOT NULL
-        )
-    ''')
-
-    # Table: Shifts
-    c.execute('''
-    CREATE TABLE IF NOT EXISTS ShiftsTable6 (
-        id INTEGER PRIMARY KEY,
-        StartTime TEXT NOT NULL,
-        EndTime TEXT NOT NULL,
-        BreakTime TEXT NOT NULL,
-        BreakDuration TEXT NOT NULL,
-        Weight FLOAT NOT NULL,
-
-        Monday INT NOT NULL,
-        Tuesday INT NOT NULL,
-        Wednesday INT NOT NULL,
-        Thursday INT NOT NULL,
-        Friday INT NOT NULL,
-        Saturday INT NOT NULL,
-        Sunday INT NOT NULL,
-
-        -- Add day-specific columns for needed workers
-        MondayNeeded INT DEFAULT 0,
-        TuesdayNeeded INT DEFAULT 0,
-        WednesdayNeeded INT DEFAULT 0,
-        ThursdayNeeded INT DEFAULT 0,
-        FridayNeeded INT DEFAULT 0,
-        SaturdayNeeded INT DEFAULT 0,
-        SundayNeeded INT DEFAULT 0
-    );
-    ''')
-    conn.commit()
-    conn.close()
-
-# -------------------------- DB Helpers ---------------------------
-def add_task_to_db(TaskName, Day, StartTime, EndTime, Duration, NursesRequired):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute('''
-        INSERT INTO TasksTable3 (TaskName, Day, StartTime, EndTime, Duration, NursesRequired)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (TaskName, Day, StartTime, EndTime, Duration, NursesRequired))
-    conn.commit()
-    conn.close()
-
-def add_shift_to_db(data):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute('''
-        INSERT INTO ShiftsTable6 (
-            StartTime, EndTime, BreakTime, BreakDuration, Weight,
-            Monday, Tuesday, Wednesday, Thursday, Friday, Saturday, Sunday
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', data)
-    conn.commit()
-    conn.close()
-
-def get_all(table):
-    conn = sqlite3.connect(DB_FILE)
-    df = pd.read_sql_query(f"SELECT * FROM {table}", conn)
-    conn.close()
-    return df
-
-def clear_all(table):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute(f"DELETE FROM {table}")
-    conn.commit()
-    conn.close()
 
+import database
+import engine
+from gurobipy import GurobiError
+from database import (
+    init_db, add_task_to_db, add_shift_to_db, get_all, clear_all,
+    save_optimization_run, get_optimization_runs, get_optimization_run,
+    load_optimization_run, delete_optimization_runs,
+    save_solver_telemetry, get_solver_telemetry, delete_solver_telemetry,
+    get_tuned_settings,
+    save_rerun_profile, get_rerun_profiles, delete_rerun_profiles,
+    insert, insert2, insert3,
+)
+from export import EXPORT_FORMATS, export_results
+from generator import generate_instance, generate_nurses, write_instance
+from instrumentation import PROFILE_LOG_FILE, Profiler
+from roster import build_roster, label_lanes, shift_costs, staffing_from_requirements
+from shift_design import design_shifts
 
 # ------------------------------------------------------------------
 #                         Form Inputs
@@ -263,6 +186,17 @@ def shift_input_form():
                     "",  # Empty label
                     key=f"day_{days[i]}" 
                 )
+
+        # --- Minimum staffing per day ---
+        st.markdown("### Minimum Nurses")
+        needed_cols = st.columns(7)
+        day_needed = {}
+        for i, col in enumerate(needed_cols):
+            with col:
+                day_needed[i] = st.number_input(
+                    days[i], min_value=0, value=0, step=1, key=f"needed_{days[i]}",
+                    help="Nurses this shift has on the day whatever its tasks need (0: none)"
+                )
         # --- Form Submission ---
         submitted = st.form_submit_button("➕ Add Shift", use_container_width=True)
 
@@ -287,6 +221,11 @@ def shift_input_form():
             if break_end > Shift_EndTime:
                 errors.append("Break duration exceeds shift end time")
 
+            # Minimum nurses only on active days
+            for i, needed in day_needed.items():
+                if needed > 0 and not day_states[i]:
+                    errors.append(f"Minimum nurses set for {days[i]}, but the shift is not active then.")
+
             if errors:
                 for error in errors:
                     st.error(error)
@@ -308,7 +247,8 @@ def shift_input_form():
                     BreakTime.strftime("%H:%M:%S"),
                     str(timedelta(minutes=BreakDuration)),
                     Weight,
-                    *active_days
+                    *active_days,
+                    *(int(day_needed[i]) for i in range(7))
                 )
                 add_shift_to_db(shift_data)
                 st.success("Shift added successfully!")
@@ -341,7 +281,8 @@ def task_template_download():
                 data=csv_data.encode("utf-8"),
                 file_name="task_template.csv",
                 mime="text/csv",
-                use_container_width=True
+                use_container_width=True,
+                key="task_template_csv"
             )
         with colB:
             # --- Excel version ---
@@ -353,14 +294,15 @@ def task_template_download():
                 data=excel_buffer.getvalue(),
                 file_name="task_template.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True
+                use_container_width=True,
+                key="task_template_xlsx"
             )
 
 def upload_tasks_excel():
     """
     Let the user upload a Task Excel file and insert into DB.
     """
-    uploaded_file = st.file_uploader("Upload Task Excel", type=["xlsx", "xls", "csv"])
+    uploaded_file = st.file_uploader("Upload Task Excel", type=["xlsx", "xls", "csv"], key="upload_tasks")
     if uploaded_file is not None:
         try:
             # Read either CSV or Excel automatically:
@@ -411,7 +353,15 @@ def shift_template_download():
         "Thursday": [1, 1],
         "Friday": [1, 1],
         "Saturday": [0, 1],
-        "Sunday": [0, 1]
+        "Sunday": [0, 1],
+        # Optional: fewest nurses the shift has on a day whatever its tasks need (0: none)
+        "MondayNeeded": [2, 1],
+        "TuesdayNeeded": [2, 1],
+        "WednesdayNeeded": [2, 1],
+        "ThursdayNeeded": [2, 1],
+        "FridayNeeded": [2, 1],
+        "SaturdayNeeded": [0, 1],
+        "SundayNeeded": [0, 0]
     })
 
     with st.container(border=False):
@@ -427,7 +377,8 @@ def shift_template_download():
                 data=csv_data.encode("utf-8"),
                 file_name="shift_template.csv",
                 mime="text/csv",
-                use_container_width=True  # Make button fill column width
+                use_container_width=True,
+                key="shift_template_csv"  # Make button fill column width
             )
         
         with colB:
@@ -440,14 +391,15 @@ def shift_template_download():
                 data=excel_buffer.getvalue(),
                 file_name="shift_template.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True  # Make button fill column width
+                use_container_width=True,
+                key="shift_template_xlsx"  # Make button fill column width
             )
 
 def upload_shifts_excel():
     """
     Let the user upload a Shifts Excel file (or CSV) to populate the DB.
     """
-    uploaded_file = st.file_uploader("Upload Shifts File", type=["xlsx", "xls", "csv"])
+    uploaded_file = st.file_uploader("Upload Shifts File", type=["xlsx", "xls", "csv"], key="upload_shifts")
     if uploaded_file is not None:
         try:
             # Read CSV or Excel automatically:
@@ -466,6 +418,33 @@ def upload_shifts_excel():
                 st.error(f"Your file is missing columns: {missing}")
                 return
 
+            # Minimum nurses per day are optional, and only allowed on active days
+            not_numeric = np.zeros((len(df), len(engine.NEEDED_COLUMNS)), dtype=bool)
+            for j, column in enumerate(engine.NEEDED_COLUMNS):
+                if column not in df:
+                    df[column] = 0
+                    continue
+                raw = df[column]
+                empty = raw.isna() | (raw.astype(str).str.strip() == "")
+                values = pd.to_numeric(raw.where(~empty), errors="coerce")
+                not_numeric[:, j] = (values.isna() & ~empty).to_numpy()
+                df[column] = values.fillna(0)
+            if not_numeric.any():
+                rows = ", ".join(str(i + 2) for i in np.flatnonzero(not_numeric.any(axis=1)))
+                st.error(f"Minimum nurses (*Needed columns) must be numbers (rows {rows}).")
+                return
+            needed = df[engine.NEEDED_COLUMNS].to_numpy()
+            invalid = (needed < 0) | (needed % 1 != 0)
+            if invalid.any():
+                rows = ", ".join(str(i + 2) for i in np.flatnonzero(invalid.any(axis=1)))
+                st.error(f"Minimum nurses (*Needed columns) must be whole numbers of 0 or more (rows {rows}).")
+                return
+            off_day = (needed > 0) & (df[engine.DAY_NAMES].to_numpy() != 1)
+            if off_day.any():
+                rows = ", ".join(str(i + 2) for i in np.flatnonzero(off_day.any(axis=1)))
+                st.error(f"Minimum nurses set for days the shift is not active (rows {rows}).")
+                return
+
             # Insert each row into DB
             for _, row in df.iterrows():
                 shift_data = (
@@ -480,7 +459,8 @@ def upload_shifts_excel():
                     int(row["Thursday"]),
                     int(row["Friday"]),
                     int(row["Saturday"]),
-                    int(row["Sunday"])
+                    int(row["Sunday"]),
+                    *(int(row[column]) for column in engine.NEEDED_COLUMNS)
                 )
                 add_shift_to_db(shift_data)
 
@@ -490,915 +470,806 @@ def upload_shifts_excel():
             st.error(f"Error reading file: {e}")
 
 
-# ------------------------------------------------------------------
-#                        Example Data Inserts
-# ------------------------------------------------------------------
-def insert():
-    """
-    Insert a small example data set into Tasks and Shifts.
-    (For demonstration)
-    """
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute('''
-        INSERT INTO TasksTable3 (
-            TaskName,
-            Day,
-            StartTime,
-            EndTime,
-            Duration,
-            NursesRequired
-        )
-        VALUES
-            ('Dressing Change', 'Monday', '07:30:00', '07:45:00', '0:15:00', 1),
-            ('Vital Signs Monitoring', 'Monday', '10:30:00', '11:00:00', '0:30:00', 2),
-            ('Wound Care', 'Monday', '14:30:00', '15:15:00', '0:45:00', 3),
-            ('Medication Administration', 'Monday', '22:00:00', '22:30:00', '0:30:00', 2),
-            ('Physical Therapy', 'Tuesday', '08:00:00', '08:45:00','0:45:00', 2),
-            ('Dressing Change', 'Tuesday', '13:30:00', '13:45:00', '0:15:00', 1),
-            ('Vital Signs Monitoring', 'Tuesday', '16:00:00', '16:30:00', '0:15:00', 2),
-            ('Medication Administration', 'Tuesday', '21:30:00', '22:00:00', '0:30:00', 2),
-            ('Wound Care', 'Wednesday', '07:30:00', '08:15:00', '0:45:00', 3),
-            ('Physical Therapy', 'Wednesday', '12:00:00', '12:45:00', '0:45:00', 2),
-            ('Dressing Change', 'Wednesday', '18:00:00', '18:15:00', '0:15:00', 1),
-            ('Vital Signs Monitoring', 'Thursday', '09:00:00', '09:30:00', '0:30:00', 2),
-            ('Medication Administration', 'Thursday', '13:00:00', '13:30:00', '0:30:00', 2),
-            ('Wound Care', 'Thursday', '17:30:00', '18:15:00', '0:45:00', 3),
-            ('Dressing Change', 'Friday', '07:30:00', '07:45:00', '0:15:00', 1),
-            ('Vital Signs Monitoring', 'Friday', '14:30:00', '15:00:00', '0:30:00', 2),
-            ('Medication Administration', 'Friday', '21:30:00', '22:00:00', '0:30:00', 2),
-            ('Wound Care', 'Saturday', '09:30:00', '10:15:00', '0:45:00', 3),
-            ('Physical Therapy', 'Saturday', '14:00:00', '14:45:00', '0:45:00', 2),
-            ('Vital Signs Monitoring', 'Saturday', '20:00:00', '20:30:00', '0:30:00', 2),
-            ('Dressing Change', 'Sunday', '14:30:00', '14:45:00', '0:15:00', 1),
-            ('Wound Care', 'Sunday', '20:00:00', '20:45:00', '0:15:00', 3);
-    ''')
-    conn.commit()
-    c.execute('''
-        INSERT INTO ShiftsTable6 (
-            StartTime,
-            EndTime,
-            BreakTime,
-            BreakDuration,
-            Weight,
-            Monday,
-            Tuesday,
-            Wednesday,
-            Thursday,
-            Friday,
-            Saturday,
-            Sunday
-        )
-        VALUES
-            ('07:00:00', '15:00:00', '11:00:00', '0:30:00', 1200, 1, 1, 1, 1, 1, 0, 0),
-            ('15:00:00', '23:00:00', '19:00:00', '0:30:00', 1400, 1, 1, 1, 1, 1, 1, 1),
-            ('23:00:00', '07:00:00', '03:00:00', '0:30:00', 1600, 1, 1, 1, 1, 1, 1, 1),
-            ('08:00:00', '14:00:00', '12:00:00', '0:20:00', 1000, 1, 1, 1, 1, 1, 0, 0),
-            ('14:00:00', '20:00:00', '17:00:00', '0:30:00', 1100, 1, 1, 1, 1, 1, 1, 1),
-            ('20:00:00', '02:00:00', '23:00:00', '0:20:00', 1300, 0, 1, 1, 1, 1, 1, 1),
-            ('09:00:00', '17:00:00', '13:00:00', '0:45:00', 1500, 1, 1, 0, 1, 1, 0, 0),
-            ('06:00:00', '14:00:00', '10:00:00', '0:30:00', 1100, 1, 1, 1, 1, 1, 1, 0),
-            ('14:00:00', '22:00:00', '18:00:00', '0:30:00', 1200, 1, 1, 1, 1, 1, 1, 1),
-            ('10:00:00', '18:00:00', '13:30:00', '0:30:00', 1300, 1, 1, 1, 1, 1, 0, 0);
-    ''')
-    conn.commit()
-    conn.close()
-
-def insert2():
+def nurse_registry():
     """
-    Another example data set.
+    Editable nurse registry (NursesTable): availability per day, weekly
+    hours and, optionally, what each nurse costs on given shifts.
     """
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute('''
-        INSERT INTO TasksTable3 (
-            TaskName,
-            Day,
-            StartTime,
-            EndTime,
-            Duration,
-            NursesRequired
-        )
-        VALUES
-        ('Physical Therapy', 'Thursday', '07:00:00', '08:00:00', '0:45:00', 2),
-        ('Vital Signs Monitoring', 'Friday', '06:00:00', '06:30:00', '0:30:00', 5),
-        ('Vital Signs Monitoring', 'Wednesday', '05:30:00', '07:00:00', '1:00:00', 4),
-        ('Medication Administration', 'Monday', '04:00:00', '05:30:00', '0:45:00', 1),
-        ('Dressing Change', 'Saturday', '08:00:00', '10:00:00', '1:00:00', 4),
-        ('Wound Care', 'Sunday', '12:30:00', '13:00:00', '0:15:00', 3),
-        ('Vital Signs Monitoring', 'Thursday', '12:00:00', '13:00:00', '0:30:00', 5),
-        ('Physical Therapy', 'Wednesday', '20:30:00', '23:30:00', '0:45:00', 2),
-        ('Vital Signs Monitoring', 'Sunday', '21:30:00', '23:00:00', '0:30:00', 1),
-        ('Physical Therapy', 'Saturday', '18:00:00', '19:00:00', '0:30:00', 5),
-        ('Wound Care', 'Saturday', '00:00:00', '02:00:00', '1:00:00', 5),
-        ('Vital Signs Monitoring', 'Tuesday', '19:30:00', '22:00:00', '0:30:00', 4),
-        ('Wound Care', 'Monday', '19:00:00', '22:00:00', '0:15:00', 3),
-        ('Medication Administration', 'Sunday', '11:00:00', '13:00:00', '1:00:00', 4),
-        ('Physical Therapy', 'Thursday', '13:30:00', '16:30:00', '0:30:00', 1),
-        ('Wound Care', 'Wednesday', '08:30:00', '10:00:00', '0:15:00', 2),
-        ('Medication Administration', 'Tuesday', '17:00:00', '19:00:00', '1:00:00', 2),
-        ('Medication Administration', 'Saturday', '19:30:00', '22:30:00', '0:30:00', 4),
-        ('Dressing Change', 'Sunday', '15:30:00', '18:30:00', '0:15:00', 4),
-        ('Vital Signs Monitoring', 'Tuesday', '04:30:00', '06:30:00', '1:00:00', 1),
-        ('Wound Care', 'Wednesday', '22:00:00', '01:00:00', '0:30:00', 4),
-        ('Physical Therapy', 'Tuesday', '17:00:00', '18:00:00', '0:45:00', 5),
-        ('Dressing Change', 'Friday', '20:00:00', '21:30:00', '0:45:00', 3),
-        ('Physical Therapy', 'Thursday', '02:00:00', '04:00:00', '1:00:00', 5),
-        ('Dressing Change', 'Saturday', '22:00:00', '22:30:00', '0:30:00', 5),
-        ('Wound Care', 'Friday', '09:30:00', '11:00:00', '0:15:00', 3),
-        ('Vital Signs Monitoring', 'Saturday', '00:00:00', '03:00:00', '0:45:00', 3),
-        ('Medication Administration', 'Monday', '02:30:00', '03:30:00', '0:30:00', 4),
-        ('Vital Signs Monitoring', 'Monday', '12:30:00', '14:00:00', '0:30:00', 3),
-        ('Dressing Change', 'Tuesday', '17:00:00', '19:30:00', '0:30:00', 5),
-        ('Physical Therapy', 'Monday', '07:30:00', '08:00:00', '0:30:00', 4),
-        ('Dressing Change', 'Wednesday', '17:00:00', '18:00:00', '0:15:00', 1),
-        ('Physical Therapy', 'Thursday', '16:30:00', '17:00:00', '0:15:00', 2),
-        ('Wound Care', 'Friday', '00:00:00', '00:30:00', '0:15:00', 5),
-        ('Dressing Change', 'Friday', '18:30:00', '19:30:00', '0:45:00', 4),
-        ('Wound Care', 'Sunday', '20:30:00', '23:00:00', '0:45:00', 2),
-        ('Physical Therapy', 'Saturday', '09:00:00', '11:30:00', '1:00:00', 3),
-        ('Vital Signs Monitoring', 'Thursday', '14:00:00', '15:00:00', '0:30:00', 4),
-        ('Physical Therapy', 'Sunday', '13:00:00', '14:30:00', '0:15:00', 2),
-        ('Dressing Change', 'Monday', '07:00:00', '09:00:00', '0:30:00', 3),
-        ('Dressing Change', 'Sunday', '09:30:00', '10:00:00', '0:15:00', 2),
-        ('Vital Signs Monitoring', 'Monday', '12:30:00', '14:30:00', '0:15:00', 3),
-        ('Wound Care', 'Sunday', '21:00:00', '23:30:00', '0:15:00', 1),
-        ('Physical Therapy', 'Monday', '21:30:00', '22:30:00', '0:15:00', 5),
-        ('Medication Administration', 'Sunday', '15:00:00', '17:00:00', '0:45:00', 5),
-        ('Vital Signs Monitoring', 'Tuesday', '20:00:00', '21:30:00', '0:45:00', 2),
-        ('Wound Care', 'Monday', '06:30:00', '07:30:00', '0:15:00', 5),
-        ('Physical Therapy', 'Wednesday', '21:30:00', '23:00:00', '0:30:00', 1),
-        ('Physical Therapy', 'Friday', '17:30:00', '18:30:00', '1:00:00', 1),
-        ('Physical Therapy', 'Thursday', '16:00:00', '18:00:00', '0:30:00', 5),
-        ('Medication Administration', 'Thursday', '00:30:00', '02:00:00', '0:45:00', 2),
-        ('Vital Signs Monitoring', 'Sunday', '01:00:00', '02:00:00', '1:00:00', 2),
-        ('Medication Administration', 'Saturday', '14:00:00', '17:00:00', '0:45:00', 4),
-        ('Physical Therapy', 'Friday', '17:00:00', '20:00:00', '0:45:00', 4),
-        ('Physical Therapy', 'Sunday', '19:30:00', '20:30:00', '0:30:00', 4),
-        ('Wound Care', 'Thursday', '01:00:00', '04:00:00', '1:00:00', 4),
-        ('Wound Care', 'Saturday', '03:00:00', '05:00:00', '0:30:00', 5),
-        ('Vital Signs Monitoring', 'Tuesday', '08:30:00', '09:30:00', '0:45:00', 3),
-        ('Wound Care', 'Friday', '15:30:00', '16:00:00', '0:30:00', 2),
-        ('Physical Therapy', 'Wednesday', '17:00:00', '19:00:00', '0:30:00', 3),
-        ('Wound Care', 'Thursday', '06:30:00', '09:00:00', '1:00:00', 4),
-        ('Medication Administration', 'Tuesday', '13:00:00', '15:30:00', '1:00:00', 1),
-        ('Physical Therapy', 'Friday', '10:30:00', '13:30:00', '1:00:00', 5),
-        ('Dressing Change', 'Tuesday', '06:00:00', '06:30:00', '0:15:00', 3),
-        ('Physical Therapy', 'Sunday', '11:00:00', '14:00:00', '0:45:00', 2),
-        ('Physical Therapy', 'Friday', '12:00:00', '13:30:00', '0:45:00', 2),
-        ('Vital Signs Monitoring', 'Tuesday', '07:30:00', '10:00:00', '1:00:00', 1),
-        ('Dressing Change', 'Tuesday', '19:30:00', '20:30:00', '0:45:00', 4),
-        ('Wound Care', 'Thursday', '17:00:00', '17:30:00', '0:30:00', 3),
-        ('Dressing Change', 'Sunday', '04:00:00', '06:30:00', '0:45:00', 2),
-        ('Medication Administration', 'Thursday', '21:00:00', '23:00:00', '1:00:00', 3),
-        ('Medication Administration', 'Monday', '04:30:00', '07:30:00', '0:30:00', 4),
-        ('Physical Therapy', 'Friday', '21:00:00', '22:30:00', '0:45:00', 3),
-        ('Vital Signs Monitoring', 'Wednesday', '13:00:00', '15:00:00', '0:30:00', 4),
-        ('Wound Care', 'Saturday', '22:30:00', '01:00:00', '0:45:00', 1),
-        ('Physical Therapy', 'Tuesday', '08:00:00', '09:00:00', '0:45:00', 3),
-        ('Medication Administration', 'Sunday', '21:30:00', '00:30:00', '0:15:00', 3),
-        ('Physical Therapy', 'Sunday', '12:00:00', '14:30:00', '1:00:00', 3),
-        ('Physical Therapy', 'Sunday', '01:00:00', '03:00:00', '1:00:00', 3),
-        ('Medication Administration', 'Saturday', '13:30:00', '14:30:00', '0:15:00', 3),
-        ('Medication Administration', 'Tuesday', '18:00:00', '19:00:00', '0:15:00', 2),
-        ('Physical Therapy', 'Wednesday', '15:00:00', '15:30:00', '0:30:00', 2),
-        ('Wound Care', 'Sunday', '22:30:00', '01:30:00', '0:30:00', 4),
-        ('Physical Therapy', 'Friday', '03:30:00', '04:30:00', '0:15:00', 4),
-        ('Physical Therapy', 'Wednesday', '03:30:00', '04:30:00', '0:30:00', 5),
-        ('Vital Signs Monitoring', 'Friday', '06:30:00', '07:30:00', '0:15:00', 3),
-        ('Wound Care', 'Monday', '09:00:00', '10:00:00', '0:45:00', 2),
-        ('Dressing Change', 'Thursday', '12:30:00', '13:00:00', '0:30:00', 2),
-        ('Dressing Change', 'Friday', '09:30:00', '11:30:00', '0:30:00', 5),
-        ('Wound Care', 'Wednesday', '20:30:00', '22:30:00', '1:00:00', 3),
-        ('Vital Signs Monitoring', 'Saturday', '08:30:00', '09:30:00', '0:15:00', 4),
-        ('Dressing Change', 'Sunday', '20:00:00', '23:00:00', '0:30:00', 1),
-        ('Medication Administration', 'Thursday', '08:30:00', '11:00:00', '1:00:00', 2),
-        ('Vital Signs Monitoring', 'Thursday', '22:30:00', '23:30:00', '0:30:00', 3),
-        ('Physical Therapy', 'Tuesday', '21:30:00', '23:30:00', '1:00:00', 3),
-        ('Dressing Change', 'Wednesday', '04:30:00', '05:00:00', '0:30:00', 5),
-        ('Physical Therapy', 'Thursday', '15:30:00', '17:00:00', '1:00:00', 1),
-        ('Wound Care', 'Saturday', '21:30:00', '22:30:00', '0:45:00', 3),
-        ('Medication Administration', 'Saturday', '07:30:00', '09:30:00', '1:00:00', 3),
-        ('Physical Therapy', 'Friday', '20:30:00', '21:00:00', '0:15:00', 1);
-
-    ''')
-    conn.commit()
-    c.execute('''
-        INSERT INTO ShiftsTable6 (
-            StartTime,
-            EndTime,
-            BreakTime,
-            BreakDuration,
-            Weight,
-            Monday,
-            Tuesday,
-            Wednesday,
-            Thursday,
-            Friday,
-            Saturday,
-            Sunday
-        )
-        VALUES
-('06:15:00', '10:30:00', '08:30:00', '0:30:00', 4.25, 0, 1, 0, 0, 1, 0, 1),
-('14:15:00', '22:30:00', '16:45:00', '1:00:00', 8.25, 1, 1, 1, 0, 0, 1, 0),
-('20:00:00', '07:00:00', '22:00:00', '1:00:00', 11, 0, 1, 0, 1, 1, 0, 0),
-('04:00:00', '12:45:00', '06:00:00', '1:00:00', 8.75, 1, 0, 1, 0, 0, 0, 1),
-('12:30:00', '22:30:00', '14:30:00', '1:00:00', 10, 0, 0, 0, 0, 1, 0, 0),
-('02:00:00', '08:30:00', '04:15:00', '0:30:00', 6.5, 1, 1, 0, 1, 1, 1, 0),
-('20:00:00', '00:45:00', '22:00:00', '0:30:00', 4.75, 1, 0, 0, 1, 0, 1, 1),
-('15:30:00', '23:15:00', '17:00:00', '0:30:00', 7.75, 0, 1, 0, 1, 0, 0, 1),
-('19:15:00', '07:30:00', '21:30:00', '1:00:00', 12.25, 0, 0, 1, 1, 1, 1, 1),
-('18:00:00', '23:30:00', '20:15:00', '0:30:00', 5.5, 0, 0, 0, 1, 0, 0, 1),
-('05:15:00', '17:30:00', '07:30:00', '1:00:00', 12.25, 1, 1, 0, 0, 1, 1, 1),
-('08:30:00', '14:30:00', '10:45:00', '0:30:00', 6, 0, 1, 0, 1, 1, 0, 0),
-('19:30:00', '23:00:00', '21:00:00', '0:30:00', 3.5, 1, 0, 0, 0, 1, 0, 0),
-('15:15:00', '02:00:00', '17:30:00', '1:00:00', 10.75, 0, 1, 0, 1, 1, 1, 1),
-('05:30:00', '17:15:00', '07:30:00', '1:00:00', 11.75, 0, 1, 0, 1, 1, 1, 0),
-('18:00:00', '06:15:00', '20:00:00', '1:00:00', 12.25, 0, 1, 1, 1, 0, 1, 0),
-('04:45:00', '11:30:00', '06:00:00', '0:30:00', 6.75, 1, 0, 0, 1, 0, 1, 1),
-('23:30:00', '11:00:00', '01:45:00', '1:00:00', 11.5, 1, 0, 1, 1, 0, 0, 0),
-('23:45:00', '08:00:00', '01:15:00', '1:00:00', 8.25, 0, 1, 0, 1, 1, 0, 1),
-('03:30:00', '13:30:00', '05:30:00', '1:00:00', 10, 0, 1, 1, 0, 0, 0, 1),
-('14:15:00', '01:30:00', '16:00:00', '1:00:00', 11.25, 1, 1, 1, 0, 1, 1, 0),
-('21:00:00', '01:00:00', '23:15:00', '0:30:00', 4, 0, 1, 1, 0, 0, 1, 0),
-('10:30:00', '16:15:00', '12:15:00', '0:30:00', 5.75, 0, 1, 1, 1, 1, 0, 0),
-('20:45:00', '01:15:00', '22:30:00', '0:30:00', 4.5, 1, 1, 1, 1, 0, 0, 1),
-('02:15:00', '13:30:00', '04:30:00', '1:00:00', 11.25, 1, 0, 0, 1, 0, 0, 1),
-('08:15:00', '16:45:00', '10:45:00', '1:00:00', 8.5, 0, 0, 0, 0, 0, 0, 0),
-('11:15:00', '20:30:00', '13:00:00', '1:00:00', 9.25, 0, 0, 0, 0, 1, 0, 0),
-('22:00:00', '04:00:00', '00:30:00', '0:30:00', 6, 1, 1, 0, 0, 1, 1, 0),
-('22:00:00', '10:00:00', '00:00:00', '1:00:00', 12, 1, 1, 0, 0, 1, 0, 0),
-('09:30:00', '16:45:00', '11:00:00', '0:30:00', 7.25, 0, 0, 0, 0, 1, 1, 1),
-('09:15:00', '20:15:00', '11:30:00', '1:00:00', 11, 1, 1, 1, 1, 0, 0, 1),
-('04:30:00', '12:45:00', '06:30:00', '1:00:00', 8.25, 0, 1, 1, 1, 1, 0, 1),
-('18:30:00', '03:30:00', '20:00:00', '1:00:00', 9, 1, 1, 1, 0, 1, 1, 0),
-('16:30:00', '04:00:00', '18:45:00', '1:00:00', 11.5, 0, 0, 0, 1, 1, 0, 1),
-('17:30:00', '22:00:00', '19:30:00', '0:30:00', 4.5, 0, 1, 0, 1, 0, 0, 1),
-('19:00:00', '05:45:00', '21:00:00', '1:00:00', 10.75, 0, 1, 0, 1, 1, 0, 1),
-('21:00:00', '07:00:00', '23:00:00', '1:00:00', 10, 1, 0, 1, 1, 0, 1, 0),
-('23:45:00', '09:15:00', '01:15:00', '1:00:00', 9.5, 1, 0, 1, 0, 0, 1, 1),
-('21:45:00', '04:45:00', '23:15:00', '0:30:00', 7, 1, 1, 1, 0, 0, 0, 1),
-('00:30:00', '09:45:00', '02:00:00', '1:00:00', 9.25, 0, 1, 0, 1, 0, 0, 0),
-('23:45:00', '09:30:00', '01:45:00', '1:00:00', 9.75, 0, 1, 1, 0, 1, 0, 1),
-('22:15:00', '07:45:00', '00:45:00', '1:00:00', 9.5, 0, 1, 0, 1, 1, 1, 1),
-('01:15:00', '06:00:00', '03:00:00', '0:30:00', 4.75, 1, 0, 0, 1, 0, 0, 0),
-('17:15:00', '01:30:00', '19:15:00', '1:00:00', 8.25, 0, 1, 1, 1, 1, 0, 1),
-('15:00:00', '01:30:00', '17:00:00', '1:00:00', 10.5, 0, 0, 0, 0, 0, 1, 1),
-('23:45:00', '03:00:00', '01:30:00', '0:30:00', 3.25, 0, 1, 1, 0, 0, 1, 1),
-('22:45:00', '05:15:00', '00:00:00', '0:30:00', 6.5, 0, 0, 1, 1, 0, 1, 0),
-('22:15:00', '03:15:00', '00:30:00', '0:30:00', 5, 0, 0, 0, 1, 1, 1, 1),
-('17:45:00', '03:30:00', '19:15:00', '1:00:00', 9.75, 1, 0, 1, 0, 1, 0, 1),
-('04:15:00', '16:45:00', '06:30:00', '1:00:00', 12.5, 1, 0, 0, 1, 1, 0, 0),
-('17:00:00', '03:30:00', '19:00:00', '1:00:00', 10.5, 1, 0, 1, 1, 1, 0, 0),
-('06:45:00', '16:15:00', '08:45:00', '1:00:00', 9.5, 1, 0, 1, 1, 1, 0, 1),
-('21:00:00', '04:15:00', '23:00:00', '0:30:00', 7.25, 0, 1, 0, 1, 0, 1, 0),
-('11:15:00', '20:00:00', '13:15:00', '1:00:00', 8.75, 1, 1, 0, 0, 0, 1, 1),
-('22:00:00', '08:30:00', '00:00:00', '1:00:00', 10.5, 1, 1, 1, 0, 1, 0, 1),
-('21:15:00', '01:15:00', '23:30:00', '0:30:00', 4, 1, 1, 1, 0, 0, 0, 0),
-('02:00:00', '09:45:00', '04:00:00', '0:30:00', 7.75, 0, 1, 1, 1, 1, 0, 0),
-('08:30:00', '18:30:00', '10:45:00', '1:00:00', 10, 0, 0, 1, 1, 1, 1, 1),
-('22:45:00', '05:30:00', '00:15:00', '0:30:00', 6.75, 1, 1, 1, 1, 0, 0, 1),
-('23:30:00', '03:45:00', '01:45:00', '0:30:00', 4.25, 1, 0, 1, 0, 0, 0, 0),
-('15:15:00', '02:30:00', '17:15:00', '1:00:00', 11.25, 0, 0, 0, 0, 1, 0, 0),
-('20:45:00', '05:00:00', '22:00:00', '1:00:00', 8.25, 1, 0, 0, 0, 1, 0, 1),
-('19:00:00', '04:30:00', '21:45:00', '1:00:00', 9.5, 1, 1, 1, 1, 1, 1, 1),
-('10:30:00', '16:45:00', '12:45:00', '0:30:00', 6.25, 1, 1, 1, 1, 1, 0, 0),
-('20:45:00', '03:30:00', '22:00:00', '0:30:00', 6.75, 1, 0, 0, 0, 0, 0, 1),
-('01:45:00', '10:45:00', '03:45:00', '1:00:00', 9, 1, 1, 1, 1, 1, 1, 0),
-('01:30:00', '13:30:00', '03:45:00', '1:00:00', 12, 0, 0, 0, 1, 1, 0, 1),
-('19:45:00', '01:15:00', '21:30:00', '0:30:00', 5.5, 0, 0, 1, 0, 1, 0, 1),
-('13:45:00', '01:15:00', '15:00:00', '1:00:00', 11.5, 0, 0, 1, 0, 1, 1, 1),
-('19:45:00', '06:30:00', '21:00:00', '1:00:00', 10.75, 1, 0, 0, 1, 0, 1, 1),
-('14:15:00', '19:00:00', '16:00:00', '0:30:00', 4.75, 1, 1, 0, 1, 1, 0, 0),
-('10:30:00', '22:15:00', '12:15:00', '1:00:00', 11.75, 1, 0, 1, 0, 1, 1, 0),
-('21:45:00', '05:30:00', '23:00:00', '0:30:00', 7.75, 1, 0, 1, 1, 0, 0, 0),
-('20:45:00', '01:00:00', '22:15:00', '0:30:00', 4.25, 1, 1, 1, 0, 0, 1, 1),
-('14:00:00', '22:00:00', '16:30:00', '0:30:00', 8, 0, 0, 1, 0, 0, 0, 0),
-('17:30:00', '21:45:00', '19:30:00', '0:30:00', 4.25, 0, 1, 0, 1, 0, 0, 0),
-('20:30:00', '08:00:00', '22:45:00', '1:00:00', 11.5, 0, 0, 1, 0, 0, 1, 1),
-('15:00:00', '01:30:00', '17:00:00', '1:00:00', 10.5, 1, 0, 0, 0, 0, 1, 0),
-('19:45:00', '02:15:00', '21:30:00', '0:30:00', 6.5, 0, 0, 0, 1, 1, 0, 1),
-('03:00:00', '13:15:00', '05:30:00', '1:00:00', 10.25, 1, 0, 1, 0, 1, 0, 1),
-('03:15:00', '13:45:00', '05:15:00', '1:00:00', 10.5, 0, 0, 1, 0, 1, 0, 1),
-('03:00:00', '08:45:00', '05:30:00', '0:30:00', 5.75, 0, 0, 1, 0, 0, 1, 0),
-('08:15:00', '16:15:00', '10:45:00', '0:30:00', 8, 0, 0, 1, 0, 0, 0, 1),
-('04:45:00', '13:15:00', '06:00:00', '1:00:00', 8.5, 1, 1, 1, 1, 0, 0, 1),
-('13:15:00', '22:00:00', '15:15:00', '1:00:00', 8.75, 1, 1, 1, 1, 1, 1, 1),
-('11:15:00', '18:30:00', '13:00:00', '0:30:00', 7.25, 0, 1, 1, 0, 1, 0, 0),
-('21:00:00', '04:15:00', '23:00:00', '0:30:00', 7.25, 1, 1, 0, 0, 1, 0, 0),
-('00:00:00', '10:45:00', '02:15:00', '1:00:00', 10.75, 0, 0, 1, 1, 1, 1, 1),
-('09:15:00', '20:00:00', '11:00:00', '1:00:00', 10.75, 1, 0, 1, 1, 0, 0, 1),
-('12:30:00', '17:15:00', '14:30:00', '0:30:00', 4.75, 0, 0, 1, 0, 0, 0, 0),
-('05:15:00', '11:45:00', '07:45:00', '0:30:00', 6.5, 0, 1, 0, 1, 1, 1, 1),
-('10:00:00', '15:45:00', '12:00:00', '0:30:00', 5.75, 1, 1, 0, 1, 1, 1, 1),
-('08:45:00', '20:30:00', '10:45:00', '1:00:00', 11.75, 0, 1, 0, 0, 1, 0, 1),
-('01:45:00', '05:15:00', '03:15:00', '0:30:00', 3.5, 1, 0, 1, 0, 1, 1, 0),
-('10:15:00', '15:00:00', '12:15:00', '0:30:00', 4.75, 0, 1, 0, 1, 1, 1, 0),
-('21:30:00', '09:00:00', '23:45:00', '1:00:00', 11.5, 1, 0, 1, 0, 0, 0, 1),
-('13:45:00', '21:00:00', '15:45:00', '0:30:00', 7.25, 1, 0, 1, 0, 1, 1, 1),
-('18:00:00', '23:30:00', '20:00:00', '0:30:00', 5.5, 1, 1, 0, 0, 1, 0, 1),
-('22:15:00', '03:45:00', '00:15:00', '0:30:00', 5.5, 1, 0, 1, 1, 0, 0, 1),
-('11:30:00', '22:45:00', '13:30:00', '1:00:00', 11.25, 1, 1, 0, 1, 0, 0, 1);
-    ''')
-    conn.commit()
-    conn.close()
-
-def insert3():
-    """
-    Insert a really small example data set into Tasks and Shifts.
-    (For demonstration)
-    """
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute('''
-        INSERT INTO TasksTable3 (
-            TaskName,
-            Day,
-            StartTime,
-            EndTime,
-            Duration,
-            NursesRequired
-        )
-        VALUES
-            ('task 1', 'Monday', '09:00:00', '10:00:00', '0:30:00', 4),
-            ('task 2', 'Monday', '09:00:00', '10:00:00', '0:30:00', 20),
-            ('task 3', 'Monday', '09:00:00', '10:00:00', '0:30:00', 5),
-            ('task 4', 'Monday', '09:00:00', '10:00:00', '0:30:00', 11),
-            ('task 5', 'Monday', '09:00:00', '10:00:00', '0:30:00', 1),
-            ('task 6', 'Monday', '08:30:00', '10:00:00', '0:30:00', 1),
-            ('task 7', 'Tuesday', '09:00:00', '10:00:00', '0:30:00', 1),
-            ('task 8', 'Tuesday', '09:00:00', '10:00:00', '0:30:00', 20),
-            ('task 9', 'Tuesday', '09:00:00', '10:00:00', '0:30:00', 9),
-            ('task 10', 'Monday', '12:00:00', '12:30:00', '0:15:00', 5),
-            ('task 11', 'Tuesday', '12:00:00', '12:30:00', '0:15:00', 10),
-            ('task 12', 'Tuesday', '02:00:00', '04:30:00', '01:00:00', 10),
-            ('task 13', 'Monday', '15:00:00', '19:30:00', '01:00:00', 10);
-
-              
-    ''')
-    conn.commit()
-    c.execute('''
-        INSERT INTO ShiftsTable6 (
-            StartTime,
-            EndTime,
-            BreakTime,
-            BreakDuration,
-            Weight,
-            Monday,
-            Tuesday,
-            Wednesday,
-            Thursday,
-            Friday,
-            Saturday,
-            Sunday
-        )
-        VALUES
-            ('07:00:00', '12:00:00', '08:30:00', '0:30:00', 10, 1, 1, 1, 1, 1, 1, 1),
-            ('07:30:00', '12:30:00', '08:30:00', '0:30:00', 20, 1, 1, 1, 1, 1, 1, 1),
-            ('00:30:00', '04:30:00', '01:30:00', '0:30:00', 5, 1, 1, 1, 1, 1, 1, 1),
-            ('14:30:00', '19:30:00', '17:30:00', '0:30:00', 5, 1, 1, 1, 1, 1, 1, 1);
-           
-    ''')
-    conn.commit()
-    conn.close()
+    nurses_df = get_all("NursesTable")
+    edited_df = st.data_editor(
+        nurses_df[database.NURSE_COLUMNS].astype({day: bool for day in engine.DAY_NAMES}),
+        num_rows="dynamic",
+        hide_index=True,
+        column_config={
+            "MaxWeeklyHours": st.column_config.NumberColumn("Max Hours", min_value=0, step=1),
+            **{day: st.column_config.CheckboxColumn(day[:3]) for day in engine.DAY_NAMES},
+            "ShiftCosts": st.column_config.TextColumn(
+                "Shift Costs", help='JSON, shift id -> cost, e.g. {"3": 9.5}. Other shifts cost their weight.'
+            ),
+        },
+        key="nurse_registry_editor",
+    )
+    if st.button("💾 Save Nurses", use_container_width=True, key="save_nurses"):
+        edited_df = edited_df.dropna(subset=["Name"]).copy()
+        edited_df["MaxWeeklyHours"] = edited_df["MaxWeeklyHours"].fillna(40)
+        for day in engine.DAY_NAMES:
+            edited_df[day] = edited_df[day].fillna(True).astype(int)
+        shift_ids = set(get_all("ShiftsTable6")["id"].astype(int))
+        bad_rows = []
+        for i, name, value in zip(edited_df.index, edited_df["Name"], edited_df["ShiftCosts"]):
+            try:
+                shift_costs(value, name, shift_ids)
+            except engine.OptimizationInputError:
+                bad_rows.append(str(i + 1))
+        if bad_rows:
+            st.error(
+                "Shift Costs must be empty or a JSON object of existing shift ids and costs of 0 or more, "
+                f'e.g. {{"3": 9.5}} (rows {", ".join(bad_rows)}).'
+            )
+        else:
+            database.save_nurses(edited_df)
+            st.success(f"Saved {len(edited_df)} nurses!")
+
+    # Seeded synthetic registry for the current shifts
+    num_col, gen_col = st.columns(2)
+    with num_col:
+        num_nurses = st.number_input("Nurses", min_value=1, max_value=5000, value=50, step=10,
+                                     key="synthetic_nurses_count")
+    with gen_col:
+        st.write("")
+        if st.button("🧪 Synthetic Nurses", use_container_width=True, key="synthetic_nurses",
+                     help="Replace the registry with generated nurses for the current shifts."):
+            database.save_nurses(generate_nurses(int(num_nurses), get_all("ShiftsTable6")))
+            st.rerun()
+
 
 # ------------------------------------------------------------------
 #                     First Optimizer: Tasks-Shifts
 # ------------------------------------------------------------------
 
-def optimize_tasks_with_gurobi():
+def solver_params():
     """
-    Assign tasks to (shift, day) pairs so that a single shift can have 
-    different worker counts on different days.
-
-    This version ensures that a Monday task won't force workers on Tuesday/Wednesday 
-    if the shift is active multiple days.
+    Gurobi parameters from the solver settings in the optimization tab:
+    the chosen preset, with the time limit and gap overriding it if set.
     """
+    presets = engine.solver_presets(get_tuned_settings())
+    preset = st.session_state.get("solver_preset") or engine.default_preset(presets)
+    params = dict(presets.get(preset, presets[engine.DEFAULT_PRESET]))
+    time_limit = st.session_state.get("solver_time_limit")
+    if time_limit:
+        params["TimeLimit"] = float(time_limit)
+    mip_gap = st.session_state.get("solver_mip_gap")
+    if mip_gap is not None:
+        params["MIPGap"] = mip_gap / 100
+    return params
+
+def solver_settings():
+    """Preset choice and overrides used by the next solve."""
+    tuned = get_tuned_settings()
+    presets = engine.solver_presets(tuned)
+    names = list(presets)
+    preset = st.selectbox(
+        "Parameter preset", names, index=names.index(engine.default_preset(presets)),
+        key="solver_preset",
+        help="fast-preview finds a good plan quickly, prove-optimal proves the cheapest plan, "
+             "tuned is the preset picked for your data by `python -m tuning`."
+    )
+    if preset == engine.TUNED_PRESET:
+        st.caption(f"Tuned on {tuned['CreatedAt']}: {tuned['Candidate']}")
+    st.caption(", ".join(f"{k} {v}" for k, v in presets[preset].items()))
+
+    set_col1, set_col2 = st.columns(2)
+    with set_col1:
+        st.number_input("Time limit (seconds)", min_value=1, value=None, step=10,
+                        key="solver_time_limit", placeholder="preset default",
+                        help="Stop after this long and keep the best plan found.")
+    with set_col2:
+        st.number_input("Optimality gap (%)", min_value=0.0, max_value=100.0, value=None,
+                        step=0.5, format="%.2f", key="solver_mip_gap", placeholder="preset default",
+                        help="Stop once the plan is proven within this % of the best possible cost.")
+
+    formulations = list(engine.FORMULATIONS)
+    st.radio(
+        "Model", formulations, index=formulations.index(engine.DEFAULT_FORMULATION),
+        format_func=engine.FORMULATIONS.get, key="solver_formulation",
+        help="The task model decides which shift every task goes to. The bucket model only decides "
+             "how many nurses work each shift, from the nurses the tasks need every 15 minutes, and "
+             "hands the tasks out afterwards: far smaller, for weeks with tens of thousands of tasks. "
+             f"The first switches to buckets above {engine.BUCKET_VAR_THRESHOLD:,} task model variables."
+    )
+    modes = list(engine.CAPACITY_MODES)
+    st.radio(
+        "Worker capacity", modes, index=modes.index(engine.DEFAULT_CAPACITY),
+        format_func=engine.CAPACITY_MODES.get, key="solver_capacity", horizontal=True,
+        help="Count the nurses of all tasks in a shift together, or only of tasks whose time "
+             "windows overlap. The second needs more constraints but staffs each shift for its "
+             "actual peak; the third gives the same plan but adds those constraints only when a "
+             "candidate plan breaks them, which keeps large models small."
+    )
+    st.toggle(
+        "Local search alongside the solver", key="solver_local_search",
+        help="Run a second process that improves plans by moving and swapping tasks between shifts "
+             "and hands better ones to the solver. Helps most on large weeks where the best plan "
+             "found improves slowly."
+    )
+    placements = list(engine.PLACEMENT_METHODS)
+    st.radio(
+        "Task placement", placements, index=placements.index(engine.DEFAULT_PLACEMENT),
+        format_func=engine.PLACEMENT_METHODS.get, key="solver_placement", horizontal=True,
+        help="How task start times are picked inside each chosen shift. The first searches the "
+             "start times with the fewest nurses on duty at once; the second places the tasks one "
+             "by one, which is quicker but can need more nurses."
+    )
+    granularities = list(engine.GRANULARITIES)
+    st.selectbox(
+        "Start time steps", granularities, index=granularities.index(engine.DEFAULT_GRANULARITY),
+        format_func=engine.GRANULARITIES.get, key="solver_granularity",
+        help="How far apart the start times tried for each task are. With several steps the tasks "
+             "are placed on the coarse grid first and then only moved around that placement on "
+             "the finer ones, so 5-minute start times cost about as much as 15-minute ones."
+    )
+    limits = engine.SizeLimits()
+    size_col1, size_col2 = st.columns(2)
+    with size_col1:
+        st.number_input("Model memory limit (MB)", min_value=64, value=int(limits.max_memory_mb), step=256,
+                        key="solver_max_memory_mb",
+                        help=f"Largest model to build. Models over {limits.max_vars:,} variables or "
+                             f"{limits.max_nonzeros:,} nonzeros count as too large as well.")
+    with size_col2:
+        actions = list(engine.SIZE_ACTIONS)
+        st.selectbox(
+            "When the model is too large", actions, index=actions.index(engine.DEFAULT_SIZE_ACTION),
+            format_func=engine.SIZE_ACTIONS.get, key="solver_size_action",
+            help="Switch to grouped tasks, capacity rows added only when needed, or demand buckets, "
+                 "whichever fits first; stop with an error; or build the model anyway."
+        )
+    display_model_size()
+
+def size_limits():
+    """The SizeLimits of the Solver Settings."""
+    return engine.SizeLimits(
+        max_memory_mb=st.session_state.get("solver_max_memory_mb") or engine.SizeLimits().max_memory_mb,
+        action=st.session_state.get("solver_size_action", engine.DEFAULT_SIZE_ACTION),
+    )
 
-    # --- 1. Load Data ---
+def display_model_size():
+    """
+    Projected size of the model for the current tasks, shifts and
+    settings (engine.estimate_model_size), recounted only when they
+    changed, and what the limits will do with it.
+    """
     tasks_df = get_all("TasksTable3")
     shifts_df = get_all("ShiftsTable6")
+    if tasks_df.empty or shifts_df.empty:
+        return
+    capacity = st.session_state.get("solver_capacity", engine.DEFAULT_CAPACITY)
+    formulation = st.session_state.get("solver_formulation", engine.DEFAULT_FORMULATION)
+    limits = size_limits()
+    fingerprint = (
+        int(pd.util.hash_pandas_object(tasks_df).sum()),
+        int(pd.util.hash_pandas_object(shifts_df).sum()),
+        capacity,
+        formulation,
+        limits,
+    )
+    cached = st.session_state.get("model_size_estimate")
+    if cached is None or cached[0] != fingerprint:
+        tasks_df, shifts_df = engine.prepare_tables(tasks_df, shifts_df)
+        shifts_df, _ = engine.prune_shifts(shifts_df)
+        size = engine.estimate_model_size(tasks_df, shifts_df, capacity=capacity,
+                                          formulation="buckets" if formulation == "buckets" else "tasks")
+        if formulation == "auto" and size.num_vars > engine.BUCKET_VAR_THRESHOLD:
+            size = engine.estimate_model_size(tasks_df, shifts_df, capacity=capacity, formulation="buckets")
+        try:
+            checked, notes = engine.check_model_size(tasks_df, shifts_df, size, limits)
+        except engine.ModelTooLargeError as e:
+            checked, notes = None, [str(e)]
+        cached = (fingerprint, size, checked, notes)
+        st.session_state["model_size_estimate"] = cached
+
+    _, size, checked, notes = cached
+    kind = "Task" if size.formulation == "tasks" else "Demand-bucket"
+    st.caption(f"{kind} model: {size.describe()}, projected from the current data.")
+    for note in notes:
+        if checked is None:
+            st.error(note)
+        else:
+            st.warning(note)
+
+def start_optimization():
+    """
+    Start a background solve of the current tasks and shifts. Progress is
+    shown by display_solve_progress; returns the job, or None if there is
+    nothing to solve.
+    """
+    profiler = Profiler(track_memory=st.session_state.get("profile_memory", False))
+    with profiler.span("load"):
+        tasks_df = get_all("TasksTable3")
+        shifts_df = get_all("ShiftsTable6")
 
     # Basic check for empty data
     if tasks_df.empty or shifts_df.empty:
         st.error("Tasks or shifts data is missing. Add data and try again.")
-        return
-
-    # --- 2. Format Time Columns ---
-    # Adjust your time format if it's not "%H:%M:%S"
-    tasks_df["StartTime"] = pd.to_datetime(tasks_df["StartTime"], format="%H:%M:%S").dt.time
-    tasks_df["EndTime"]   = pd.to_datetime(tasks_df["EndTime"],   format="%H:%M:%S").dt.time
-
-    shifts_df["StartTime"] = pd.to_datetime(shifts_df["StartTime"], format="%H:%M:%S").dt.time
-    shifts_df["EndTime"]   = pd.to_datetime(shifts_df["EndTime"],   format="%H:%M:%S").dt.time
-
-    # Column names in ShiftsTable6 for the days of the week
-    day_names = ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
-
-    # --- 3. Create Gurobi Model ---
-    model = Model("Task_Assignment")
-
-    # --- 4. Decision Variables ---
-    # 4.1. Worker variables: (shift, day) -> integer # of workers
-    shift_worker_vars = {}
-    for shift_id, shift_row in shifts_df.iterrows():
-        for day_str in day_names:
-            if shift_row[day_str] == 1:  # shift is active on this day
-                var_name = f"Workers_Shift_{shift_id}_{day_str}"
-                shift_worker_vars[(shift_id, day_str)] = model.addVar(
-                    vtype=GRB.CONTINUOUS, lb=0, name=var_name
-                )
+        return None
+
+    job = engine.SolveJob(
+        tasks_df, shifts_df, params=solver_params(), profiler=profiler,
+        capacity=st.session_state.get("solver_capacity", engine.DEFAULT_CAPACITY),
+        local_search=st.session_state.get("solver_local_search", False),
+        placement=st.session_state.get("solver_placement", engine.DEFAULT_PLACEMENT),
+        granularity=st.session_state.get("solver_granularity", engine.DEFAULT_GRANULARITY),
+        formulation=st.session_state.get("solver_formulation", engine.DEFAULT_FORMULATION),
+        limits=size_limits()
+    ).start()
+    st.session_state["solve_job"] = job
+    for key in ("last_screening", "last_pruned_shifts", "last_size_notes", "infeasible_instance",
+                "iis_constraints"):
+        st.session_state.pop(key, None)
+    return job
+
+def finish_optimization(job):
+    """
+    Store the run of a finished job and keep its results in the session.
+    Leaves a notice for the next rerun and returns the new run id, or
+    None if the run failed.
+    """
+    profiler = job.profiler
+    tasks_df, shifts_df = job.tasks_df, job.shifts_df
+    if isinstance(job.error, engine.ModelTooLargeError):
+        st.session_state["optimization_notice"] = ("error", f"Model too large: {job.error}")
+        return None
+    if isinstance(job.error, engine.OptimizationInputError):
+        st.session_state["optimization_notice"] = ("error", f"Invalid input: {job.error}")
+        return None
+    if isinstance(job.error, GurobiError):
+        st.session_state["optimization_notice"] = ("error", f"Gurobi error occurred: {job.error}")
+        return None
+    if job.error is not None:
+        st.session_state["optimization_notice"] = ("error", f"Optimization failed: {job.error}")
+        return None
+
+    result = job.result
+    st.session_state["last_screening"] = result.screening
+    st.session_state["last_pruned_shifts"] = result.pruned_shifts
+    st.session_state["last_size_notes"] = result.size_notes
+    if not result.has_solution:
+        save_solver_telemetry(result.telemetry)
+        profiler.write_log(kind="optimization", status=result.status,
+                           tasks=len(tasks_df), shifts=len(shifts_df))
+        st.session_state["optimization_notice"] = (
+            "error", f"Optimization failed with status: {result.status}"
+        )
+        if result.status in ("INFEASIBLE", "INF_OR_UNBD"):
+            st.session_state["infeasible_instance"] = (tasks_df, shifts_df)
+        return None
+
+    with profiler.span("save"):
+        # Persist the run so the results survive reruns
+        run_id = save_optimization_run(
+            result.results_df, result.nurse_requirements_df, result.day_summary_df,
+            status=result.status, objective_value=result.objective_value
+        )
+        save_solver_telemetry(result.telemetry, run_id=run_id)
 
-    # 4.2. Task assignment variables: (task, shift, day) -> binary
-    #      Only if the task's day == shift's active day AND times align
-    task_shift_vars = {}
-    for task_id, task_row in tasks_df.iterrows():
-        t_day = task_row["Day"]   # e.g. "Monday"
-        t_s   = task_row["StartTime"]
-        t_e   = task_row["EndTime"]
-
-        # Iterate over all shifts
-        for shift_id, shift_row in shifts_df.iterrows():
-            # Only consider if the shift is active on the task's day
-            if shift_row[t_day] == 1:
-                shift_s = shift_row["StartTime"]
-                shift_e = shift_row["EndTime"]
-                # Check if shift covers the task time
-                if shift_s <= t_s and shift_e >= t_e:
-                    var_name = f"Task_{task_id}_Shift_{shift_id}_{t_day}"
-                    task_shift_vars[(task_id, shift_id, t_day)] = model.addVar(
-                        vtype=GRB.BINARY, name=var_name
-                    )
+    with profiler.span("render_prep"):
+        # Keep the freshly computed frames in the session as well
+        cached = cache_session_results(
+            get_optimization_run(run_id),
+            result.results_df, result.nurse_requirements_df, result.day_summary_df
+        )
 
-    # --- 5. Objective: Minimize total cost = sum(workers * weight) across (shift, day) ---
-    model.setObjective(
-        quicksum(
-            shift_worker_vars[(s_id, d)] * shifts_df.loc[s_id, "Weight"]
-            for (s_id, d) in shift_worker_vars
-        ),
-        GRB.MINIMIZE
+    cached["profile_df"] = profiler.to_frame()
+    cached["progress"] = list(job.progress)
+    profiler.write_log(
+        run_id=run_id, kind="optimization", status=result.status,
+        tasks=len(tasks_df), shifts=len(shifts_df),
+        num_vars=result.num_vars, num_constrs=result.num_constrs
     )
 
-    # --- 6. Constraints ---
-
-    # 6.1. Coverage: each task is assigned to at least one feasible (shift, day)
-    for task_id, task_row in tasks_df.iterrows():
-        # Gather all feasible assignment variables for this task
-        feasible_assignments = [
-            task_shift_vars[key]
-            for key in task_shift_vars
-            if key[0] == task_id  # same task
-        ]
-        # If there's at least one feasible shift-day, require that sum >= 1
-        if feasible_assignments:
-            model.addConstr(
-                quicksum(feasible_assignments) >= 1,
-                name=f"Task_{task_id}_Coverage"
-            )
-        else:
-            # No feasible shift-day found: either data problem or the model is infeasible
-            pass
-
-    # 6.2. Worker capacity: for each (shift, day), total nurses required
-    #     by tasks assigned cannot exceed the # of workers assigned
-    for (shift_id, day_str) in shift_worker_vars:
-        model.addConstr(
-            quicksum(
-                tasks_df.loc[t_id, "NursesRequired"] * task_shift_vars[(t_id, shift_id, day_str)]
-                for (t_id, s_id, d) in task_shift_vars
-                if s_id == shift_id and d == day_str
-            ) <= shift_worker_vars[(shift_id, day_str)],
-            name=f"Shift_{shift_id}_{day_str}_WorkerCap"
+    if result.is_optimal and result.formulation == "buckets":
+        st.session_state["optimization_notice"] = (
+            "success", "✅ Optimization successful! Solved as demand buckets, tasks handed out afterwards."
         )
- 
-   
-    # --- 7. Solve the model ---
-    with st.spinner("Optimizing tasks and shifts. Please wait..."):
-        try:
-            model.optimize()
-        except GurobiError as e:
-            st.error(f"Gurobi error occurred: {e}")
-            return
-
-    if model.status == GRB.OPTIMAL:
-        # Phase 1: Collect raw assignment data and calculate contributions
-        from collections import defaultdict
-        from datetime import datetime, date
-        temp_results = []
-        shift_day_cost = defaultdict(float)        # Total cost per (shift, day)
-        shift_day_contributions = defaultdict(float)  # Sum of contributions
-        
-        for (task_id, shift_id, d), assign_var in task_shift_vars.items():
-            if assign_var.x > 0.5:
-                # Get basic assignment info
-                workers = shift_worker_vars[(shift_id, d)].x
-                shift_weight = shifts_df.loc[shift_id, "Weight"]
-                task_row = tasks_df.loc[task_id]
-                
-                # Calculate task duration in hours
-                t_start = task_row["StartTime"]
-                t_end = task_row["EndTime"]
-                start_dt = datetime.combine(date.min, t_start)
-                end_dt = datetime.combine(date.min, t_end)
-                duration = (end_dt - start_dt).total_seconds() / 3600
-                
-                # Calculate contribution metric (nurses × hours)
-                contribution = task_row["NursesRequired"] * duration
-                
-                # Store temporary data
-                temp_results.append({
-                    "task_id": task_id,
-                    "shift_id": shift_id,
-                    "day": d,
-                    "workers": workers,
-                    "shift_weight": shift_weight,
-                    "contribution": contribution
-                })
-                
-                # Update aggregates
-                shift_day_cost[(shift_id, d)] = workers * shift_weight
-                shift_day_contributions[(shift_id, d)] += contribution
-
-        # Phase 2: Calculate proportional costs
-
-        def calculate_cost_for_intervals(task_rows, shift_row, weight, interval_minutes=15):
-            """
-            Calculate the cost considering shift breaks, preventing task assignments during break times.
-            Returns assignments, total cost, and max nurses required.
-            """
-            shift_start = pd.to_datetime(shift_row["StartTime"], format="%H:%M:%S")
-            shift_end = pd.to_datetime(shift_row["EndTime"], format="%H:%M:%S")
-            
-            break_start = pd.to_datetime(shift_row["BreakTime"], format="%H:%M:%S")
-            break_duration = pd.Timedelta(minutes=int(pd.to_datetime(shift_row["BreakDuration"], format="%H:%M:%S").minute))
-            break_end = break_start + break_duration
-
-            # Create time slots excluding break period
-            time_slots = {}
-            periods = []
-            
-            # Add pre-break period if valid
-            if shift_start < break_start:
-                periods.append((shift_start, break_start))
-            
-            # Add post-break period if valid
-            if break_end < shift_end:
-                periods.append((break_end, shift_end))
-            
-            # Create time slots for each valid period
-            for period_start, period_end in periods:
-                for minute in range(int(period_start.timestamp() // 60), 
-                                int(period_end.timestamp() // 60)):
-                    time_slots[minute] = 0
-
-            assignments = []
+    elif result.is_optimal:
+        st.session_state["optimization_notice"] = ("success", "✅ Task-shift optimization successful!")
+    else:
+        gap = f"{result.mip_gap:.2%}" if result.mip_gap is not None else "unknown"
+        st.session_state["optimization_notice"] = (
+            "warning",
+            f"Solve stopped ({result.status}) with the best plan found so far; "
+            f"it is within {gap} of the best possible cost."
+        )
+    return run_id
 
-            for task_row in task_rows:
-                task_start = pd.to_datetime(task_row["StartTime"], format="%H:%M:%S")
-                task_end = pd.to_datetime(task_row["EndTime"], format="%H:%M:%S")
+# Seconds the on-demand IIS search may take
+IIS_TIME_LIMIT = 30
 
-                try:
-                    duration_minutes = int(task_row["Duration"])
-                except ValueError:
-                    duration_td = pd.to_timedelta(task_row["Duration"])
-                    duration_minutes = int(duration_td.total_seconds() / 60)
-
-                best_start = None
-                best_cost = float("inf")
-                valid_start_times = []
-
-                # Find valid start times in each available period
-                for period_start, period_end in periods:
-                    # Adjust for task constraints
-                    start_time = max(task_start, period_start)
-                    end_time = min(task_end, period_end)
-                    
-                    if start_time >= end_time:
-                        continue  # No valid time in this period
-
-                    # Generate possible start times within this period
-                    period_starts = pd.date_range(
-                        start=start_time,
-                        end=end_time - pd.Timedelta(minutes=duration_minutes),
-                        freq=f"{interval_minutes}min"
-                    )
-                    valid_start_times.extend(period_starts)
-
-                if not valid_start_times:
-                    continue  # No valid placement for this task
-
-                # Evaluate each valid start time
-                for start in valid_start_times:
-                    end = start + pd.Timedelta(minutes=duration_minutes)
-                    
-                    # Verify the task doesn't overlap with break
-                    if (start < break_end) and (end > break_start):
-                        continue  # Skip times overlapping with break
-
-                    temp_slots = time_slots.copy()
-                    valid = True
-                    
-                    # Check all minutes in the task duration
-                    for t in range(int(start.timestamp() // 60), 
-                                int(end.timestamp() // 60)):
-                        if t not in temp_slots:
-                            valid = False
-                            break
-                        temp_slots[t] += task_row["NursesRequired"]
-
-                    if not valid:
-                        continue  # Invalid placement
-
-                    current_max = max(temp_slots.values(), default=0)
-                    cost = current_max * weight
-
-                    if cost < best_cost or (cost == best_cost and not best_start):
-                        best_cost = cost
-                        best_start = start
-
-                if best_start:
-                    assignments.append({
-                                            "Task ID": task_row["id"],
-                                            "Task Name": task_row["TaskName"],
-                                            "Day": task_row["Day"],
-                                            "Task Start": task_row["StartTime"],
-                                            "Task End": task_row["EndTime"],
-                                            "Begin Task": best_start,
-                                            "End Task": best_start + pd.Timedelta(minutes=duration_minutes),
-                                            "Workers Assigned": task_row["NursesRequired"]
-                                        })
-
-                    # Update actual time slots
-                    for t in range(int(best_start.timestamp() // 60), 
-                                int((best_start + pd.Timedelta(minutes=duration_minutes)).timestamp() // 60)):
-                        time_slots[t] += task_row["NursesRequired"]
-
-            max_nurses = max(time_slots.values(), default=0)
-            total_cost = max_nurses * weight
-            return assignments, total_cost, max_nurses
-        
-
-        # Compute results
-        processed_shifts = set()
-        results = []
-        daily_costs = {day: 0.0 for day in day_names}
-        daily_workers = {day: 0 for day in day_names}
-        daily_tasks = {day: 0 for day in day_names}
-        for entry in temp_results:
-            shift_id = entry["shift_id"]
-            day = entry["day"]
-            key = (shift_id, day)
-
-            # if shift_id in processed_shifts:
-            #     continue  # Skip already processed shifts
-
-            if key in processed_shifts:
-                continue
-            processed_shifts.add(key)
-
-            shift_row = shifts_df.loc[shift_id]
-            weight = shift_row["Weight"]
-            #key = (shift_id, entry["day"])
-
-            # Filter tasks for the current shift
-            relevant_tasks = [
-                tasks_df.loc[task["task_id"]]
-                for task in temp_results
-                if task["shift_id"] == shift_id and task["day"] == day
-            ]
-
-            # Compute optimal intervals and costs
-            assignments, total_cost, max_nurses  = calculate_cost_for_intervals(relevant_tasks, shift_row, weight)
-            daily_costs[day] += total_cost
-            daily_workers[day] += max_nurses
-            daily_tasks[day] += len(assignments)  # Count assigned tasks
-
-            # Collect results for each task
-            for assignment in assignments:
-                results.append({
-                    "Task ID": assignment["Task ID"],
-                    "Task Name": assignment["Task Name"],
-                    "Day": assignment["Day"],
-                    "Task Start": assignment["Task Start"].strftime("%H:%M"),
-                    "Task End": assignment["Task End"].strftime("%H:%M"),
-                    "Begin Task": assignment["Begin Task"].strftime("%H:%M"),
-                    "End Task": assignment["End Task"].strftime("%H:%M"),
-                    "Shift ID": shift_row["id"],
-                    "Shift Start": shift_row["StartTime"].strftime("%H:%M"),
-                    "Shift End": shift_row["EndTime"].strftime("%H:%M"),
-                    "Workers Assigned": assignment["Workers Assigned"],
-                    "Hourly Rate (€)": weight,
-                    "Task Cost (€)":  round(assignment["Workers Assigned"] * weight, 2) ,
-                    "Number of Nurses": max_nurses,
-                    "Cost %": round((total_cost / shift_day_cost[key]) * 100, 1) if shift_day_cost[key] > 0 else 0
-                })
-
-            #processed_shifts.add(shift_id)  # Mark this shift as processed
-
-        # Convert results to DataFrame
-        results_df = pd.DataFrame(results)
-
-        results_df["Shift"] = (
-            results_df["Shift Start"] 
-            + " - " 
-            + results_df["Shift End"]
-        )
+def show_optimization_notice():
+    """
+    Show the outcome of the last finished solve (once), its pre-solve
+    screening problems, and an on-demand IIS search for infeasible models.
+    """
+    notice = st.session_state.pop("optimization_notice", None)
+    if notice is not None:
+        kind, message = notice
+        if kind == "success":
+            st.success(message)
+            st.balloons()
+        elif kind == "warning":
+            st.warning(message)
+        else:
+            st.error(message)
+
+    for note in st.session_state.get("last_size_notes", []):
+        st.info(f"📐 {note}")
+
+    screening = st.session_state.get("last_screening")
+    if screening is not None and not screening.ok:
+        counts = screening.counts()
+        with st.expander(
+            f"⚠️ Pre-solve checks: {counts['uncovered']} uncovered, "
+            f"{counts['break_conflicts']} break conflicts, {counts['capacity_conflicts']} capacity conflicts"
+        ):
+            st.caption("These tasks cannot be placed in any shift and are missing from the plan.")
+            st.dataframe(
+                screening.frame(),
+                column_order=["TaskName", "Day", "StartTime", "EndTime", "Duration",
+                              "NursesRequired", "Reason", "Covering Shifts"],
+                hide_index=True, use_container_width=True
+            )
 
-       
-        # 1. Cost Validation Check
-        validation = results_df.groupby(["Shift ID", "Day"]).agg(
-            Total_Cost=("Task Cost (€)", "sum"),
-            Expected_Cost=("Hourly Rate (€)", lambda x: x.iloc[0] * results_df["Workers Assigned"].iloc[0])
-        ).reset_index()
-        validation["Valid"] = validation["Total_Cost"].round(2) == validation["Expected_Cost"].round(2)
- 
-        day_summary = []
-        for day in day_names:
-            day_summary.append({
-                "Day": day,
-                "Total Cost (€)": round(daily_costs[day], 2),
-                "Tasks Assigned": daily_tasks[day],
-                "Workers Assigned": daily_workers[day]
-            })
+    pruned = st.session_state.get("last_pruned_shifts")
+    if pruned is not None and not pruned.empty:
+        with st.expander(f"✂️ {len(pruned)} shifts left out of the model"):
+            st.caption("Inactive, duplicate or dominated shifts; a cheaper shift can always be used instead.")
+            st.dataframe(
+                pruned.reset_index().rename(columns={"index": "Shift"}),
+                column_order=["Shift", "StartTime", "EndTime", "BreakTime", "BreakDuration",
+                              "Weight", "Reason", "KeptShift"],
+                hide_index=True, use_container_width=True
+            )
 
+    if "infeasible_instance" in st.session_state:
+        if st.button("🔍 Find conflicting constraints (IIS)", key="compute_iis"):
+            with st.spinner(f"Searching for conflicting constraints (up to {IIS_TIME_LIMIT} s)..."):
+                st.session_state["iis_constraints"] = engine.compute_iis(
+                    *st.session_state["infeasible_instance"], time_limit=IIS_TIME_LIMIT
+                )
+        for constr_name in st.session_state.get("iis_constraints", []):
+            st.write(f"⚠️ Infeasible constraint: {constr_name}")
+
+def progress_chart(progress):
+    """Incumbent and bound over solve time."""
+    progress_df = pd.DataFrame(progress).melt(
+        id_vars="time", value_vars=["incumbent", "bound"], var_name="Series", value_name="Cost"
+    ).dropna()
+    return px.line(progress_df, x="time", y="Cost", color="Series", markers=True,
+                   labels={"time": "Solve time (s)"}, line_shape="hv")
+
+@st.experimental_fragment(run_every=1)
+def display_solve_progress():
+    """
+    Live view of the running solve, refreshed every second without
+    rerunning the rest of the app. Once the job is done its results are
+    stored and the whole app is rerun to show them.
+    """
+    job = st.session_state.get("solve_job")
+    if job is None:
+        return
+    if job.done:
+        del st.session_state["solve_job"]
+        finish_optimization(job)
+        st.rerun()
+
+    latest = job.latest() or {}
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Elapsed", f"{job.elapsed:.0f} s")
+    col2.metric("Best plan", f"€{latest['incumbent']:,.2f}" if latest.get("incumbent") is not None else "–")
+    col3.metric("Bound", f"€{latest['bound']:,.2f}" if latest.get("bound") is not None else "–")
+    col4.metric("Gap", f"{latest['gap']:.2%}" if latest.get("gap") is not None else "–")
+    if job.progress:
+        st.plotly_chart(progress_chart(job.progress), use_container_width=True)
+
+    if job.stopping:
+        st.info("Stopping… the best plan found so far will be kept.")
+    elif st.button("⏹️ Stop and keep best plan", use_container_width=True, key="stop_optimization"):
+        job.stop()
+        st.info("Stopping… the best plan found so far will be kept.")
+    else:
+        st.caption("Optimizing tasks and shifts. Please wait…")
 
-        day_summary_df = pd.DataFrame(day_summary)
 
-        results_df["Shift"] = results_df["Shift Start"] + " - " + results_df["Shift End"]
+def shift_design_panel():
+    """
+    Propose new shifts for the current tasks (shift_design.design_shifts)
+    and add the ones the planner accepts to the shift table.
+    """
+    st.caption("Let column generation search start times, lengths and break positions for shifts "
+               "that cover the tasks more cheaply than the ones you entered.")
+    if st.button("🧩 Design Shifts", use_container_width=True, key="design_shifts"):
+        tasks_df = get_all("TasksTable3")
+        if tasks_df.empty:
+            st.warning("Add tasks first.")
+            return
+        capacity = st.session_state.get("solver_capacity", engine.DEFAULT_CAPACITY)
+        with st.spinner("Designing shifts..."):
+            try:
+                st.session_state["shift_design"] = design_shifts(tasks_df, get_all("ShiftsTable6"),
+                                                                 capacity=capacity)
+            except GurobiError as e:
+                st.error(f"Shift design failed: {e}")
+                return
 
+    design = st.session_state.get("shift_design")
+    if design is None:
+        return
+    summary = design.summary()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("New Shifts", summary["new_shifts"])
+    if summary["lp_cost_after"] is not None:
+        before = summary["lp_cost_before"]
+        col2.metric("LP Cost", f"€{summary['lp_cost_after']:,.2f}",
+                    delta=f"€{summary['lp_cost_after'] - before:,.2f}" if before is not None else None,
+                    delta_color="inverse")
+    col3.metric("Pricing Rounds", summary["iterations"])
+    if design.seeded:
+        st.info(f"{design.seeded} tasks no current shift covers are covered by designed shifts.")
+    if design.uncovered:
+        st.warning(f"{design.uncovered} tasks fit in no candidate shift (windows longer than the longest shift).")
+    if design.shifts_df.empty:
+        st.caption("The current shifts already cover the tasks at the lowest LP cost.")
+        return
+    st.dataframe(design.shifts_df, hide_index=True)
+    if st.button("➕ Add Designed Shifts", use_container_width=True, key="add_designed_shifts"):
+        for row in design.shifts_df.itertuples(index=False):
+            add_shift_to_db(tuple(row))
+        del st.session_state["shift_design"]
+        st.success(f"Added {len(design.shifts_df)} shifts!")
+
+def display_cost_estimate():
+    """
+    Instant approximate cost of the current tasks and shifts
+    (engine.preview), recomputed only when the data or the capacity and
+    placement settings changed since the last rerun.
+    """
+    tasks_df = get_all("TasksTable3")
+    shifts_df = get_all("ShiftsTable6")
+    if tasks_df.empty or shifts_df.empty:
+        st.caption("Add tasks and shifts to see a cost estimate.")
+        return
 
-        total_cost = 0
-        for day in day_names:
-            total_cost += round(daily_costs[day], 2)
+    capacity = st.session_state.get("solver_capacity", engine.DEFAULT_CAPACITY)
+    placement = st.session_state.get("solver_placement", engine.DEFAULT_PLACEMENT)
+    granularity = st.session_state.get("solver_granularity", engine.DEFAULT_GRANULARITY)
+    fingerprint = (
+        int(pd.util.hash_pandas_object(tasks_df).sum()),
+        int(pd.util.hash_pandas_object(shifts_df).sum()),
+        capacity,
+        placement,
+        granularity,
+        size_limits(),
+    )
+    cached = st.session_state.get("cost_estimate")
+    if cached is None or cached[0] != fingerprint:
+        started = _time.perf_counter()
+        try:
+            result = engine.preview(tasks_df, shifts_df, capacity=capacity, placement=placement,
+                                    granularity=granularity, limits=size_limits())
+        except (GurobiError, engine.ModelTooLargeError) as e:
+            st.warning(f"No estimate available: {e}")
+            return
+        cached = (fingerprint, result, _time.perf_counter() - started)
+        st.session_state["cost_estimate"] = cached
 
+    _, result, seconds = cached
+    if not result.has_solution:
+        st.warning(f"No estimate available ({result.status}).")
+        return
+    col1, col2 = st.columns(2)
+    col1.metric("≈ Total Cost", f"€{result.total_cost:,.2f}")
+    col2.metric("Gap to bound", f"{result.mip_gap:.2%}" if result.mip_gap is not None else "–")
+    bound = f", LP bound €{result.objective_bound:,.2f}" if result.objective_bound is not None else ""
+    st.caption(
+        f"Approximate: rounded LP relaxation (model cost €{result.objective_value:,.2f}{bound}), "
+        f"computed in {seconds * 1000:.0f} ms. Run the optimization for the exact plan."
+    )
 
-        # --- Display Results ---
-        st.success("✅ Task-shift optimization successful!")
-        st.balloons()
 
-        # Overall Metrics
-        #total_cost = model.ObjVal
-        # total_cost = 7
-        total_workers = sum(daily_workers.values())
-        total_tasks = len(results_df)
+def cache_session_results(run, results_df, nurse_requirements_df, day_summary_df):
+    """
+    Keep the frames of a run, their CSV downloads and chart data in
+    st.session_state, so that download buttons, expanders and charts can
+    rerun the script without touching the database or the solver.
+    """
+    cached = {
+        "run_id": int(run["id"]),
+        "run": run,
+        "results_df": results_df,
+        "nurse_requirements_df": nurse_requirements_df,
+        "day_summary_df": day_summary_df,
+        **engine.prepare_render_data(results_df, nurse_requirements_df, day_summary_df),
+    }
+    st.session_state["optimization_results"] = cached
+    return cached
+
+def get_session_results(run_id):
+    """
+    Return the cached results of a run, loading them from the database
+    only when the session holds a different run (or none at all).
+    """
+    cached = st.session_state.get("optimization_results")
+    if cached is not None and cached["run_id"] == int(run_id):
+        return cached
+    stored = load_optimization_run(run_id)
+    if stored is None:
+        return None
+    return cache_session_results(*stored)
+
+def display_profile_panel(cached, render_profiler):
+    """
+    Collapsible panel with the solve profile of the run (when it was
+    computed in this session) and the render profile of this rerun.
+    The first render of each run is also written to the profile log.
+    """
+    logged = st.session_state.setdefault("logged_render_profiles", set())
+    if cached["run_id"] not in logged:
+        render_profiler.write_log(run_id=cached["run_id"], kind="render")
+        logged.add(cached["run_id"])
+
+    with st.expander("⏱️ Performance Profile"):
+        if "profile_df" in cached:
+            st.markdown("**Optimization**")
+            st.dataframe(cached["profile_df"], hide_index=True, use_container_width=True)
+        else:
+            st.caption("This run was not solved in the current session; see the profile log for its solve timings.")
+        st.markdown("**Rendering (this rerun)**")
+        st.dataframe(render_profiler.to_frame(), hide_index=True, use_container_width=True)
+        if len(cached.get("progress", [])) > 1:
+            st.markdown("**Solve progress**")
+            st.plotly_chart(progress_chart(cached["progress"]), use_container_width=True)
+        st.caption(f"Profiles of every run are appended to `{PROFILE_LOG_FILE}`.")
+
+def display_named_roster(cached):
+    """
+    Registry nurses on the run's (shift, day) places, solved as a min-cost
+    flow and kept in the session cache until the registry or the shifts change.
+    """
+    nurses_df = get_all("NursesTable")
+    if nurses_df.empty:
+        st.caption("Add nurses under **Nurse Registry** to see who works which shift.")
+        return
+    shifts_df = get_all("ShiftsTable6")
+    fingerprint = (
+        int(pd.util.hash_pandas_object(nurses_df, index=False).sum()),
+        int(pd.util.hash_pandas_object(shifts_df, index=False).sum()),
+    )
+    if cached.get("named_roster_key") != fingerprint:
+        try:
+            cached["named_roster"] = build_roster(
+                nurses_df, shifts_df, staffing_from_requirements(cached["nurse_requirements_df"])
+            )
+        except engine.OptimizationInputError as e:
+            st.error(f"{e} Fix it under **Nurse Registry** to see the roster.")
+            return
+        cached["named_roster_key"] = fingerprint
+    roster = cached["named_roster"]
 
-        col1, col2, col3 = st.columns(3)
-        col1.metric("Total Cost", f"€{total_cost:,.2f}")
-        col2.metric("Total Workers Assigned", total_workers)
-        col3.metric("Total Tasks Assigned", total_tasks)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Shifts Staffed", len(roster.assignments_df))
+    col2.metric("Unstaffed", roster.missing)
+    col3.metric("Roster Cost", f"€{roster.total_cost:,.2f}")
+    if roster.missing:
+        st.warning(f"{roster.missing} places cannot be staffed from the registry's availability and hours.")
+        st.dataframe(roster.unstaffed_df, hide_index=True)
+    st.dataframe(roster.assignments_df, hide_index=True)
+    with st.popover("Hours per nurse"):
+        st.dataframe(roster.nurse_summary_df, hide_index=True)
+    st.download_button(
+        label="Download Named Roster as CSV",
+        data=roster.assignments_df.to_csv(index=False).encode("utf-8"),
+        file_name="named_roster.csv",
+        mime="text/csv",
+        key="download_named_roster"
+    )
+    st.caption(f"Assigned in {roster.seconds:.2f}s.")
 
-        # Detailed Assignments
-        with st.expander("📋 View Detailed Task Assignments", expanded=True):
-            if not results_df.empty:
-                st.dataframe(
-                    results_df.iloc[:,[1,2,5,6,7,10]],
-                    column_order=(
-                        #"Task ID",
-                          "Task Name",
-                                   "Day", 
-                                  # "Task Start", "Task End",
-                                   "Begin Task","End Task",
-                                  "Shift ID", 
-                                 # "Shift Start", "Shift End",
-                                    "Workers Assigned"),
-                    hide_index=True
-                )
-                st.download_button(
-                    label="Download Assignments as CSV",
-                    data=results_df.to_csv(index=False).encode("utf-8"),
-                    file_name="task_assignments.csv",
-                    mime="text/csv"
-                )
-            else:
-                st.warning("No tasks were assigned.")
-
-        # 1. Group results_df to get nurse requirements
-        nurse_requirements_df = (
-            results_df
-            .groupby(["Day", "Shift ID", "Shift Start", "Shift End"], as_index=False)
-            .agg({
-                "Number of Nurses": "max",  # Peak nurses from shift optimization
-                "Task Cost (€)": "sum"      # Total shift cost
-            })
-        )
+def display_optimization_results(run_id):
+    """
+    Render a stored optimization run. The frames come from the session
+    cache (or the database), so widget reruns never trigger a new solve.
+    """
+    profiler = Profiler(track_memory=st.session_state.get("profile_memory", False))
+    with profiler.span("load_results"):
+        cached = get_session_results(run_id)
+    if cached is None:
+        st.warning(f"Optimization run {run_id} not found.")
+        return
+    run = cached["run"]
+    results_df = cached["results_df"]
+    nurse_requirements_df = cached["nurse_requirements_df"]
+    day_summary_df = cached["day_summary_df"]
 
-        # 2. Merge the nurse_requirements_df with shifts_df to pull in the 'Weight' column
-        #    Rename 'id' to 'Shift ID' in the shifts_df slice for cleaner merge:
-        shifts_weight_df = shifts_df[['id', 'Weight']].rename(columns={'id': 'Shift ID'})
-        nurse_requirements_df = nurse_requirements_df.merge(shifts_weight_df, on="Shift ID", how="left")
+    st.caption(f"Run #{run['id']} · {run['CreatedAt']} · status {run['Status']}")
 
-        with st.expander("👩‍⚕️ View Nurse Requirements per Shift per Day", expanded=True):
-            if not nurse_requirements_df.empty:
-                # Create a combined "Shift" column for display (Start - End)
-                nurse_requirements_df["Shift"] = (
-                    nurse_requirements_df["Shift Start"] + " - " + nurse_requirements_df["Shift End"]
-                )
-                
-                # 3. Decide which columns to show in your table
-                display_df = nurse_requirements_df[[
-                    "Day", 
-                    "Shift", 
-                    "Shift ID", 
-                    "Number of Nurses",
-                    "Weight"  # <-- newly included column
-                ]]
-                
-                # Show data
-                st.dataframe(
-                    display_df,
-                    column_order=["Day", "Shift", "Shift ID", "Number of Nurses", "Weight"],
-                    hide_index=True
-                )
+    # --- Display Results ---
 
-                # Optional download button
-                st.download_button(
-                    label="Download Nurse Requirements as CSV",
-                    data=display_df.to_csv(index=False).encode("utf-8"),
-                    file_name="nurse_requirements.csv",
-                    mime="text/csv"
-                )
-            else:
-                st.warning("No nurse requirements found.")
+    # Overall Metrics
+    total_cost = run["TotalCost"]
+    total_workers = int(run["TotalWorkers"])
+    total_tasks = int(run["TotalTasks"])
 
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Cost", f"€{total_cost:,.2f}")
+    col2.metric("Total Workers Assigned", total_workers)
+    col3.metric("Total Tasks Assigned", total_tasks)
 
+    # Detailed Assignments
+    with st.expander("📋 View Detailed Task Assignments", expanded=True), profiler.span("assignments_table"):
+        if not results_df.empty:
+            st.dataframe(
+                results_df.iloc[:,[1,2,5,6,7,10]],
+                column_order=(
+                    #"Task ID",
+                      "Task Name",
+                               "Day", 
+                              # "Task Start", "Task End",
+                               "Begin Task","End Task",
+                              "Shift ID", 
+                             # "Shift Start", "Shift End",
+                                "Workers Assigned"),
+                hide_index=True
+            )
+            st.download_button(
+                label="Download Assignments as CSV",
+                data=cached["assignments_csv"],
+                file_name="task_assignments.csv",
+                mime="text/csv",
+                key="download_assignments"
+            )
+        else:
+            st.warning("No tasks were assigned.")
+
+
+    with st.expander("👩‍⚕️ View Nurse Requirements per Shift per Day", expanded=True), profiler.span("nurse_requirements_table"):
+        if not nurse_requirements_df.empty:
+            # Decide which columns to show in your table
+            display_df = nurse_requirements_df[[
+                "Day", 
+                "Shift", 
+                "Shift ID", 
+                "Number of Nurses",
+                "Weight"  # <-- newly included column
+            ]]
+            
+            # Show data
+            st.dataframe(
+                display_df,
+                column_order=["Day", "Shift", "Shift ID", "Number of Nurses", "Weight"],
+                hide_index=True
+            )
 
-        # Daily Summary
-        with st.expander("📅 Daily Summary", expanded=True):
+            # Optional download button
+            st.download_button(
+                label="Download Nurse Requirements as CSV",
+                data=cached["nurse_requirements_csv"],
+                file_name="nurse_requirements.csv",
+                mime="text/csv",
+                key="download_nurse_requirements"
+            )
+        else:
+            st.warning("No nurse requirements found.")
+
+    with st.expander("🧑‍⚕️ Nurse Rosters"), profiler.span("roster_table"):
+        roster_df = cached["roster_df"]
+        if not roster_df.empty:
+            days = [day for day in engine.DAY_NAMES if day in set(roster_df["Day"])]
+            day = st.selectbox("Day", days, key="roster_day")
+            st.caption("Each shift's tasks split over numbered nurses; a task needing several nurses "
+                       "appears once per nurse.")
+            day_roster_df = roster_df[roster_df["Day"] == day]
+            named = cached.get("named_roster")
+            if named is not None and not named.assignments_df.empty:
+                day_roster_df = label_lanes(day_roster_df, named)
             st.dataframe(
-                day_summary_df,
-                column_order=("Day", "Total Cost (€)", "Tasks Assigned", "Nurses Assigned"),
+                day_roster_df,
+                column_order=["Shift ID", "Shift", "Nurse", "Nurse Name", "Begin Task", "End Task", "Task Name"],
                 hide_index=True
             )
             st.download_button(
-                label="Download Daily Summary as CSV",
-                data=day_summary_df.to_csv(index=False).encode("utf-8"),
-                file_name="daily_summary.csv",
-                mime="text/csv"
+                label="Download Nurse Rosters as CSV",
+                data=cached["roster_csv"],
+                file_name="nurse_rosters.csv",
+                mime="text/csv",
+                key="download_rosters"
             )
-    
-        with st.expander("Graphical Summaries 📊", expanded=True):
-            if not results_df.empty:
-                col1, col2 = st.columns(2)
-                with col1:
-                    # Ensure we have data to plot
-                    if not results_df.empty:
-                        fig = px.pie(day_summary_df, names='Day', values='Total Cost (€)', title='<b>Cost Distribution by Day</b>')
-                        fig.update_layout(showlegend=False)
-                        st.plotly_chart(fig, use_container_width=True)
-                    else:
-                        st.warning("No data available for pie chart")
-
-                with col2:
-                    # Ensure we have data to plot
-                    if not nurse_requirements_df.empty:
-                        # 1. Group by Shift ID to sum the total number of nurses across all days
-                        #    and grab the first (or any consistent) shift Weight for that ID
-                        shift_sum_df = nurse_requirements_df.groupby("Shift ID", as_index=False).agg({
-                            "Number of Nurses": "sum",    # sum across all days
-                            "Weight": "first"            # or "max"/"min" if you expect it to be consistent
-                        })
-                        
-                        # 2. Calculate total cost for each shift
-                        shift_sum_df["TotalShiftCost"] = shift_sum_df["Number of Nurses"] * shift_sum_df["Weight"]
-
-                        # 3. Create a bar plot for these aggregated costs
-                        fig = px.bar(
-                            shift_sum_df,
-                            x="Shift ID",
-                            y="TotalShiftCost",
-                            title="<b>Total Cost by Shift</b>",
-                            text="TotalShiftCost"  # optional: show the value on top of each bar
-                        )
-                        fig.update_layout(showlegend=False)
-                        fig.update_traces(texttemplate="%{text:.2f}", textposition="outside")  # format the cost nicely
-                        st.plotly_chart(fig, use_container_width=True)
-                    else:
-                        st.warning("No data available for bar chart")
-            else:
-                st.warning("No results to visualize") 
+        else:
+            st.warning("No tasks were assigned.")
 
-            # Gantt chart  
-            st.subheader("Gantt Charts by Day")
+    with st.expander("🪪 Named Roster"), profiler.span("named_roster"):
+        display_named_roster(cached)
 
-            # Ensure the columns we need actually exist
-            if not {"Day", "Task Name", "Shift ID", "Begin Task", "End Task"}.issubset(results_df.columns):
-                st.warning("Required columns for Gantt chart not found in results_df.")
-            else:
-                
-                unique_days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-                for day in unique_days:
-                    day_data = results_df[results_df["Day"] == day].copy()
-                    
-                    if day_data.empty:
-                        continue  # Skip if no tasks on that day
-    
-                    day_data["Begin"] = pd.to_datetime(day_data["Begin Task"], format="%H:%M").apply(
-                        lambda t: t.replace(year=2000, month=1, day=1)
-                    )
-                    day_data["End"] = pd.to_datetime(day_data["End Task"], format="%H:%M").apply(
-                        lambda t: t.replace(year=2000, month=1, day=1)
+    # Daily Summary
+    with st.expander("📅 Daily Summary", expanded=True), profiler.span("daily_summary_table"):
+        st.dataframe(
+            day_summary_df,
+            column_order=("Day", "Total Cost (€)", "Tasks Assigned", "Nurses Assigned"),
+            hide_index=True
+        )
+        st.download_button(
+            label="Download Daily Summary as CSV",
+            data=cached["daily_summary_csv"],
+            file_name="daily_summary.csv",
+            mime="text/csv",
+            key="download_daily_summary"
+        )
+
+    # Bulk export of all tables, built only when requested
+    with st.expander("📦 Export All Results"):
+        fmt = st.radio(
+            "Format",
+            list(EXPORT_FORMATS),
+            format_func=lambda f: EXPORT_FORMATS[f]["label"],
+            horizontal=True,
+            key="export_format"
+        )
+        exports = cached.setdefault("exports", {})
+        if fmt not in exports and st.button("Prepare Export", key="prepare_export"):
+            with st.spinner("Building export..."):
+                try:
+                    exports[fmt] = export_results(cached, fmt)
+                except ImportError as e:
+                    st.error(f"Export dependency missing: {e}")
+                    st.info("Please ensure pyarrow is installed: `pip install pyarrow`")
+        if fmt in exports:
+            st.download_button(
+                label=f"Download {EXPORT_FORMATS[fmt]['label']}",
+                data=exports[fmt],
+                file_name=f"optimization_run_{cached['run_id']}.{EXPORT_FORMATS[fmt]['extension']}",
+                mime=EXPORT_FORMATS[fmt]["mime"],
+                key="download_export"
+            )
+
+    with st.expander("Graphical Summaries 📊", expanded=True), profiler.span("charts"):
+        if not results_df.empty:
+            col1, col2 = st.columns(2)
+            with col1, profiler.span("pie_chart"):
+                # Ensure we have data to plot
+                if not results_df.empty:
+                    fig = px.pie(day_summary_df, names='Day', values='Total Cost (€)', title='<b>Cost Distribution by Day</b>')
+                    fig.update_layout(showlegend=False)
+                    st.plotly_chart(fig, use_container_width=True)
+                else:
+                    st.warning("No data available for pie chart")
+
+            with col2, profiler.span("bar_chart"):
+                # Ensure we have data to plot
+                if not nurse_requirements_df.empty:
+                    # Bar plot of the total cost per shift across all days
+                    fig = px.bar(
+                        cached["shift_costs_df"],
+                        x="Shift ID",
+                        y="TotalShiftCost",
+                        title="<b>Total Cost by Shift</b>",
+                        text="TotalShiftCost"  # optional: show the value on top of each bar
                     )
-                    
+                    fig.update_layout(showlegend=False)
+                    fig.update_traces(texttemplate="%{text:.2f}", textposition="outside")  # format the cost nicely
+                    st.plotly_chart(fig, use_container_width=True)
+                else:
+                    st.warning("No data available for bar chart")
+        else:
+            st.warning("No results to visualize") 
+
+        # Gantt chart  
+        st.subheader("Gantt Charts by Day")
+
+        # Ensure the columns we need actually exist
+        if not {"Day", "Task Name", "Shift ID", "Begin Task", "End Task"}.issubset(results_df.columns):
+            st.warning("Required columns for Gantt chart not found in results_df.")
+        else:
+            
+            for day, day_data in cached["gantt_frames"].items():
+                with profiler.span(f"gantt_{day}"):
                     # Plotly Express timeline
                     fig = px.timeline(
                         day_data,
@@ -1408,27 +1279,21 @@ def optimize_tasks_with_gurobi():
                         color="Shift ID",  # Same color for the same shift
                         hover_data=["Task Name", "Shift ID"]
                     )
-                    
+
                     # Reverse the Y-axis so tasks list top-to-bottom
                     fig.update_yaxes(autorange="reversed")
-                    
+
                     # Format the X-axis ticks to show just HH:MM
                     fig.update_layout(
                         title=f"Gantt Chart for {day}",
                         xaxis=dict(tickformat='%H:%M'),
-                        height=300  
+                        height=300
                     )
 
                     st.plotly_chart(fig, use_container_width=True)
 
- 
-    else:
-        st.error(f"Optimization failed with status: {model.status}")
-        # Optional: Add infeasibility diagnostics
-        model.computeIIS()
-        for constr in model.getConstrs():
-            if constr.IISConstr:
-                st.write(f"⚠️ Infeasible constraint: {constr.constrName}")
+    display_profile_panel(cached, profiler)
+
 
 
 # ------------------------------------------------------------------
@@ -1595,7 +1460,8 @@ def display_tasks_and_shifts():
                     data=tasks_df.iloc[:, 1:7].to_csv(index=False).encode("utf-8"),
                     file_name="hospital_tasks.csv",
                     mime="text/csv",
-                    type="primary"
+                    type="primary",
+                    key="download_tasks_csv"
                 )
 
         if not shifts_df.empty:
@@ -1612,13 +1478,174 @@ def display_tasks_and_shifts():
                     data=shifts_df.iloc[:, 1:13].to_csv(index=False).encode("utf-8"),
                     file_name="hospital_shifts.csv",
                     mime="text/csv",
-                    type="primary"
+                    type="primary",
+                    key="download_shifts_csv"
                 )
 
     # Visual divider
     st.markdown("---")
     st.caption("💡 Tip: Hover over charts for detailed information. Click legend items to filter categories.")
 
+# ------------------------------------------------------------------
+#                        Rerun Diagnostics
+# ------------------------------------------------------------------
+# Session-state entries that hold app data rather than widget values
+NON_WIDGET_KEYS = {
+    "optimization_results", "logged_render_profiles", "solve_job", "optimization_notice",
+    "last_screening", "last_pruned_shifts", "infeasible_instance", "iis_constraints",
+    "cost_estimate", "shift_design", "model_size_estimate", "last_size_notes",
+}
+
+def _widget_fingerprint(value):
+    """Comparable stand-in for a widget value (uploads compare by file id)."""
+    if hasattr(value, "file_id"):
+        return value.file_id
+    if isinstance(value, list):
+        return tuple(_widget_fingerprint(v) for v in value)
+    return value
+
+def _widget_values():
+    return {
+        key: _widget_fingerprint(value)
+        for key, value in st.session_state.items()
+        if not key.startswith("_") and key not in NON_WIDGET_KEYS
+    }
+
+def remember_widget_values():
+    """Snapshot the widget values at the end of a rerun, for detect_rerun_trigger."""
+    st.session_state["_widget_snapshot"] = _widget_values()
+
+def detect_rerun_trigger():
+    """
+    Name the widget(s) whose value changed since the end of the previous
+    rerun. Widgets that were not drawn last time are not counted, and
+    neither is a button going back to False on the rerun after its click.
+    """
+    previous = st.session_state.get("_widget_snapshot")
+    if previous is None:
+        return "session start"
+    previous_trigger = st.session_state.get("_rerun_trigger_keys", [])
+
+    changed = [
+        key for key, value in _widget_values().items()
+        if key in previous and previous[key] != value
+        and not (key in previous_trigger and previous[key] is True and value is False)
+    ]
+    st.session_state["_rerun_trigger_keys"] = changed
+    if not changed:
+        return "(no keyed widget changed)"
+    return ", ".join(sorted(changed))
+
+def _percentile_table(df, by, value):
+    """p50/p90/p99, mean and count of `value` per `by` group, slowest p90 first."""
+    grouped = df.groupby(by)[value]
+    table = grouped.quantile([0.5, 0.9, 0.99]).unstack()
+    table.columns = ["p50 (ms)", "p90 (ms)", "p99 (ms)"]
+    table["Mean (ms)"] = grouped.mean()
+    table["Reruns"] = grouped.size()
+    return table.round(1).sort_values("p90 (ms)", ascending=False).reset_index()
+
+def display_rerun_diagnostics(trigger, rerun_profiler, total_ms):
+    """Rolling rerun-latency percentiles per section and per triggering widget."""
+    st.header("🩺 Rerun Diagnostics", divider="rainbow")
+    st.caption(
+        "Every interaction reruns the whole app. Each rerun is timed section by section; "
+        "the percentiles below cover the most recent reruns."
+    )
+    st.toggle("Record rerun timings", value=True, key="record_reruns")
+
+    col1, col2 = st.columns(2)
+    col1.metric("This rerun", f"{total_ms:,.0f} ms")
+    col2.metric("Triggered by", trigger)
+    with st.expander("Sections of this rerun"):
+        st.dataframe(rerun_profiler.to_frame().drop(columns="Peak Memory (MB)"),
+                     hide_index=True, use_container_width=True)
+
+    reruns_df, sections_df = get_rerun_profiles()
+    if reruns_df.empty:
+        st.info("No reruns recorded yet.")
+        return
+
+    st.subheader(f"Sections (last {len(reruns_df)} reruns)")
+    section_table = _percentile_table(sections_df, ["Section", "Depth"], "WallMs")
+    st.dataframe(section_table.drop(columns="Depth"), hide_index=True, use_container_width=True)
+
+    top_level = section_table[section_table["Depth"] == 0]
+    fig = px.bar(
+        top_level.melt(id_vars="Section", value_vars=["p50 (ms)", "p90 (ms)"],
+                       var_name="Percentile", value_name="Milliseconds"),
+        x="Milliseconds", y="Section", color="Percentile", barmode="group", orientation="h",
+        title="Top-level sections by rerun latency"
+    )
+    fig.update_layout(yaxis={"categoryorder": "total ascending"})
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.subheader("Triggers")
+    trigger_table = _percentile_table(reruns_df, "TriggerKey", "TotalMs")
+    slowest = (
+        sections_df[sections_df["Depth"] == 0]
+        .groupby(["TriggerKey", "Section"])["WallMs"].median()
+        .reset_index()
+        .sort_values("WallMs", ascending=False)
+        .drop_duplicates("TriggerKey")
+        .set_index("TriggerKey")["Section"]
+    )
+    trigger_table["Slowest Section"] = trigger_table["TriggerKey"].map(slowest)
+    st.dataframe(trigger_table.rename(columns={"TriggerKey": "Trigger"}),
+                 hide_index=True, use_container_width=True)
+
+    with st.expander("Recent reruns"):
+        st.dataframe(reruns_df.head(50).drop(columns="id"), hide_index=True, use_container_width=True)
+
+    if st.button("🧹 Clear Rerun Timings", key="clear_rerun_profiles"):
+        delete_rerun_profiles()
+        st.rerun()
+
+def display_solver_telemetry():
+    """History of solver statistics, with solve time plotted against model size."""
+    st.header("🧮 Solver Telemetry", divider="rainbow")
+    telemetry_df = get_solver_telemetry()
+    if telemetry_df.empty:
+        st.info("No solves recorded yet. Run an optimization to start collecting statistics.")
+        return
+
+    latest = telemetry_df.iloc[-1]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Solves recorded", len(telemetry_df))
+    col2.metric("Last solve time", f"{latest['SolveSeconds']:.2f} s")
+    col3.metric("Last model size", f"{int(latest['NumVars']):,} vars")
+    col4.metric("Largest instance", f"{int(telemetry_df['NumTasks'].max()):,} tasks")
+
+    # How solve time grows with size: slope of log(time) against log(vars)
+    timed = telemetry_df[(telemetry_df["SolveSeconds"] > 0) & (telemetry_df["NumVars"] > 0)]
+    if timed["NumVars"].nunique() >= 3:
+        slope, _ = np.polyfit(np.log(timed["NumVars"]), np.log(timed["SolveSeconds"]), 1)
+        st.caption(f"Solve time grows roughly like (number of variables)^{slope:.2f} over the recorded solves.")
+
+    fig = px.scatter(
+        telemetry_df, x="NumVars", y="SolveSeconds", color="Status",
+        hover_data=["SolvedAt", "NumTasks", "NumShifts", "NumConstrs", "MIPGap", "NodeCount", "Source"],
+        log_x=True, log_y=True,
+        labels={"NumVars": "Variables", "SolveSeconds": "Solve time (s)"},
+        title="Solve time against model size"
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    trend = telemetry_df.melt(
+        id_vars=["SolvedAt"], value_vars=["BuildSeconds", "SolveSeconds"],
+        var_name="Phase", value_name="Seconds"
+    )
+    fig = px.line(trend, x="SolvedAt", y="Seconds", color="Phase", markers=True,
+                  title="Build and solve time per run")
+    st.plotly_chart(fig, use_container_width=True)
+
+    with st.expander("All solves"):
+        st.dataframe(telemetry_df.iloc[::-1], hide_index=True, use_container_width=True)
+
+    if st.button("🧹 Clear Solver Telemetry", key="clear_solver_telemetry"):
+        delete_solver_telemetry()
+        st.rerun()
+
 def header():
     st.markdown("""
     <style>
@@ -1909,6 +1936,11 @@ def main():
     logo_path = os.path.join(parent_dir, "56566395.png")
  
     st.set_page_config(page_title="Hospital Scheduler", layout="wide", page_icon=logo_path)
+
+    # Time every section of this rerun; saved before the diagnostics tab is drawn
+    rerun_trigger = detect_rerun_trigger()
+    rerun_profiler = Profiler()
+    rerun_started = _time.perf_counter()
     
     # Custom CSS for better styling
     st.markdown("""
@@ -1930,76 +1962,138 @@ def main():
     </style>
     """, unsafe_allow_html=True)
 
-    init_db()
-    home_tab, manual_tab, contact_tab = st.tabs(["🏠 Home", "📖 Manual","📞 Contact"])
+    with rerun_profiler.span("init_db"):
+        init_db()
+    home_tab, manual_tab, contact_tab, diagnostics_tab = st.tabs(
+        ["🏠 Home", "📖 Manual", "📞 Contact", "🩺 Diagnostics"]
+    )
     
     with home_tab:
-        header()
+        with rerun_profiler.span("header"):
+            header()
         
         # Create two main columns
         left_col, right_col = st.columns([1.15, 2.85])
         
         with left_col:
             # Manual Input Section
-            with st.expander("➕ Add Tasks/Shifts Manually"):
+            with st.expander("➕ Add Tasks/Shifts Manually"), rerun_profiler.span("input_forms"):
                 task_input_form()
                 shift_input_form()
             
             # Bulk Upload Section
             with st.expander("📤 Bulk Upload Data", expanded=True):
-                upload_tasks_excel()
-                upload_shifts_excel()
+                with rerun_profiler.span("uploads"):
+                    upload_tasks_excel()
+                    upload_shifts_excel()
                 st.markdown("---")
                 st.write("Download templates:")
-                task_template_download()
-                shift_template_download()
+                with rerun_profiler.span("template_downloads"):
+                    with rerun_profiler.span("task_template_download"):
+                        task_template_download()
+                    with rerun_profiler.span("shift_template_download"):
+                        shift_template_download()
             
+            with st.expander("🩺 Nurse Registry"), rerun_profiler.span("nurse_registry"):
+                nurse_registry()
+
             # Data Management
             st.markdown("---")
             st.write("**Data Management**")
             col1, col2 = st.columns(2)
             with col1:
-                if st.button("🧹 Clear All Tasks", use_container_width=True):
+                if st.button("🧹 Clear All Tasks", use_container_width=True, key="clear_tasks"):
                     clear_all("TasksTable3")
                     st.success("All tasks cleared!")
             with col2:
-                if st.button("🧹 Clear All Shifts", use_container_width=True):
+                if st.button("🧹 Clear All Shifts", use_container_width=True, key="clear_shifts"):
                     clear_all("ShiftsTable6")
                     st.success("All shifts cleared!")
             
             # Example Data
-            with st.expander("🔍 Load Example Data"):
+            with st.expander("🔍 Load Example Data"), rerun_profiler.span("example_data"):
                 ex_col1, ex_col2, ex_col3 = st.columns(3)
                 with ex_col1:
-                    if st.button("🌱 Really Small Data", use_container_width=True):
+                    if st.button("🌱 Really Small Data", use_container_width=True, key="example_really_small"):
                         insert3()
                         st.success("Really small example data loaded!")
                 with ex_col2:
-                    if st.button("🌲 Small Data", use_container_width=True):
+                    if st.button("🌲 Small Data", use_container_width=True, key="example_small"):
                         insert()
                         st.success("Small example data loaded!")
                 with ex_col3:
-                    if st.button("🌳 Large Data", use_container_width=True):
+                    if st.button("🌳 Large Data", use_container_width=True, key="example_large"):
                         insert2()
                         st.success("Large example data loaded!")
 
+                # Seeded synthetic instance of any size
+                syn_col1, syn_col2, syn_col3 = st.columns(3)
+                with syn_col1:
+                    num_tasks = st.number_input("Tasks", min_value=10, max_value=100000,
+                                                value=500, step=100, key="synthetic_tasks")
+                with syn_col2:
+                    seed = st.number_input("Seed", min_value=0, value=0, step=1, key="synthetic_seed")
+                with syn_col3:
+                    st.write("")
+                    if st.button("🧪 Synthetic Data", use_container_width=True, key="example_synthetic"):
+                        tasks_df, shifts_df = generate_instance(int(num_tasks), seed=int(seed))
+                        write_instance(database.DB_FILE, tasks_df, shifts_df)
+                        st.success(f"Generated {len(tasks_df)} tasks and {len(shifts_df)} shifts!")
+
         with right_col:
             # Visualization and Optimization Tabs
             viz_tab, opt_tab = st.tabs(["📊 Visualization", "⚙️ Optimization"])
             
-            with viz_tab:
+            with viz_tab, rerun_profiler.span("display_tasks_and_shifts"):
                 display_tasks_and_shifts()
-            with opt_tab:
+            with opt_tab, rerun_profiler.span("optimization_tab"):
                 st.markdown("### Task-Shift Assignment Optimization")
                 st.info("Assign tasks to shifts considering time windows and nurse requirements")
-                if st.button("🚀 Run Task Optimization ", use_container_width=True):
-                    optimize_tasks_with_gurobi()
- 
+                with st.expander("⚙️ Solver Settings"):
+                    solver_settings()
+                    st.toggle("Track memory in the performance profile (slower)", key="profile_memory")
+                with st.expander("🧩 Shift Design"), rerun_profiler.span("shift_design"):
+                    shift_design_panel()
+                if st.toggle("⚡ Live cost estimate", key="live_estimate",
+                             help="Show an approximate cost that follows your edits, without a full solve."):
+                    with rerun_profiler.span("cost_estimate"):
+                        display_cost_estimate()
+                solving = "solve_job" in st.session_state
+                if st.button("🚀 Run Task Optimization ", use_container_width=True, key="run_optimization",
+                             disabled=solving):
+                    solving = start_optimization() is not None
+                if solving:
+                    display_solve_progress()
+                show_optimization_notice()
+
+                # Results are rendered from storage, so they survive reruns
+                runs_df = get_optimization_runs()
+                if not runs_df.empty:
+                    run_col, clear_col = st.columns([3, 1])
+                    with run_col:
+                        selected_run = st.selectbox(
+                            "Optimization run",
+                            runs_df["id"].tolist(),  # newest first -> latest is the default
+                            format_func=lambda rid: (
+                                f"Run #{rid} · "
+                                f"{runs_df.loc[runs_df['id'] == rid, 'CreatedAt'].iloc[0]} · "
+                                f"€{runs_df.loc[runs_df['id'] == rid, 'TotalCost'].iloc[0]:,.2f}"
+                            )
+                        )
+                    with clear_col:
+                        st.write("")
+                        if st.button("🧹 Clear Run History", use_container_width=True, key="clear_run_history"):
+                            delete_optimization_runs()
+                            st.session_state.pop("optimization_results", None)
+                            st.rerun()
+                    with rerun_profiler.span("display_optimization_results"):
+                        display_optimization_results(selected_run)
+
                
-    with contact_tab:
+    with contact_tab, rerun_profiler.span("contact"):
         show_contact()
 
-    with manual_tab:
+    with manual_tab, rerun_profiler.span("manual"):
         # --- Title ---
         st.header("User Manual")
 
@@ -2041,6 +2135,9 @@ def main():
         - Set a *Break Time* and *Break Duration*, if relevant.
         - Adjust the *Shift Weight* (think of this as the cost or difficulty level to cover that shift).
         - Select the days of the week on which this shift is active by toggling them on or off.
+        - Optionally, set the *Minimum Nurses* the shift has on each active day, whatever its tasks
+        need (e.g. a ward that is never left with fewer than two nurses). The optimizer never plans
+        fewer, and knowing them makes the solve faster.
         - Click **“Add Shift”** to save.
         """)
 
@@ -2049,7 +2146,8 @@ def main():
         st.write("""
         - Still in the **Home** tab, under **“Bulk Upload Data”**, you can choose to upload tasks
         or shifts in bulk from a spreadsheet or CSV.
-        - Use the provided download templates to see the required columns.
+        - Use the provided download templates to see the required columns. The shift template's
+        *MondayNeeded* to *SundayNeeded* columns hold the minimum nurses per day and may be left out.
         - Once your data file is ready, upload it via **“Upload Task Excel”** or 
         **“Upload Shifts File”**. The app automatically inserts each row into the system.
         """)
@@ -2059,10 +2157,21 @@ def main():
         - If you just want to explore or test, you can use the already made example datasets for tasks and shifts 
         by clicking **“Load Example Data”**.
         - These options quickly fill the system with sample entries so you can see how it all works.
+        - **“Synthetic Data”** generates a random but realistic week of tasks and shifts of any size.
+        The same *Seed* always produces the same data.
         """)
 
-        # 2.5 Clearing Data
-        st.markdown("**2.5 Clearing Data**")
+        st.markdown("**2.5 Nurse Registry**")
+        st.write("""
+        - Under **“Nurse Registry”** list your nurses: their name, the maximum hours they work a week,
+        the days they are available and, optionally, what they cost on particular shifts
+        (as `{"shift id": cost}`; other shifts cost the shift's weight).
+        - Click **“Save Nurses”** to store your edits, or **“Synthetic Nurses”** for a generated registry
+        that fits the current shifts.
+        """)
+
+        # 2.6 Clearing Data
+        st.markdown("**2.6 Clearing Data**")
         st.write("""
         - If you need to start fresh, simply click **“Clear All Tasks”** or **“Clear All Shifts.”**
         - This removes all existing records, allowing you to upload or enter new data from scratch.
@@ -2083,15 +2192,50 @@ def main():
         st.write("""
         After you have your tasks and shifts set up, you can let the app do the heavy lifting:
         - In the **Home** tab, find the **“Optimization”** section on the right.
-        - Click **“Run Task Optimization”** and watch the progress bar.
+        - Click **“Run Task Optimization”** and watch the best plan found so far, the best possible
+        cost (bound) and the gap between them update live.
+        - Under **“Solver Settings”** pick a *Parameter preset*: **fast-preview** for a quick good plan,
+        **balanced**, or **prove-optimal** to prove the cheapest plan. **tuned** appears once the
+        tuning command has picked the best preset for your data. You can also override the
+        *Time limit* and *Optimality gap*. *Worker capacity* set to **Overlapping task windows only**
+        staffs each shift for its busiest moment instead of for all of its tasks at once.
+        *Local search alongside the solver* helps large weeks reach good plans sooner. *Model* set to
+        **Demand buckets** only decides how many nurses work each shift, from the nurses the tasks
+        need every 15 minutes, and hands the tasks out afterwards; the default switches to it by
+        itself for weeks too large for the task model. Below the settings the app shows how large the
+        model for your data will be; a model over the *Model memory limit* switches to a cheaper
+        model, or stops with an error, as chosen under *When the model is too large*.
+        *Task placement* set to **Lowest peak** picks the task start times inside each shift that
+        need the fewest nurses at once, and *Start time steps* how finely those start times are
+        tried. Click
+        **“Stop and keep best plan”** at any time to end the solve early; the best plan found so far
+        is used for the results.
+        - Switch on **“Live cost estimate”** for an approximate cost that updates as you edit
+        tasks and shifts. It is computed in well under a second and shows how far it can be
+        from the best possible cost (*Gap*); run the optimization for the exact plan.
+        - Not sure which shifts to offer? Open **“Shift Design”** and click **“Design Shifts”**. The app
+        searches start times, lengths and break positions for shifts that cover your tasks more cheaply
+        than the current ones (priced at the current shifts' median hourly weight) and lists them with
+        the cost they save. **“Add Designed Shifts”** adds them to your shifts for the next run.
         - When it’s done, you’ll see a summary of:
         1. **Detailed Assignments** – Which tasks go into which shift/day, how many nurses are 
             assigned, and the cost of each task.
         2. **Nurse Requirements** – An overview of how many nurses are needed for each shift
             on each day.
-        3. **Daily Summary** – Total cost per day, the number of tasks covered, and how many 
+        3. **Nurse Rosters** – Which nurse does which task, per day and shift, ready to hand
+            out on the floor. It never needs more nurses than the shift is staffed with.
+            **Named Roster** then picks the registry nurses for every staffed shift at the
+            lowest cost, respecting their available days, one shift a day and their weekly
+            hours, and lists the places no nurse is left for.
+        4. **Daily Summary** – Total cost per day, the number of tasks covered, and how many 
             nurses in total are allocated.
-        4. **Visual Charts** – A pie chart for cost by day and a bar chart for cost by shift.
+        5. **Visual Charts** – A pie chart for cost by day and a bar chart for cost by shift.
+        - Every run is saved. Pick an earlier run from the **“Optimization run”** list to view it
+        again without re-solving.
+        - Use **“Export All Results”** to download every table at once, as Parquet files or as a
+        single Excel workbook.
+        - **“Performance Profile”** shows how long each step of the solve and of drawing the
+        results took. Switch on memory tracking above the run button to see peak memory as well.
         """)
 
         # --- Section 5: Tips & Troubleshooting ---
@@ -2105,6 +2249,9 @@ def main():
         wrong format, an error will appear.
         - **No Results?** – Verify you actually have tasks and shifts before running 
         the optimization.
+        - **App feels slow?** – The **Diagnostics** tab shows how long each part of the page takes
+        to redraw and which button or input triggered the slowest redraws. Its **Solver Telemetry**
+        view tracks model size and solve time of every optimization, so slowdowns on larger data show up early.
         """)
 
         # --- Section 6: Questions or Feedback ---
@@ -2119,5 +2266,17 @@ def main():
         st.markdown("---")
         st.write("**We hope this system helps you efficiently schedule nurses and deliver the best care possible!**")
 
+    total_ms = (_time.perf_counter() - rerun_started) * 1000
+    if st.session_state.get("record_reruns", True):
+        save_rerun_profile(rerun_trigger, rerun_profiler.spans, total_ms)
+
+    with diagnostics_tab:
+        reruns_tab, solver_tab = st.tabs(["⏱️ Reruns", "🧮 Solver Telemetry"])
+        with reruns_tab:
+            display_rerun_diagnostics(rerun_trigger, rerun_profiler, total_ms)
+        with solver_tab:
+            display_solver_telemetry()
+    remember_widget_values()
+
 if __name__ == "__main__":
     main()
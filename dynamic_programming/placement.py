@@ -0,0 +1,326 @@
+"""
+Exact placement of tasks inside one shift.
+
+Every task assigned to a (shift, day) still has to be given a start time
+inside its window, outside the shift's break. The shift then needs as
+many nurses as the peak of the resulting occupancy. place_tasks() finds
+the placement with the lowest peak by depth-first branch and bound over
+the discrete start slots:
+
+- time is cut into segments at every possible task start and end, so an
+  occupancy profile is one number per segment;
+- tasks are branched in order of fewest start slots first, each slot
+  tried in order of the peak it creates;
+- a node is pruned when the profile plus the compulsory parts of the
+  tasks still to place (the minutes every start slot covers) cannot
+  beat the best peak, or when the same profile was already reached at
+  the same depth (memoization);
+- the greedy placement (first slot with the lowest peak, in task order)
+  is the starting incumbent and the fallback for shifts with more than
+  max_tasks tasks or searches longer than max_nodes nodes.
+
+With a granularity of several step sizes, e.g. (60, 15, 5), the search
+runs coarse to fine: first over hourly start slots (and so an hourly
+profile), then each finer level only offers every task the starts closer
+than one coarser step to where the previous level put it, with that
+placement as the incumbent. Each level thus has a handful of slots per
+task instead of one per 5 minutes, and never ends with a higher peak than
+the level before.
+
+assign_lanes() then splits a placed shift over numbered nurses.
+"""
+import heapq
+
+import numpy as np
+import pandas as pd
+
+INTERVAL_MINUTES = 15
+DEFAULT_GRANULARITY = (INTERVAL_MINUTES,)
+MAX_EXACT_TASKS = 40
+MAX_NODES = 2000
+
+# Reference date of the "Begin Task"/"End Task" timestamps
+_DAY_START = pd.Timestamp("1900-01-01")
+
+
+def _clock(value):
+    """time object or "HH:MM:SS" string -> minutes since midnight."""
+    if isinstance(value, str):
+        hours, minutes, seconds = (int(part) for part in value.split(":"))
+        return hours * 60 + minutes + seconds // 60
+    return value.hour * 60 + value.minute
+
+
+def _task_minutes(duration):
+    """Duration cell -> minutes; plain numbers are minutes, strings are "H:MM:SS"."""
+    try:
+        return int(duration)
+    except ValueError:
+        return int(pd.to_timedelta(duration).total_seconds() // 60)
+
+
+def shift_periods(shift_row):
+    """Break-free (start, end) minute periods of a shift."""
+    shift_start, shift_end = _clock(shift_row["StartTime"]), _clock(shift_row["EndTime"])
+    break_start = _clock(shift_row["BreakTime"])
+    break_end = break_start + _task_minutes(shift_row["BreakDuration"])
+    periods = []
+    if shift_start < break_start:
+        periods.append((shift_start, min(break_start, shift_end)))
+    if break_end < shift_end:
+        periods.append((max(break_end, shift_start), shift_end))
+    return periods
+
+
+def start_slots(task_start, task_end, duration, periods, interval_minutes=INTERVAL_MINUTES):
+    """Start minutes of a task inside one period, every interval_minutes from its earliest start."""
+    starts = []
+    for period_start, period_end in periods:
+        first, last = max(task_start, period_start), min(task_end, period_end) - duration
+        starts.extend(range(first, last + 1, interval_minutes))
+    return starts
+
+
+def check_granularity(granularity):
+    """
+    Normalize a granularity (minutes, or coarse-to-fine step sizes) to a
+    tuple. Every step must divide the one before it, so finer start grids
+    contain the coarser ones. Raises ValueError otherwise.
+    """
+    if isinstance(granularity, int):
+        granularity = (granularity,)
+    granularity = tuple(int(minutes) for minutes in granularity)
+    if not granularity or min(granularity) < 1:
+        raise ValueError(f"Granularity needs positive step sizes, got {granularity}")
+    for coarse, fine in zip(granularity, granularity[1:]):
+        if fine >= coarse or coarse % fine:
+            raise ValueError(f"Granularity steps must shrink and divide each other, got {granularity}")
+    return granularity
+
+
+class ShiftPlacement:
+    """The start slots (minutes) of a shift's tasks on a common segment grid."""
+
+    def __init__(self, starts, durations, nurses):
+        self.nurses = np.asarray(nurses, dtype=np.int64)
+        self.durations = list(durations)
+        self.starts = [list(task_starts) for task_starts in starts]
+        bounds = sorted({m for starts, d in zip(self.starts, self.durations) for s in starts for m in (s, s + d)})
+        self.bounds = np.array(bounds, dtype=np.int64)
+        position = {m: k for k, m in enumerate(bounds)}
+        # Slot -> [first segment, last segment + 1)
+        self.ranges = [
+            [(position[s], position[s + d]) for s in starts]
+            for starts, d in zip(self.starts, self.durations)
+        ]
+        self.num_segments = max(len(bounds) - 1, 0)
+        # Slot x segment masks, so the load under every slot is one numpy call
+        self.covers = []
+        for ranges in self.ranges:
+            cover = np.zeros((len(ranges), self.num_segments), dtype=bool)
+            for slot, (lo, hi) in enumerate(ranges):
+                cover[slot, lo:hi] = True
+            self.covers.append(cover)
+
+    @classmethod
+    def on_grid(cls, windows, durations, nurses, periods, interval_minutes=INTERVAL_MINUTES, near=None):
+        """
+        Start slots every interval_minutes inside each task window. With
+        near=(radius, {task: start}), only the starts closer than radius to
+        the given start are kept (tasks missing from it get none).
+        """
+        starts = [
+            start_slots(start, end, duration, periods, interval_minutes)
+            for (start, end), duration in zip(windows, durations)
+        ]
+        if near is not None:
+            radius, previous = near
+            starts = [
+                [s for s in task_starts if i in previous and abs(s - previous[i]) < radius]
+                for i, task_starts in enumerate(starts)
+            ]
+        return cls(starts, durations, nurses)
+
+    @property
+    def placeable(self):
+        """Tasks with at least one start slot (the others cannot be placed)."""
+        return [i for i, ranges in enumerate(self.ranges) if ranges]
+
+    def compulsory(self, i):
+        """Segments task i covers whichever slot it takes, as a range (may be empty)."""
+        ranges = self.ranges[i]
+        return max(lo for lo, _ in ranges), min(hi for _, hi in ranges)
+
+    def slot_loads(self, i, profile):
+        """Highest load of profile under each slot of task i."""
+        return np.where(self.covers[i], profile, 0).max(axis=1)
+
+    def greedy(self, order=None):
+        """Each task in order to its first slot with the lowest peak. Returns (peak, {task: slot})."""
+        profile = np.zeros(self.num_segments, dtype=np.int64)
+        chosen = {}
+        peak = 0
+        for i in (order if order is not None else self.placeable):
+            slot_peaks = np.maximum(self.slot_loads(i, profile) + self.nurses[i], peak)
+            slot = int(np.argmin(slot_peaks))
+            lo, hi = self.ranges[i][slot]
+            profile[lo:hi] += self.nurses[i]
+            peak = int(slot_peaks[slot])
+            chosen[i] = slot
+        return peak, chosen
+
+    def peak(self, chosen):
+        """Peak of the placement {task: slot}."""
+        profile = np.zeros(self.num_segments, dtype=np.int64)
+        for i, slot in chosen.items():
+            lo, hi = self.ranges[i][slot]
+            profile[lo:hi] += self.nurses[i]
+        return int(profile.max(initial=0))
+
+    def slots_at(self, start_minutes):
+        """{task: start minute} -> {task: slot}, for starts on this grid."""
+        return {i: self.starts[i].index(minute) for i, minute in start_minutes.items()}
+
+    def lower_bound(self):
+        """Peak of the compulsory parts of all tasks."""
+        profile = np.zeros(self.num_segments, dtype=np.int64)
+        for i in self.placeable:
+            lo, hi = self.compulsory(i)
+            profile[lo:hi] += self.nurses[i]
+        return int(profile.max(initial=0))
+
+    def exact(self, max_nodes=MAX_NODES, incumbent=None):
+        """
+        Branch and bound for the lowest peak. Returns (peak, {task: slot},
+        proven), where proven is False if max_nodes ran out first (the
+        result is then the best placement found, never worse than greedy
+        or the incumbent placement {task: slot}, if given).
+        """
+        tasks = self.placeable
+        best_peak, best_chosen = self.greedy(tasks)
+        if incumbent is not None and self.peak(incumbent) < best_peak:
+            best_peak, best_chosen = self.peak(incumbent), dict(incumbent)
+        lower = self.lower_bound()
+        if best_peak <= lower:
+            return best_peak, best_chosen, True
+
+        order = sorted(tasks, key=lambda i: (len(self.ranges[i]), -self.nurses[i] * self.durations[i]))
+        # rest[d]: compulsory profile of the tasks order[d:]
+        rest = np.zeros((len(order) + 1, self.num_segments), dtype=np.int64)
+        for d in range(len(order) - 1, -1, -1):
+            rest[d] = rest[d + 1]
+            lo, hi = self.compulsory(order[d])
+            rest[d, lo:hi] += self.nurses[order[d]]
+
+        profile = np.zeros(self.num_segments, dtype=np.int64)
+        chosen = {}
+        seen = set()
+        state = {"peak": best_peak, "chosen": best_chosen, "nodes": 0, "done": False}
+
+        def search(d, peak):
+            if state["done"]:
+                return
+            if d == len(order):
+                state["peak"], state["chosen"] = peak, dict(chosen)
+                state["done"] = peak <= lower
+                return
+            if int((profile + rest[d]).max()) >= state["peak"]:
+                return
+            key = (d, profile.tobytes())
+            if key in seen:
+                return
+            seen.add(key)
+            state["nodes"] += 1
+            if state["nodes"] > max_nodes:
+                state["done"] = True
+                return
+
+            i = order[d]
+            n = self.nurses[i]
+            loads = self.slot_loads(i, profile)
+            for slot in np.argsort(loads, kind="stable").tolist():
+                slot_peak = max(peak, int(loads[slot]) + n)
+                if slot_peak >= state["peak"]:
+                    break  # the remaining slots are no better
+                lo, hi = self.ranges[i][slot]
+                profile[lo:hi] += n
+                chosen[i] = slot
+                search(d + 1, slot_peak)
+                profile[lo:hi] -= n
+                del chosen[i]
+
+        search(0, 0)
+        proven = state["nodes"] <= max_nodes
+        return state["peak"], state["chosen"], proven
+
+
+def place_tasks(task_rows, shift_row, weight, granularity=DEFAULT_GRANULARITY,
+                max_tasks=MAX_EXACT_TASKS, max_nodes=MAX_NODES):
+    """
+    Drop-in for engine.calculate_cost_for_intervals with the exact
+    placement: returns (assignments, total cost, peak nurses). Shifts with
+    more than max_tasks tasks are placed greedily. granularity is the
+    start step in minutes, or coarse-to-fine steps such as (60, 15, 5).
+    """
+    periods = shift_periods(shift_row)
+    windows = [(_clock(row["StartTime"]), _clock(row["EndTime"])) for row in task_rows]
+    durations = [_task_minutes(row["Duration"]) for row in task_rows]
+    nurses = [int(row["NursesRequired"]) for row in task_rows]
+
+    near = None
+    for interval_minutes in check_granularity(granularity):
+        shift = ShiftPlacement.on_grid(windows, durations, nurses, periods, interval_minutes, near)
+        incumbent = shift.slots_at(near[1]) if near is not None else None
+        if len(shift.placeable) > max_tasks:
+            peak, chosen = shift.greedy()
+            if incumbent is not None and shift.peak(incumbent) <= peak:
+                peak, chosen = shift.peak(incumbent), incumbent
+        else:
+            peak, chosen, _ = shift.exact(max_nodes, incumbent)
+        near = (interval_minutes, {i: shift.starts[i][slot] for i, slot in chosen.items()})
+
+    assignments = []
+    for i in sorted(chosen):
+        row = task_rows[i]
+        begin = _DAY_START + pd.Timedelta(minutes=shift.starts[i][chosen[i]])
+        assignments.append({
+            "Task ID": row["id"],
+            "Task Name": row["TaskName"],
+            "Day": row["Day"],
+            "Task Start": row["StartTime"],
+            "Task End": row["EndTime"],
+            "Begin Task": begin,
+            "End Task": begin + pd.Timedelta(minutes=durations[i]),
+            "Workers Assigned": row["NursesRequired"],
+        })
+    return assignments, peak * weight, peak
+
+
+def assign_lanes(intervals):
+    """
+    Interval partitioning of placed tasks [(begin, end, nurses)] over
+    numbered nurse lanes 1, 2, ... by one sweep over the begins: a task
+    takes the lowest free lanes (one per nurse it needs), and a lane is
+    free again from the end of its task. Returns the lanes of every task,
+    in input order. The number of lanes used equals the peak occupancy,
+    so the roster needs no nurse beyond those already paid for.
+    O(m log m) for m task-nurse pairs.
+    """
+    order = sorted(range(len(intervals)), key=lambda i: intervals[i][:2])
+    busy = []  # (free from, lane)
+    free = []  # released lanes, lowest first
+    lanes = [[] for _ in intervals]
+    opened = 0
+    for i in order:
+        begin, end, nurses = intervals[i]
+        while busy and busy[0][0] <= begin:
+            heapq.heappush(free, heapq.heappop(busy)[1])
+        for _ in range(int(nurses)):
+            if free:
+                lane = heapq.heappop(free)
+            else:
+                opened += 1
+                lane = opened
+            lanes[i].append(lane)
+            heapq.heappush(busy, (end, lane))
+    return lanes
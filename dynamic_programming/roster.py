@@ -0,0 +1,531 @@
+"""
+Named nurse rosters.
+
+The optimizer decides how many nurses every (shift, day) needs; this
+module decides which nurses of the registry (NursesTable) work them. The
+assignment is a min-cost flow, solved exactly in polynomial time without
+Gurobi:
+
+    source -> nurse               capacity: shifts the nurse may work this week
+    nurse -> (nurse, day)         capacity 1: one shift a day, on available days only
+    (nurse, day) -> (shift, day)  cost: the nurse's cost for that shift
+    (shift, day) -> sink          capacity: nurses the (shift, day) needs
+
+A maximum flow of minimum cost staffs as many of the needed places as the
+registry allows, as cheaply as possible. Weekly hours are no per-unit
+capacity (shifts differ in length), so every nurse may first work as many
+shifts as their shortest shift fits into MaxWeeklyHours. Nurses who end up
+above their hours give up the shortest shift that brings them back within
+them (their longest if none does), and the freed places are refilled by
+further flows in which every nurse takes at most one more shift that fits
+the hours they have left.
+
+    roster = build_roster(nurses_df, shifts_df, staffing_from_requirements(nurse_requirements_df))
+"""
+import argparse
+import heapq
+import json
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from engine import DAY_NAMES, OptimizationInputError, load_tables
+
+NURSES_TABLE = "NursesTable"
+
+ASSIGNMENT_COLUMNS = ["Day", "Shift ID", "Shift", "Nurse ID", "Nurse", "Hours", "Cost (€)"]
+UNSTAFFED_COLUMNS = ["Day", "Shift ID", "Shift", "Needed", "Staffed", "Missing"]
+NURSE_SUMMARY_COLUMNS = ["Nurse ID", "Nurse", "Shifts", "Hours", "Max Hours", "Cost (€)"]
+
+# Cap on the flows per roster (the first one, then rounds refilling places)
+MAX_ROUNDS = 50
+
+
+class MinCostFlow:
+    """
+    Min-cost maximum flow with integer capacities and non-negative integer
+    costs (primal-dual): Dijkstra with node potentials finds the cheapest
+    augmenting path length, then a blocking flow (as in Dinic) pushes
+    everything along paths of that length before the next Dijkstra. The
+    number of Dijkstra runs is bounded by the number of distinct path
+    costs, which is small when costs come from a few pay rates.
+    """
+
+    def __init__(self, num_nodes):
+        self.num_nodes = num_nodes
+        self.head = [[] for _ in range(num_nodes)]  # node -> edge indices
+        self.to = []
+        self.cap = []
+        self.cost = []
+
+    def add_edge(self, u, v, capacity, cost=0):
+        """Add u -> v and its residual twin; returns the edge index (flow = self.flow(index))."""
+        index = len(self.to)
+        self.head[u].append(index)
+        self.to.append(v)
+        self.cap.append(capacity)
+        self.cost.append(cost)
+        self.head[v].append(index + 1)
+        self.to.append(u)
+        self.cap.append(0)
+        self.cost.append(-cost)
+        return index
+
+    def flow(self, index):
+        return self.cap[index ^ 1]
+
+    def _dijkstra(self, source, sink, potential):
+        """Reduced distances, stopping at the sink: nodes further away get the sink's distance."""
+        dist = [None] * self.num_nodes
+        dist[source] = 0
+        done = [False] * self.num_nodes
+        heap = [(0, source)]
+        to, cap, cost, head = self.to, self.cap, self.cost, self.head
+        while heap:
+            d, u = heapq.heappop(heap)
+            if done[u]:
+                continue
+            done[u] = True
+            if u == sink:
+                break
+            pu = potential[u]
+            for e in head[u]:
+                if cap[e] > 0:
+                    v = to[e]
+                    nd = d + cost[e] + pu - potential[v]
+                    if dist[v] is None or nd < dist[v]:
+                        dist[v] = nd
+                        heapq.heappush(heap, (nd, v))
+        if dist[sink] is None:
+            return None
+        limit = dist[sink]
+        return [dist[v] if done[v] else limit for v in range(self.num_nodes)]
+
+    def _blocking_flow(self, source, sink, potential):
+        """Saturate the admissible (zero reduced cost) subgraph; returns the flow pushed."""
+        to, cap, cost, head = self.to, self.cap, self.cost, self.head
+        # Admissible edges, listed when the search first reaches a node; reverse edges of pushed flow join them
+        tight = [None] * self.num_nodes
+
+        def admissible(u):
+            if tight[u] is None:
+                pu = potential[u]
+                tight[u] = [e for e in head[u] if cap[e] > 0 and cost[e] + pu == potential[to[e]]]
+            return tight[u]
+
+        pushed = 0
+        while True:
+            level = [-1] * self.num_nodes
+            level[source] = 0
+            queue = deque([source])
+            while queue:
+                u = queue.popleft()
+                for e in admissible(u):
+                    v = to[e]
+                    if cap[e] > 0 and level[v] < 0:
+                        level[v] = level[u] + 1
+                        queue.append(v)
+            if level[sink] < 0:
+                return pushed
+
+            arc = [0] * self.num_nodes
+            while True:
+                # Iterative DFS for one augmenting path along the level graph
+                path = []
+                u = source
+                while u != sink:
+                    edges = tight[u]
+                    while arc[u] < len(edges):
+                        e = edges[arc[u]]
+                        if cap[e] > 0 and level[to[e]] == level[u] + 1:
+                            break
+                        arc[u] += 1
+                    if arc[u] == len(edges):
+                        if not path:
+                            break
+                        level[u] = -1  # dead end
+                        e = path.pop()
+                        u = to[e ^ 1]
+                        arc[u] += 1
+                        continue
+                    path.append(edges[arc[u]])
+                    u = to[edges[arc[u]]]
+                if u != sink:
+                    break
+                amount = min(cap[e] for e in path)
+                for e in path:
+                    cap[e] -= amount
+                    if cap[e ^ 1] == 0 and tight[to[e]] is not None:
+                        tight[to[e]].append(e ^ 1)
+                    cap[e ^ 1] += amount
+                pushed += amount
+
+    def solve(self, source, sink):
+        """Push a maximum flow of minimum cost; returns (flow, cost)."""
+        potential = [0] * self.num_nodes
+        total = 0
+        while True:
+            dist = self._dijkstra(source, sink, potential)
+            if dist is None:
+                break
+            potential = [p + d for p, d in zip(potential, dist)]
+            total += self._blocking_flow(source, sink, potential)
+        cost = sum(self.cost[e] * self.flow(e) for e in range(0, len(self.to), 2))
+        return total, cost
+
+
+@dataclass
+class RosterResult:
+    """Named assignment of nurses to (shift, day) places."""
+    assignments_df: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=ASSIGNMENT_COLUMNS))
+    unstaffed_df: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=UNSTAFFED_COLUMNS))
+    nurse_summary_df: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=NURSE_SUMMARY_COLUMNS))
+    rounds: int = 0
+    seconds: float = 0.0
+
+    @property
+    def total_cost(self):
+        return float(self.assignments_df["Cost (€)"].sum()) if not self.assignments_df.empty else 0.0
+
+    @property
+    def missing(self):
+        return int(self.unstaffed_df["Missing"].sum()) if not self.unstaffed_df.empty else 0
+
+    def summary(self):
+        return {
+            "assigned": len(self.assignments_df),
+            "missing": self.missing,
+            "total_cost": self.total_cost,
+            "rounds": self.rounds,
+            "seconds": self.seconds,
+        }
+
+
+def staffing_from_requirements(nurse_requirements_df):
+    """{(shift_id, day): nurses} from a run's nurse requirements frame."""
+    return {
+        (int(shift_id), day): int(nurses)
+        for shift_id, day, nurses in zip(
+            nurse_requirements_df["Shift ID"], nurse_requirements_df["Day"],
+            nurse_requirements_df["Number of Nurses"],
+        )
+        if nurses > 0
+    }
+
+
+def shift_costs(value, nurse="", shift_ids=None):
+    """
+    ShiftCosts cell (JSON object, shift id -> cost) -> {shift_id: cost}.
+    Raises OptimizationInputError naming the nurse unless the cell is
+    empty or an object of non-negative costs; with shift_ids, every key
+    must also be one of them.
+    """
+    if value is None or (isinstance(value, float) and pd.isna(value)) or not str(value).strip():
+        return {}
+    try:
+        parsed = json.loads(value)
+    except (TypeError, ValueError):
+        parsed = None
+    if not isinstance(parsed, dict):
+        raise OptimizationInputError(f"Nurse {nurse!r}: ShiftCosts must be a JSON object such as {{\"3\": 9.5}}.")
+    costs = {}
+    for shift_id, cost in parsed.items():
+        try:
+            shift_id = int(shift_id)
+        except ValueError:
+            raise OptimizationInputError(f"Nurse {nurse!r}: ShiftCosts key {shift_id!r} is not a shift id.") from None
+        if shift_ids is not None and shift_id not in shift_ids:
+            raise OptimizationInputError(f"Nurse {nurse!r}: ShiftCosts names shift {shift_id}, which does not exist.")
+        if isinstance(cost, bool) or not isinstance(cost, (int, float)) or not 0 <= cost < float("inf"):
+            raise OptimizationInputError(f"Nurse {nurse!r}: the cost of shift {shift_id} must be a number of 0 or more.")
+        costs[shift_id] = float(cost)
+    return costs
+
+
+def _shift_hours(shifts_df):
+    """Shift id -> hours from start to end (overnight shifts wrap)."""
+    start = pd.to_timedelta(shifts_df["StartTime"].astype(str))
+    end = pd.to_timedelta(shifts_df["EndTime"].astype(str))
+    hours = ((end - start).dt.total_seconds() / 3600) % 24
+    return dict(zip(shifts_df["id"].astype(int), hours))
+
+
+def build_roster(nurses_df, shifts_df, staffing, max_rounds=MAX_ROUNDS):
+    """
+    Assign registry nurses to the places of staffing ({(shift_id, day):
+    nurses}, e.g. from staffing_from_requirements) by a min-cost flow.
+    nurses_df has the NursesTable columns, shifts_df the ShiftsTable6
+    ones. Places no available nurse can take are reported in
+    unstaffed_df rather than raising; a malformed ShiftCosts cell raises
+    OptimizationInputError.
+    """
+    started = time.perf_counter()
+    hours = _shift_hours(shifts_df)
+    default_cost = dict(zip(shifts_df["id"].astype(int), shifts_df["Weight"].astype(float)))
+    shift_label = {
+        int(row["id"]): f"{str(row['StartTime'])[:5]} - {str(row['EndTime'])[:5]}"
+        for _, row in shifts_df.iterrows()
+    }
+    places = {key: n for key, n in staffing.items() if n > 0 and key[0] in hours}
+
+    nurses = []
+    for _, row in nurses_df.iterrows():
+        costs = {**default_cost, **shift_costs(row.get("ShiftCosts"), row["Name"])}
+        nurses.append({
+            "id": int(row["id"]),
+            "name": row["Name"],
+            "max_hours": float(row["MaxWeeklyHours"]),
+            "days": [day for day in DAY_NAMES if int(row[day])],
+            "costs": costs,
+        })
+
+    # Places per day, and the shortest shift each nurse could work at all
+    by_day = {day: [key for key in places if key[1] == day] for day in DAY_NAMES}
+    caps = []
+    for nurse in nurses:
+        options = [hours[s] for day in nurse["days"] for s, _ in by_day[day]]
+        shortest = min(options, default=0)
+        caps.append(min(len(nurse["days"]), int(nurse["max_hours"] // shortest)) if shortest > 0 else 0)
+
+    chosen = _solve_flow(nurses, caps, places, by_day, hours)
+    rounds = 1
+    worked = [0.0] * len(nurses)
+    for n, (shift_id, _) in chosen:
+        worked[n] += hours[shift_id]
+    # Nurses above their hours give up the shortest shift that brings them
+    # within them (their longest if none does); the refill rounds below
+    # offer the freed places again, and what stays open is unstaffed_df
+    shifts_of = {}
+    for n, key in chosen:
+        shifts_of.setdefault(n, []).append(key)
+    for n, keys in shifts_of.items():
+        while worked[n] > nurses[n]["max_hours"] + 1e-9:
+            excess = worked[n] - nurses[n]["max_hours"] - 1e-9
+            enough = [key for key in keys if hours[key[0]] >= excess]
+            if enough:
+                key = min(enough, key=lambda key: hours[key[0]])
+            else:
+                key = max(keys, key=lambda key: hours[key[0]])
+            keys.remove(key)
+            worked[n] -= hours[key[0]]
+            chosen.remove((n, key))
+
+    # Refill freed places from the hours nurses have left, one shift per nurse and round
+    while rounds < max_rounds:
+        staffed = {}
+        working = {}
+        for n, key in chosen:
+            staffed[key] = staffed.get(key, 0) + 1
+            working.setdefault(n, set()).add(key[1])
+        open_places = {key: needed - staffed.get(key, 0) for key, needed in places.items()
+                       if staffed.get(key, 0) < needed}
+        if not open_places:
+            break
+        spare = []
+        for n, nurse in enumerate(nurses):
+            left = nurse["max_hours"] - worked[n]
+            spare.append({
+                "days": [day for day in nurse["days"] if day not in working.get(n, ())],
+                "max_hours": left,
+                "costs": {s: cost for s, cost in nurse["costs"].items() if hours.get(s, left + 1) <= left + 1e-9},
+            })
+        open_by_day = {day: [key for key in open_places if key[1] == day] for day in DAY_NAMES}
+        refill = _solve_flow(spare, [1] * len(nurses), open_places, open_by_day, hours)
+        rounds += 1
+        if not refill:
+            break
+        for n, (shift_id, day) in refill:
+            worked[n] += hours[shift_id]
+        chosen.extend(refill)
+
+    count = [0] * len(nurses)
+    paid = [0.0] * len(nurses)
+    for n, (shift_id, _) in chosen:
+        count[n] += 1
+        paid[n] += nurses[n]["costs"][shift_id]
+
+    assignments = [
+        {
+            "Day": day,
+            "Shift ID": shift_id,
+            "Shift": shift_label[shift_id],
+            "Nurse ID": nurses[n]["id"],
+            "Nurse": nurses[n]["name"],
+            "Hours": round(hours[shift_id], 2),
+            "Cost (€)": round(nurses[n]["costs"][shift_id], 2),
+        }
+        for n, (shift_id, day) in chosen
+    ]
+    assignments_df = pd.DataFrame(assignments, columns=ASSIGNMENT_COLUMNS)
+    if not assignments_df.empty:
+        assignments_df["Day"] = pd.Categorical(assignments_df["Day"], categories=DAY_NAMES, ordered=True)
+        assignments_df = assignments_df.sort_values(["Day", "Shift ID", "Nurse"], ignore_index=True)
+        assignments_df["Day"] = assignments_df["Day"].astype(str)
+
+    staffed = assignments_df.groupby(["Shift ID", "Day"]).size().to_dict() if not assignments_df.empty else {}
+    unstaffed_df = pd.DataFrame([
+        {
+            "Day": day,
+            "Shift ID": shift_id,
+            "Shift": shift_label[shift_id],
+            "Needed": needed,
+            "Staffed": staffed.get((shift_id, day), 0),
+            "Missing": needed - staffed.get((shift_id, day), 0),
+        }
+        for (shift_id, day), needed in places.items()
+        if staffed.get((shift_id, day), 0) < needed
+    ], columns=UNSTAFFED_COLUMNS)
+
+    nurse_summary_df = pd.DataFrame([
+        {
+            "Nurse ID": nurse["id"],
+            "Nurse": nurse["name"],
+            "Shifts": count[n],
+            "Hours": round(worked[n], 2),
+            "Max Hours": nurse["max_hours"],
+            "Cost (€)": round(paid[n], 2),
+        }
+        for n, nurse in enumerate(nurses)
+    ], columns=NURSE_SUMMARY_COLUMNS)
+
+    return RosterResult(
+        assignments_df=assignments_df,
+        unstaffed_df=unstaffed_df,
+        nurse_summary_df=nurse_summary_df,
+        rounds=rounds,
+        seconds=time.perf_counter() - started,
+    )
+
+
+def _solve_flow(nurses, caps, places, by_day, hours):
+    """
+    One min-cost flow; returns [(nurse index, (shift_id, day))]. Nurses
+    with the same days, hours, costs and shift cap are interchangeable and
+    share one node (capacities times the class size); each class's shifts
+    are then dealt out day by day to its least-loaded members, which keeps
+    every member within the cap.
+    """
+    classes = {}
+    for n, nurse in enumerate(nurses):
+        if caps[n] > 0 and nurse["days"]:
+            key = (tuple(nurse["days"]), nurse["max_hours"], caps[n], tuple(sorted(nurse["costs"].items())))
+            classes.setdefault(key, []).append(n)
+    class_list = list(classes.values())
+
+    place_list = list(places)
+    place_node = {key: 2 + len(class_list) + p for p, key in enumerate(place_list)}
+    next_node = 2 + len(class_list) + len(place_list)
+    source, sink = 0, 1
+    flow = MinCostFlow(next_node + len(class_list) * len(DAY_NAMES))
+
+    for key, node in place_node.items():
+        flow.add_edge(node, sink, places[key])
+    edges = []  # (edge index, class index, place)
+    for c, members in enumerate(class_list):
+        nurse = nurses[members[0]]
+        size = len(members)
+        flow.add_edge(source, 2 + c, caps[members[0]] * size)
+        for day in nurse["days"]:
+            if not by_day[day]:
+                continue
+            day_node = next_node
+            next_node += 1
+            flow.add_edge(2 + c, day_node, size)
+            for key in by_day[day]:
+                if key[0] in nurse["costs"]:
+                    cents = int(round(nurse["costs"][key[0]] * 100))
+                    edges.append((flow.add_edge(day_node, place_node[key], min(size, places[key]), cents), c, key))
+    flow.solve(source, sink)
+
+    taken = {}  # (class, day) -> shift ids, one per nurse
+    for index, c, (shift_id, day) in edges:
+        taken.setdefault((c, day), []).extend([shift_id] * flow.flow(index))
+    chosen = []
+    for c, members in enumerate(class_list):
+        load = {n: (0, 0.0) for n in members}
+        for day in DAY_NAMES:
+            shift_ids = sorted(taken.get((c, day), []), key=lambda s: -hours[s])
+            # Longest shifts to the members with the fewest shifts, then hours
+            for n, shift_id in zip(sorted(members, key=load.get), shift_ids):
+                count, worked = load[n]
+                load[n] = (count + 1, worked + hours[shift_id])
+                chosen.append((n, (shift_id, day)))
+    return chosen
+
+
+def label_lanes(lanes_df, roster):
+    """
+    Add a "Nurse Name" column to an engine.nurse_roster() table: lane k of
+    a (day, shift) goes to the k-th nurse (by name) the roster put there.
+    """
+    names = {}
+    for (day, shift_id), group in roster.assignments_df.groupby(["Day", "Shift ID"]):
+        for lane, name in enumerate(sorted(group["Nurse"]), start=1):
+            names[(day, shift_id, lane)] = name
+    labelled = lanes_df.copy()
+    labelled["Nurse Name"] = [
+        names.get((day, int(shift_id), int(lane)), "")
+        for day, shift_id, lane in zip(lanes_df["Day"], lanes_df["Shift ID"], lanes_df["Nurse"])
+    ]
+    return labelled
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m roster",
+        description="Assign the registry's nurses to the shifts of a stored optimization run."
+    )
+    parser.add_argument("--db", default="tasksv2.db", help="Database with the nurse registry and the runs")
+    parser.add_argument("--run", type=int, help="Run id to roster (default: the latest run)")
+    parser.add_argument("--output", help="Write the roster to this CSV file")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    import database
+    database.DB_FILE = args.db
+    database.init_db()
+    runs_df = database.get_optimization_runs()
+    if runs_df.empty:
+        print(f"error: no optimization runs in {args.db}; run python -m engine --save first", file=sys.stderr)
+        return 2
+    run_id = args.run if args.run is not None else int(runs_df["id"].iloc[0])
+    stored = database.load_optimization_run(run_id)
+    if stored is None:
+        print(f"error: run {run_id} not found", file=sys.stderr)
+        return 2
+    nurses_df = database.get_all(NURSES_TABLE)
+    if nurses_df.empty:
+        print(f"error: the nurse registry in {args.db} is empty", file=sys.stderr)
+        return 2
+
+    _, shifts_df = load_tables(args.db)
+    try:
+        roster = build_roster(nurses_df, shifts_df, staffing_from_requirements(stored[2]))
+    except OptimizationInputError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    summary = {"run_id": run_id, **roster.summary()}
+    if args.output:
+        roster.assignments_df.to_csv(args.output, index=False)
+        summary["output"] = args.output
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"Run:           #{run_id}")
+        print(f"Assigned:      {summary['assigned']} shift-days to {len(nurses_df)} nurses")
+        print(f"Unstaffed:     {summary['missing']}")
+        print(f"Roster cost:   €{summary['total_cost']:,.2f}")
+        print(f"Solved in:     {roster.seconds:.3f}s ({roster.rounds} rounds)")
+        for _, row in roster.unstaffed_df.iterrows():
+            print(f"Missing:       {row['Missing']} on {row['Day']} shift {row['Shift ID']} ({row['Shift']})")
+        if args.output:
+            print(f"Wrote {args.output}")
+    return 0 if roster.missing == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
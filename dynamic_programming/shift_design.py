@@ -0,0 +1,362 @@
+"""
+Automatic shift design by column generation.
+
+Instead of choosing only among the shifts in ShiftsTable6, new shifts are
+priced out of the task demand. The restricted master is the LP
+relaxation of the covering model (build_model) over the current shifts;
+its coverage duals value every task. A candidate shift (day, start,
+length, break position) lowers the LP cost when its weight is below the
+most its capacity rows can be worth: under "peak" capacity that is a
+maximum-weight set of tasks whose windows never overlap outside the
+break (task value: dual / nurses), found by weighted interval
+scheduling; under "sum" capacity the single most valuable task. The
+most negative candidates of every day join the master until none are
+left:
+
+    design = design_shifts(tasks_df, shifts_df, capacity="peak")
+    design.shifts_df  # new ShiftsTable6 rows, e.g. for database.add_shift_to_db
+
+The weight of a designed shift is its length times an hourly rate, by
+default the median rate of the existing shifts.
+"""
+import argparse
+import bisect
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from gurobipy import Column, GRB, quicksum
+
+from engine import (
+    CAPACITY_MODES, DAY_NAMES, DEFAULT_CAPACITY, OptimizationInputError, _duration_minutes, _minutes,
+    build_model, create_env, fits_outside_break, format_clock, format_duration, load_tables,
+    peak_load_points, prepare_tables,
+)
+
+# Candidate shifts: start every STEP minutes, these lengths (hours), a
+# BREAK_MINUTES break starting this far from the middle of the shift
+DEFAULT_STEP = 30
+DEFAULT_LENGTHS = (4, 6, 8, 10, 12)
+DEFAULT_BREAK_OFFSETS = (-60, -30, 0, 30, 60)
+BREAK_MINUTES = 30
+# Hourly rate when there are no shifts to take it from
+DEFAULT_HOURLY_RATE = 1.0
+# New shifts per day and iteration, and the iteration cap
+COLUMNS_PER_DAY = 3
+MAX_ITERATIONS = 30
+# Reduced costs above -EPSILON * weight do not count as improving
+EPSILON = 1e-6
+
+SHIFT_COLUMNS = ["StartTime", "EndTime", "BreakTime", "BreakDuration", "Weight"] + DAY_NAMES
+
+
+@dataclass
+class ShiftDesign:
+    """Shifts found by design_shifts, and how the LP cost fell with them."""
+    shifts_df: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=SHIFT_COLUMNS))
+    lp_cost_before: Optional[float] = None  # LP over the given shifts, for the tasks they cover
+    lp_costs: list = field(default_factory=list)  # LP cost per pricing round, from the seeded master on
+    columns_added: int = 0
+    converged: bool = False
+    seeded: int = 0  # tasks no given shift covers, seeded with a designed one
+    uncovered: int = 0  # tasks no candidate shift can hold
+    seconds: float = 0.0
+
+    @property
+    def iterations(self):
+        return max(len(self.lp_costs) - 1, 0)
+
+    def summary(self):
+        return {
+            "new_shifts": len(self.shifts_df),
+            "columns_added": self.columns_added,
+            "iterations": self.iterations,
+            "converged": self.converged,
+            "lp_cost_before": self.lp_cost_before,
+            "lp_cost_after": self.lp_costs[-1] if self.lp_costs else None,
+            "seeded_tasks": self.seeded,
+            "uncovered_tasks": self.uncovered,
+            "seconds": round(self.seconds, 3),
+        }
+
+
+def hourly_rate(shifts_df):
+    """Median Weight per hour of the (prepared) shifts, DEFAULT_HOURLY_RATE without any."""
+    if shifts_df.empty:
+        return DEFAULT_HOURLY_RATE
+    hours = ((_minutes(shifts_df["EndTime"]) - _minutes(shifts_df["StartTime"])) % (24 * 60)) / 60
+    rates = shifts_df["Weight"].to_numpy(dtype=float)[hours > 0] / hours[hours > 0]
+    return float(np.median(rates)) if len(rates) else DEFAULT_HOURLY_RATE
+
+
+def candidate_shifts(step=DEFAULT_STEP, lengths=DEFAULT_LENGTHS, break_offsets=DEFAULT_BREAK_OFFSETS,
+                     break_minutes=BREAK_MINUTES):
+    """Candidate (start, end, break start, break end) in minutes, ending before midnight."""
+    candidates = set()
+    for length in lengths:
+        minutes = int(length * 60)
+        for start in range(0, 24 * 60 - minutes, step):
+            for offset in break_offsets:
+                break_start = start + minutes // 2 - break_minutes // 2 + offset
+                if start <= break_start and break_start + break_minutes <= start + minutes:
+                    candidates.add((start, start + minutes, break_start, break_start + break_minutes))
+    return np.array(sorted(candidates), dtype=np.int64).reshape(-1, 4)
+
+
+def best_interval_set(starts, ends, values, break_start, break_end):
+    """
+    Largest total value of tasks whose windows [start, end) share no
+    minute outside [break_start, break_end): the break is cut out of the
+    day, so windows spanning it become single intervals and windows
+    inside it vanish (they are left out).
+    """
+    cut = break_end - break_start
+    starts = np.where(starts >= break_end, starts - cut, np.minimum(starts, break_start))
+    ends = np.where(ends >= break_end, ends - cut, np.minimum(ends, break_start))
+    keep = ends > starts
+    order = np.argsort(ends[keep], kind="stable")
+    starts, ends, values = starts[keep][order], ends[keep][order], values[keep][order]
+    best = [0.0]  # best[k]: the first k windows by end
+    for k in range(len(ends)):
+        before = bisect.bisect_right(ends, starts[k], 0, k)
+        best.append(max(best[k], best[before] + values[k]))
+    return best[-1]
+
+
+class _Master:
+    """LP relaxation of build_model over the given shifts, grown by designed shifts."""
+
+    def __init__(self, tasks_df, shifts_df, capacity, env):
+        self.capacity = capacity
+        model, _, _ = build_model(tasks_df, shifts_df, env=env, aggregate=True, capacity=capacity)
+        self.units = model._task_groups
+        self.lp = model.relax()
+        model.dispose()
+        self.lp.Params.OutputFlag = 0
+        self.coverage = {
+            unit_id: self.lp.getConstrByName(f"Group_{unit_id}_Coverage") for unit_id in self.units.index
+        }
+        self.day = self.units["Day"].to_numpy()
+        self.start = _minutes(self.units["StartTime"])
+        self.end = _minutes(self.units["EndTime"])
+        self.duration = _duration_minutes(self.units["Duration"])
+        self.nurses = self.units["NursesRequired"].to_numpy(dtype=float)
+        self.count = self.units["Count"].to_numpy(dtype=float)
+        self.columns = []  # (day, start, end, break start, break end, weight, workers var)
+
+    def holds(self, start, end, break_start, break_end, mine=slice(None)):
+        """Which units (of mine) a shift can take, as in build_model; broadcasts over candidate arrays."""
+        return (
+            (self.start[mine] >= start) & (self.end[mine] <= end)
+            & fits_outside_break(self.start[mine], self.end[mine], self.duration[mine],
+                                 start, end, break_start, break_end)
+        )
+
+    def solve(self):
+        self.lp.optimize()
+        if self.lp.status != GRB.OPTIMAL:
+            return None
+        return self.lp.ObjVal
+
+    def duals(self):
+        """Value of one task of every unit (coverage dual per nurse it needs); 0 where uncovered."""
+        pi = np.array([c.Pi if c is not None else 0.0 for c in self.coverage.values()])
+        return np.maximum(pi, 0.0) / self.nurses
+
+    def add(self, day, start, end, break_start, break_end, weight):
+        """Add a designed (shift, day) with its task variables and capacity rows."""
+        name = f"Design_{len(self.columns)}_{day}"
+        workers = self.lp.addVar(lb=0, obj=weight, name=f"Workers_{name}")
+        members = np.flatnonzero((self.day == day) & self.holds(start, end, break_start, break_end))
+        members = [u for u in members if self.coverage[self.units.index[u]] is not None]
+        load = []
+        for u in members:
+            unit_id = self.units.index[u]
+            var = self.lp.addVar(lb=0, ub=self.count[u], name=f"Group_{unit_id}_{name}",
+                                 column=Column([1.0], [self.coverage[unit_id]]))
+            load.append((self.nurses[u], var))
+        if self.capacity == "sum":
+            self.lp.addConstr(quicksum(n * var for n, var in load) <= workers, name=f"{name}_WorkerCap")
+        else:
+            for point, open_ in peak_load_points(self.start[members], self.end[members], break_start, break_end):
+                self.lp.addConstr(
+                    quicksum(load[i][0] * load[i][1] for i in open_) <= workers,
+                    name=f"{name}_Peak_{int(point) // 60:02d}{int(point) % 60:02d}"
+                )
+        self.columns.append((day, start, end, break_start, break_end, weight, workers))
+
+    def price(self, candidates, weights, per_day=COLUMNS_PER_DAY):
+        """The most negative (reduced cost, day, candidate index) of every day."""
+        value = self.duals()
+        found = []
+        for day in DAY_NAMES:
+            mine = np.flatnonzero((self.day == day) & (value > 0))
+            if not len(mine):
+                continue
+            starts, ends, values = self.start[mine], self.end[mine], value[mine]
+            inside = self.holds(*(candidates[:, k:k + 1] for k in range(4)), mine=mine)
+            # Everything a candidate holds is an upper bound on what its rows are worth
+            bound = inside.astype(float) @ values
+            priced = []
+            for c in np.flatnonzero(bound > weights * (1 + EPSILON)):
+                held = inside[c]
+                if self.capacity == "sum":
+                    worth = values[held].max()
+                else:
+                    worth = best_interval_set(starts[held], ends[held], values[held], *candidates[c, 2:])
+                if weights[c] - worth < -EPSILON * weights[c]:
+                    priced.append((weights[c] - worth, day, c))
+            # One break position per start and end and iteration
+            taken = set()
+            for reduced_cost, day, c in sorted(priced):
+                if len(taken) < per_day and tuple(candidates[c, :2]) not in taken:
+                    taken.add(tuple(candidates[c, :2]))
+                    found.append((reduced_cost, day, c))
+        return found
+
+
+def design_shifts(tasks_df, shifts_df, capacity=DEFAULT_CAPACITY, rate=None, step=DEFAULT_STEP,
+                  lengths=DEFAULT_LENGTHS, break_offsets=DEFAULT_BREAK_OFFSETS, break_minutes=BREAK_MINUTES,
+                  max_iterations=MAX_ITERATIONS, env=None):
+    """
+    Design shifts for raw task and shift tables (as stored in the
+    database) by column generation; see the module docstring. capacity
+    is the formulation the shifts are designed for ("lazy" prices like
+    "peak"), rate the weight per hour (default: hourly_rate of the
+    shifts). Tasks no shift covers yet are seeded with the cheapest
+    candidate that holds them.
+
+    Returns a ShiftDesign whose shifts_df has the designed shifts the
+    final LP uses, one row per start, end and break, active on the days
+    it is used. Raises OptimizationInputError without tasks.
+    """
+    if capacity not in CAPACITY_MODES:
+        raise ValueError(f"Unknown capacity formulation {capacity!r}")
+    if tasks_df.empty:
+        raise OptimizationInputError("Tasks data is missing. Add data and try again.")
+    started = time.perf_counter()
+    capacity = "peak" if capacity == "lazy" else capacity
+    tasks_df, shifts_df = prepare_tables(tasks_df, shifts_df)
+    rate = hourly_rate(shifts_df) if rate is None else float(rate)
+    candidates = candidate_shifts(step, lengths, break_offsets, break_minutes)
+    weights = np.round(rate * (candidates[:, 1] - candidates[:, 0]) / 60, 2)
+
+    master = _Master(tasks_df, shifts_df, capacity, env if env is not None else create_env(False))
+    design = ShiftDesign()
+    if any(c is not None for c in master.coverage.values()):
+        design.lp_cost_before = master.solve()
+    # Seed the tasks no shift covers with the cheapest candidate holding them
+    for u in np.flatnonzero([c is None for c in master.coverage.values()]):
+        holds = np.flatnonzero(master.holds(*candidates.T, mine=u))
+        if not len(holds):
+            design.uncovered += int(master.count[u])
+            continue
+        c = holds[np.argmin(weights[holds])]
+        unit_id = master.units.index[u]
+        master.coverage[unit_id] = master.lp.addConstr(
+            quicksum([]) >= master.count[u], name=f"Group_{unit_id}_Coverage"
+        )
+        master.add(master.day[u], *candidates[c], weights[c])
+        design.seeded += int(master.count[u])
+    design.columns_added = len(master.columns)
+
+    cost = master.solve()
+    if cost is None:
+        design.seconds = time.perf_counter() - started
+        return design
+    design.lp_costs.append(cost)
+    for _ in range(max_iterations):
+        found = master.price(candidates, weights)
+        if not found:
+            design.converged = True
+            break
+        for _, day, c in found:
+            master.add(day, *candidates[c], weights[c])
+        design.columns_added += len(found)
+        cost = master.solve()
+        if cost is None:
+            break
+        design.lp_costs.append(cost)
+
+    used = {}
+    for day, start, end, break_start, break_end, weight, workers in master.columns:
+        if master.lp.status == GRB.OPTIMAL and workers.X > 1e-6:
+            used.setdefault((start, end, break_start, break_end, weight), set()).add(day)
+    design.shifts_df = pd.DataFrame([
+        {
+            "StartTime": format_clock(start),
+            "EndTime": format_clock(end),
+            "BreakTime": format_clock(break_start),
+            "BreakDuration": format_duration(break_end - break_start),
+            "Weight": float(weight),
+            **{day: int(day in days) for day in DAY_NAMES},
+        }
+        for (start, end, break_start, break_end, weight), days in sorted(used.items())
+    ], columns=SHIFT_COLUMNS)
+    master.lp.dispose()
+    design.seconds = time.perf_counter() - started
+    return design
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m shift_design",
+        description="Design shifts for the stored tasks by column generation."
+    )
+    parser.add_argument("--db", default="tasksv2.db", help="Database with the tasks and shifts")
+    parser.add_argument("--capacity", choices=list(CAPACITY_MODES), default=DEFAULT_CAPACITY,
+                        help=f"Capacity formulation to design for (default: {DEFAULT_CAPACITY})")
+    parser.add_argument("--rate", type=float, help="Weight per shift hour (default: median of the stored shifts)")
+    parser.add_argument("--step", type=int, default=DEFAULT_STEP, help="Minutes between candidate start times")
+    parser.add_argument("--lengths", type=float, nargs="+", default=list(DEFAULT_LENGTHS),
+                        metavar="HOURS", help="Candidate shift lengths (default: %(default)s)")
+    parser.add_argument("--max-iterations", type=int, default=MAX_ITERATIONS)
+    parser.add_argument("--save", action="store_true", help="Add the designed shifts to the shift table")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args(argv)
+    if args.step <= 0:
+        parser.error("--step must be positive")
+
+    tasks_df, shifts_df = load_tables(args.db)
+    try:
+        design = design_shifts(tasks_df, shifts_df, capacity=args.capacity, rate=args.rate, step=args.step,
+                               lengths=args.lengths, max_iterations=args.max_iterations)
+    except OptimizationInputError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    if args.save:
+        import database
+        database.DB_FILE = args.db
+        for row in design.shifts_df.itertuples(index=False):
+            database.add_shift_to_db(tuple(row))
+
+    summary = design.summary()
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+    before, after = summary["lp_cost_before"], summary["lp_cost_after"]
+    if before is not None:
+        print(f"Given shifts:  LP cost {before:,.2f}")
+    if after is not None:
+        print(f"Designed:      LP cost {after:,.2f} after {design.iterations} pricing rounds"
+              f"{'' if design.converged else ' (iteration limit)'}")
+    if design.seeded:
+        print(f"Seeded:        {design.seeded} tasks no given shift covers")
+    print(f"New shifts:    {len(design.shifts_df)} ({design.columns_added} priced in)")
+    if design.uncovered:
+        print(f"Uncovered:     {design.uncovered} tasks (no candidate shift holds them)")
+    print(f"Designed in:   {design.seconds:.2f}s")
+    if not design.shifts_df.empty:
+        print(design.shifts_df.to_string(index=False))
+    if args.save:
+        print(f"Added {len(design.shifts_df)} shifts to {args.db}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Offline tuning of the solver parameters.
+
+Solves the seeded benchmark instances with every candidate parameter set
+(the presets, optionally plus a small grid), picks the fastest candidate
+whose plans are as good as the best found, and stores it in the database.
+The app and the engine CLI then offer it as the 'tuned' preset:
+
+    python -m tuning --sizes 100 500 --seeds 0 1 2 --db tasksv2.db
+"""
+import argparse
+import itertools
+import json
+import math
+import sys
+
+from gurobipy import GRB, GurobiError
+
+import engine
+from generator import generate_instance
+
+DEFAULT_SIZES = [100, 500]
+DEFAULT_SEEDS = [0, 1, 2]
+
+# Extra candidates for --grid; TimeLimit/Threads come from the default preset
+GRID = {
+    "MIPFocus": [0, 1, 2, 3],
+    "Presolve": [-1, 0, 2],
+    "Heuristics": [0.05, 0.2],
+}
+
+# Seconds added before taking the geometric mean, so near-zero times don't dominate
+TIME_SHIFT = 0.1
+
+
+def candidate_settings(grid=False):
+    """Candidate name -> Gurobi parameters."""
+    candidates = {name: dict(params) for name, params in engine.SOLVER_PRESETS.items()}
+    if grid:
+        base = engine.SOLVER_PRESETS[engine.DEFAULT_PRESET]
+        for values in itertools.product(*GRID.values()):
+            params = {**base, **dict(zip(GRID, values))}
+            name = ",".join(f"{k}={v}" for k, v in zip(GRID, values))
+            candidates[name] = params
+    return candidates
+
+
+def solve_with(model, params, time_limit):
+    """Solve model from scratch with params, capping TimeLimit at time_limit."""
+    model.reset()
+    model.resetParams()
+    model.Params.OutputFlag = 0
+    for name, value in params.items():
+        model.setParam(name, value)
+    model.Params.TimeLimit = min(params.get("TimeLimit", GRB.INFINITY), time_limit)
+    model.optimize()
+    return {
+        "status": engine.STATUS_NAMES.get(model.status, str(model.status)),
+        "seconds": model.Runtime,
+        "objective": model.ObjVal if model.SolCount > 0 else None,
+    }
+
+
+def _shifted_geomean(values, shift=TIME_SHIFT):
+    return math.exp(sum(math.log(v + shift) for v in values) / len(values)) - shift
+
+
+def score_candidates(runs):
+    """
+    runs: {candidate: [{"instance", "status", "seconds", "objective"}, ...]}.
+    Returns one row per candidate with its mean relative loss against the
+    best objective found per instance and its shifted geometric mean time.
+    """
+    best = {}
+    for results in runs.values():
+        for r in results:
+            if r["objective"] is not None:
+                best[r["instance"]] = min(best.get(r["instance"], math.inf), r["objective"])
+
+    rows = []
+    for name, results in runs.items():
+        losses = []
+        for r in results:
+            if r["objective"] is None:
+                losses.append(1.0)  # no plan at all
+            else:
+                reference = best[r["instance"]]
+                losses.append((r["objective"] - reference) / max(abs(reference), 1.0))
+        rows.append({
+            "candidate": name,
+            "mean_loss": sum(losses) / len(losses),
+            "geomean_seconds": _shifted_geomean([r["seconds"] for r in results]),
+            "optimal": sum(r["status"] == "OPTIMAL" for r in results),
+            "instances": len(results),
+        })
+    return rows
+
+
+def pick_best(rows, tolerance=0.001):
+    """The fastest candidate within `tolerance` of the best plans, else the one with the lowest loss."""
+    good = [row for row in rows if row["mean_loss"] <= tolerance]
+    if good:
+        return min(good, key=lambda row: row["geomean_seconds"])
+    return min(rows, key=lambda row: (row["mean_loss"], row["geomean_seconds"]))
+
+
+def run_tuning(sizes, seeds, candidates, time_limit=30, log=print):
+    """Solve every instance with every candidate; returns {candidate: [results]}."""
+    runs = {name: [] for name in candidates}
+    for num_tasks, seed in itertools.product(sizes, seeds):
+        instance = f"{num_tasks}/{seed}"
+        tasks_df, shifts_df = engine.prepare_tables(*generate_instance(num_tasks, seed=seed))
+        model, _, _ = engine.build_model(
+            tasks_df, shifts_df, env=engine.create_env(output_flag=False), aggregate=True
+        )
+        for name, params in candidates.items():
+            result = solve_with(model, params, time_limit)
+            result["instance"] = instance
+            runs[name].append(result)
+            log(f"{instance:>10}  {name:<40} {result['status']:<10} {result['seconds']:8.3f}s")
+        model.dispose()
+    return runs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m tuning",
+        description="Pick the best solver parameter preset on synthetic benchmark instances."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help=f"Task counts of the instances (default: {DEFAULT_SIZES})")
+    parser.add_argument("--seeds", type=int, nargs="+", default=DEFAULT_SEEDS,
+                        help=f"Seeds per size (default: {DEFAULT_SEEDS})")
+    parser.add_argument("--grid", action="store_true",
+                        help="Also try a grid of MIPFocus/Presolve/Heuristics values")
+    parser.add_argument("--time-limit", type=float, default=30,
+                        help="Cap on each tuning solve, in seconds (default: 30)")
+    parser.add_argument("--tolerance", type=float, default=0.001,
+                        help="Allowed mean relative cost loss against the best plans (default: 0.001)")
+    parser.add_argument("--db", default="tasksv2.db", help="Database to store the tuned settings in")
+    parser.add_argument("--dry-run", action="store_true", help="Report only, do not store the result")
+    parser.add_argument("--output", help="Write the full report to this JSON file")
+    args = parser.parse_args(argv)
+
+    candidates = candidate_settings(grid=args.grid)
+    try:
+        runs = run_tuning(args.sizes, args.seeds, candidates, time_limit=args.time_limit)
+    except GurobiError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    rows = score_candidates(runs)
+    best = pick_best(rows, tolerance=args.tolerance)
+    print()
+    for row in sorted(rows, key=lambda row: (row["mean_loss"], row["geomean_seconds"])):
+        marker = "*" if row is best else " "
+        print(f"{marker} {row['candidate']:<40} loss {row['mean_loss']:.4%}  "
+              f"time {row['geomean_seconds']:.3f}s  optimal {row['optimal']}/{row['instances']}")
+
+    report = {
+        "sizes": args.sizes,
+        "seeds": args.seeds,
+        "time_limit": args.time_limit,
+        "tolerance": args.tolerance,
+        "candidates": rows,
+        "runs": runs,
+        "best": best["candidate"],
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+    if not args.dry_run:
+        import database
+        database.DB_FILE = args.db
+        database.init_db()
+        database.save_tuned_settings(best["candidate"], candidates[best["candidate"]], report)
+        print(f"Stored {best['candidate']} as the tuned preset in {args.db}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())